@@ -0,0 +1,245 @@
+"""Historical Nasdaq backfill: ``python -m app.backfill --from 2018-01-01 --to today``.
+
+Weekdays are fetched in batches, concurrently and under a request-rate limit, and
+each batch is bulk-loaded through the regular upsert path while the next one is
+being fetched. Progress is checkpointed to a JSON file after every batch, so
+rerunning the same command resumes where an interrupted run stopped and retries
+days whose fetch failed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.config import get_settings
+from app.db.database import get_engine, get_session_factory
+from app.db.migrations import run_migrations
+from app.db.models import Base
+from app.db.partitions import SCHEMES, ensure_partitions, is_partitioned
+from app.services.earnings_calendar import fetch_nasdaq_day, upsert_earnings_events
+from app.services.earnings_store import RETURN_NONE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = ".backfill_checkpoint.json"
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across concurrent tasks."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+@dataclass
+class BackfillStats:
+    days: int = 0
+    rows: int = 0
+    failed: list[date] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def days_per_sec(self) -> float:
+        return self.days / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def _weekdays(start: date, end: date) -> list[date]:
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+    return [d for d in days if d.weekday() < 5]
+
+
+def load_checkpoint(path: Path, start: date) -> dict | None:
+    """The saved progress for a run from ``start``, or None to start from scratch.
+
+    Only ``start`` has to match: ``--to today`` moves the end every day, and a
+    later end just extends the saved run.
+    """
+    if not path.is_file():
+        return None
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable checkpoint %s", path)
+        return None
+    if data.get("start") != start.isoformat():
+        logger.warning(
+            "Checkpoint %s starts at %s, starting %s from scratch", path, data.get("start"), start,
+        )
+        return None
+    return data
+
+
+def save_checkpoint(path: Path, start: date, end: date, next_day: date | None, failed: list[date]):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "next": next_day.isoformat() if next_day else None,
+        "failed": sorted(d.isoformat() for d in failed),
+    }))
+    os.replace(tmp, path)
+
+
+async def _prepare_schema(start: date, end: date):
+    scheme = get_settings().EARNINGS_PARTITIONING
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+        if scheme in SCHEMES and await is_partitioned(conn):
+            await ensure_partitions(conn, start, end, scheme)
+
+
+async def _fetch_batch(
+    client: httpx.AsyncClient,
+    days: list[date],
+    semaphore: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> dict[date, list[dict] | None]:
+    async def fetch(day: date):
+        # Take the rate token only once a slot is free, so tokens handed out while
+        # every slot was busy can't be spent back-to-back in a burst.
+        async with semaphore:
+            await limiter.wait()
+            return await fetch_nasdaq_day(client, day)
+
+    results = await asyncio.gather(*(fetch(d) for d in days))
+    return dict(zip(days, results))
+
+
+async def _load_batch(fetched: dict[date, list[dict] | None]) -> int:
+    rows = [row for day_rows in fetched.values() if day_rows for row in day_rows]
+    if rows:
+        async with get_session_factory()() as db:
+            await upsert_earnings_events(db, rows, returning=RETURN_NONE)
+    return len(rows)
+
+
+async def run_backfill(
+    start: date,
+    end: date,
+    *,
+    batch_days: int = 20,
+    rate: float = 2.0,
+    concurrency: int | None = None,
+    checkpoint: Path = Path(DEFAULT_CHECKPOINT),
+    restart: bool = False,
+) -> BackfillStats:
+    """Backfill Nasdaq calendar days from ``start`` through ``end``.
+
+    Nasdaq is called directly rather than through ``fetch_nasdaq_days`` so years of
+    history don't flood the Redis day cache. ``rate`` caps requests per second and
+    ``concurrency`` (default ``NASDAQ_CONCURRENCY``) caps requests in flight.
+    """
+    saved = None if restart else load_checkpoint(checkpoint, start)
+    retry = {date.fromisoformat(d) for d in saved["failed"]} if saved else set()
+    resume_from = date.fromisoformat(saved["next"]) if saved and saved["next"] else None
+    if saved and resume_from is None:
+        # The saved run finished; only days past its end are new.
+        resume_from = date.fromisoformat(saved["end"]) + timedelta(days=1)
+    pending = _weekdays(resume_from or start, end)
+    queue = sorted(d for d in retry if d <= end) + [d for d in pending if d not in retry]
+    if saved:
+        logger.info("Resuming backfill: %d failed days to retry, next day %s", len(retry), resume_from)
+
+    await _prepare_schema(start, end)
+
+    stats = BackfillStats()
+    batches = [queue[i:i + batch_days] for i in range(0, len(queue), batch_days)]
+    semaphore = asyncio.Semaphore(max(1, concurrency or get_settings().NASDAQ_CONCURRENCY))
+    limiter = RateLimiter(rate)
+    failed = set(retry)
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(timeout=15.0) as client:
+        fetching = asyncio.create_task(_fetch_batch(client, batches[0], semaphore, limiter)) if batches else None
+        try:
+            for i, batch in enumerate(batches):
+                fetched = await fetching
+                fetching = None
+                # Fetch the next batch while this one is written.
+                if i + 1 < len(batches):
+                    fetching = asyncio.create_task(_fetch_batch(client, batches[i + 1], semaphore, limiter))
+
+                stats.rows += await _load_batch(fetched)
+                for day, rows in fetched.items():
+                    if rows is None:
+                        failed.add(day)
+                    else:
+                        failed.discard(day)
+                        stats.days += 1
+
+                stats.elapsed = time.perf_counter() - started
+                remaining = [d for b in batches[i + 1:] for d in b if d not in retry]
+                save_checkpoint(checkpoint, start, end, remaining[0] if remaining else None, sorted(failed))
+                logger.info(
+                    "Backfilled %s..%s: %d days, %d rows total (%.2f days/s, %.0f rows/s)",
+                    batch[0], batch[-1], stats.days, stats.rows, stats.days_per_sec, stats.rows_per_sec,
+                )
+        finally:
+            if fetching is not None:
+                fetching.cancel()
+
+    stats.elapsed = time.perf_counter() - started
+    stats.failed = sorted(failed)
+    return stats
+
+
+def _parse_day(value: str) -> date:
+    return date.today() if value == "today" else date.fromisoformat(value)
+
+
+async def main(args: argparse.Namespace):
+    try:
+        stats = await run_backfill(
+            args.start,
+            args.end,
+            batch_days=args.batch_days,
+            rate=args.rate,
+            concurrency=args.concurrency,
+            checkpoint=Path(args.checkpoint),
+            restart=args.restart,
+        )
+    finally:
+        await get_engine().dispose()
+
+    print(
+        f"{stats.days} days, {stats.rows} rows in {stats.elapsed:.1f}s "
+        f"({stats.days_per_sec:.2f} days/s, {stats.rows_per_sec:.0f} rows/s)"
+    )
+    if stats.failed:
+        print(f"{len(stats.failed)} days failed and will be retried on the next run: "
+              f"{', '.join(d.isoformat() for d in stats.failed[:10])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="start", type=_parse_day, required=True)
+    parser.add_argument("--to", dest="end", type=_parse_day, default=date.today())
+    parser.add_argument("--batch-days", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=2.0, help="max Nasdaq requests per second")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(parser.parse_args()))
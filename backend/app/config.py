@@ -16,6 +16,11 @@ def _find_env_file() -> str | None:
 class Settings(BaseSettings):
     DATABASE_URL: str = ""
     REDIS_URL: str = ""
+    # After REDIS_BREAKER_FAILURES consecutive connection errors or timeouts, Redis is
+    # skipped (in-process fallbacks only) for REDIS_BREAKER_COOLDOWN seconds before a
+    # single probe request checks whether it is back.
+    REDIS_BREAKER_FAILURES: int = 5
+    REDIS_BREAKER_COOLDOWN: int = 30
     FMP_API_KEY: str = ""
     ALPHA_VANTAGE_API_KEY: str = ""
     NEWS_API_KEY: str = ""
@@ -24,6 +29,50 @@ class Settings(BaseSettings):
     BRAVE_SEARCH_API_KEY: str = ""
     CLERK_SECRET_KEY: str = ""
     CLERK_JWKS_URL: str = ""
+    NASDAQ_CONCURRENCY: int = 4
+    # Upstream fetches in flight for one /api/calendar/sparklines request.
+    SPARKLINE_CONCURRENCY: int = 8
+    # "lifespan" runs ingestion jobs inside the API process, "worker" leaves them to
+    # `python -m app.worker`, "off" syncs inline on the request path (the API still
+    # runs the cache and partition jobs).
+    INGEST_SCHEDULER: str = "lifespan"
+    AV_SYNC_INTERVAL: int = 4 * 60 * 60
+    ENRICH_INTERVAL: int = 60 * 60
+    ENRICH_WEEKS_AHEAD: int = 4
+    HIGHLIGHTS_INTERVAL: int = 30 * 60
+    # The cache warmer fills highlights plus sparkline, 1M chart and news caches for
+    # this and next week's WARM_TOP_N largest reporters and the WARM_FAVORITES_N most
+    # favorited tickers, at most WARM_CONCURRENCY upstream fetches at a time.
+    WARM_INTERVAL: int = 30 * 60
+    WARM_TOP_N: int = 25
+    WARM_FAVORITES_N: int = 25
+    WARM_CONCURRENCY: int = 4
+    SCHEDULER_JITTER: float = 0.1
+    # "memory" serves /suggest from an in-process index; "pg_trgm" queries Postgres
+    # trigram GIN indexes (created at startup) for multi-worker deployments.
+    SUGGEST_BACKEND: str = "memory"
+    # "quarterly" or "yearly" range-partitions earnings_events by report_date at
+    # startup (see app/db/partitions.py); "off" keeps a single table.
+    EARNINGS_PARTITIONING: str = "off"
+    EARNINGS_PARTITIONS_AHEAD: int = 2
+    PARTITION_MAINTENANCE_INTERVAL: int = 24 * 60 * 60
+    # In-process cache in front of Redis. Entries live at most L1_CACHE_TTL seconds
+    # (never longer than the Redis TTL); L1_CACHE_DISABLED is a comma-separated list
+    # of key families to bypass, e.g. "analysis,chart".
+    L1_CACHE_MAX_ENTRIES: int = 2048
+    L1_CACHE_TTL: int = 30
+    L1_CACHE_DISABLED: str = ""
+    # Redis values at least CACHE_COMPRESS_MIN_BYTES long are compressed with
+    # CACHE_COMPRESSION ("zlib", "zstd" with the fast-cache extra, or "none").
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESS_MIN_BYTES: int = 1024
+    # Upstream responses (charts, news, sparklines) are served stale for up to
+    # CACHE_STALE_FACTOR times their TTL while a background refresh runs. Larger
+    # CACHE_XFETCH_BETA refreshes hot keys earlier; CACHE_TTL_JITTER spreads the
+    # expiry of keys written together by up to that fraction of their TTL.
+    CACHE_STALE_FACTOR: int = 4
+    CACHE_XFETCH_BETA: float = 1.0
+    CACHE_TTL_JITTER: float = 0.1
 
     model_config = {
         "env_file": _find_env_file(),
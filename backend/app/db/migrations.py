@@ -0,0 +1,43 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from app.config import get_settings
+from app.db.models import EarningsEvent
+from app.db.partitions import migrate_partitioning
+
+# Idempotent DDL for columns and indexes added after a table was first created;
+# ``Base.metadata.create_all`` only creates missing tables.
+_STATEMENTS = [
+    "ALTER TABLE earnings_events ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)",
+]
+
+_PG_TRGM_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_earnings_events_ticker_trgm "
+    "ON earnings_events USING gin (ticker gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_earnings_events_company_name_trgm "
+    "ON earnings_events USING gin (company_name gin_trgm_ops)",
+]
+
+
+# Indexes declared on the models that older tables were created without.
+_MODEL_INDEXES = [
+    "ix_earnings_events_calendar",
+]
+
+
+def _model_index(name: str):
+    return next(ix for ix in EarningsEvent.__table__.indexes if ix.name == name)
+
+
+async def run_migrations(conn: AsyncConnection) -> None:
+    for stmt in _STATEMENTS:
+        await conn.execute(text(stmt))
+    # Before any index DDL, so indexes land on the partitioned parent.
+    await migrate_partitioning(conn)
+    if get_settings().SUGGEST_BACKEND == "pg_trgm":
+        for stmt in _PG_TRGM_STATEMENTS:
+            await conn.execute(text(stmt))
+    for name in _MODEL_INDEXES:
+        await conn.execute(CreateIndex(_model_index(name), if_not_exists=True))
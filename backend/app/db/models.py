@@ -11,7 +11,9 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, relationship
@@ -37,6 +39,18 @@ class EarningsEvent(Base):
     __tablename__ = "earnings_events"
     __table_args__ = (
         UniqueConstraint("ticker", "report_date", name="uq_ticker_report_date"),
+        # Week reads scan this in calendar order; the INCLUDE list covers every
+        # other column so they can be answered with an index-only scan.
+        Index(
+            "ix_earnings_events_calendar",
+            "report_date",
+            text("market_cap DESC NULLS LAST"),
+            "ticker",
+            postgresql_include=[
+                "id", "company_name", "report_time", "fiscal_quarter",
+                "eps_estimate", "revenue_estimate", "content_hash", "created_at",
+            ],
+        ),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -48,6 +62,7 @@ class EarningsEvent(Base):
     eps_estimate = Column(Float, nullable=True)
     revenue_estimate = Column(Float, nullable=True)
     market_cap = Column(Float, nullable=True)
+    content_hash = Column(String(32), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     analyses = relationship("EarningsAnalysis", back_populates="earnings_event")
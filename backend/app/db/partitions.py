@@ -0,0 +1,185 @@
+"""Range partitioning of ``earnings_events`` by ``report_date``.
+
+Enabled with ``EARNINGS_PARTITIONING`` ("quarterly" or "yearly"). The first startup
+with it set rebuilds the heap table as a partitioned one inside the migration
+transaction; afterwards partitions are created ahead of time by a scheduled job.
+
+A partitioned table's primary key and unique constraints must include the
+partition key, so the primary key becomes ``(id, report_date)`` and the
+``earnings_analyses.earnings_event_id`` foreign key is dropped (Postgres cannot
+reference ``id`` alone). ``uq_ticker_report_date`` is unchanged, so the upsert's
+``ON CONFLICT`` target keeps working. Rows outside every partition land in
+``earnings_events_default`` and are moved out when a covering partition is created.
+"""
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("quarterly", "yearly")
+_PARENT = "earnings_events"
+_DEFAULT = "earnings_events_default"
+_BOUND_RE = re.compile(r"FROM \('([\d-]+)'\) TO \('([\d-]+)'\)")
+
+
+def partition_for(d: date, scheme: str) -> tuple[str, date, date]:
+    """Name and ``[start, end)`` bounds of the partition holding ``d``."""
+    if scheme == "yearly":
+        return f"{_PARENT}_y{d.year}", date(d.year, 1, 1), date(d.year + 1, 1, 1)
+    if scheme == "quarterly":
+        q = (d.month - 1) // 3
+        start = date(d.year, q * 3 + 1, 1)
+        end = date(d.year + 1, 1, 1) if q == 3 else date(d.year, q * 3 + 4, 1)
+        return f"{_PARENT}_{d.year}q{q + 1}", start, end
+    raise ValueError(f"unknown partitioning scheme {scheme!r}")
+
+
+def partitions_between(start: date, end: date, scheme: str) -> list[tuple[str, date, date]]:
+    """Partitions covering every date from ``start`` through ``end``."""
+    partitions = []
+    d = start
+    while d <= end:
+        part = partition_for(d, scheme)
+        partitions.append(part)
+        d = part[2]
+    return partitions
+
+
+def _periods_ahead(today: date, periods: int, scheme: str) -> date:
+    d = today
+    for _ in range(periods):
+        d = partition_for(d, scheme)[2]
+    return d
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    result = await conn.execute(text(
+        f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{_PARENT}')"
+    ))
+    return result.scalar() == "p"
+
+
+async def _attached_ranges(conn: AsyncConnection, parent: str) -> dict[str, tuple[date, date] | None]:
+    """Attached partitions by name, with their bounds (None for the default)."""
+    result = await conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        f"WHERE i.inhparent = to_regclass('{parent}')"
+    ))
+    ranges = {}
+    for name, bound in result.all():
+        m = _BOUND_RE.search(bound or "")
+        ranges[name] = (date.fromisoformat(m[1]), date.fromisoformat(m[2])) if m else None
+    return ranges
+
+
+async def ensure_partitions(
+    conn: AsyncConnection, start: date, end: date, scheme: str, parent: str = _PARENT
+) -> list[str]:
+    """Create the partitions covering ``start``..``end`` that don't exist yet.
+
+    Each partition is built detached, filled with any matching rows from the default
+    partition, and then attached, so the default never holds rows that a new
+    partition's bounds would claim. Ranges overlapping an existing partition (for
+    instance after switching schemes) are left alone. Returns the created names.
+    """
+    attached = await _attached_ranges(conn, parent)
+    covered = [r for r in attached.values() if r is not None]
+    has_default = any(r is None for r in attached.values())
+
+    created = []
+    for name, lo, hi in partitions_between(start, end, scheme):
+        if name in attached or any(lo < c_hi and c_lo < hi for c_lo, c_hi in covered):
+            continue
+        in_range = f"report_date >= '{lo.isoformat()}' AND report_date < '{hi.isoformat()}'"
+        await conn.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)"))
+        if has_default:
+            await conn.execute(text(f"INSERT INTO {name} SELECT * FROM {_DEFAULT} WHERE {in_range}"))
+            await conn.execute(text(f"DELETE FROM {_DEFAULT} WHERE {in_range}"))
+        await conn.execute(text(
+            f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+        ))
+        covered.append((lo, hi))
+        created.append(name)
+    if created:
+        logger.info("Created earnings_events partitions: %s", created)
+    return created
+
+
+async def _referencing_foreign_keys(conn: AsyncConnection) -> list[tuple[str, str]]:
+    result = await conn.execute(text(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        f"WHERE contype = 'f' AND confrelid = to_regclass('{_PARENT}')"
+    ))
+    return [(table, name) for table, name in result.all()]
+
+
+async def partition_table(conn: AsyncConnection, scheme: str, periods_ahead: int) -> None:
+    """Rebuild the heap ``earnings_events`` as a range-partitioned table."""
+    staging = f"{_PARENT}_partitioned"
+    seq = (await conn.execute(text(
+        f"SELECT pg_get_serial_sequence('{_PARENT}', 'id')"
+    ))).scalar()
+    first, last = (await conn.execute(text(
+        f"SELECT min(report_date), max(report_date) FROM {_PARENT}"
+    ))).one()
+
+    today = date.today()
+    start = min(first or today, today)
+    end = max(last or today, _periods_ahead(today, periods_ahead, scheme))
+
+    await conn.execute(text(
+        f"CREATE TABLE {staging} (LIKE {_PARENT} INCLUDING DEFAULTS) PARTITION BY RANGE (report_date)"
+    ))
+    await ensure_partitions(conn, start, end, scheme, parent=staging)
+    await conn.execute(text(f"CREATE TABLE {_DEFAULT} PARTITION OF {staging} DEFAULT"))
+    await conn.execute(text(f"INSERT INTO {staging} SELECT * FROM {_PARENT}"))
+
+    for table, name in await _referencing_foreign_keys(conn):
+        await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    if seq:
+        await conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY NONE"))
+    await conn.execute(text(f"DROP TABLE {_PARENT}"))
+    await conn.execute(text(f"ALTER TABLE {staging} RENAME TO {_PARENT}"))
+    if seq:
+        await conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {_PARENT}.id"))
+
+    await conn.execute(text(
+        f"ALTER TABLE {_PARENT} ADD CONSTRAINT {_PARENT}_pkey PRIMARY KEY (id, report_date)"
+    ))
+    await conn.execute(text(
+        f"ALTER TABLE {_PARENT} ADD CONSTRAINT uq_ticker_report_date UNIQUE (ticker, report_date)"
+    ))
+    await conn.execute(text(f"CREATE INDEX ix_{_PARENT}_ticker ON {_PARENT} (ticker)"))
+    logger.info("Partitioned earnings_events %s from %s to %s", scheme, start, end)
+
+
+async def migrate_partitioning(conn: AsyncConnection) -> None:
+    """Convert to partitions when enabled, then make sure future partitions exist."""
+    settings = get_settings()
+    scheme = settings.EARNINGS_PARTITIONING
+    if scheme not in SCHEMES:
+        return
+    if not await is_partitioned(conn):
+        await partition_table(conn, scheme, settings.EARNINGS_PARTITIONS_AHEAD)
+        return
+    today = date.today()
+    await ensure_partitions(
+        conn, today, _periods_ahead(today, settings.EARNINGS_PARTITIONS_AHEAD, scheme), scheme,
+    )
+
+
+async def maintain_partitions() -> None:
+    """Scheduled job: create upcoming partitions before rows arrive for them."""
+    from app.db.database import get_engine
+
+    async with get_engine().begin() as conn:
+        if await is_partitioned(conn):
+            await migrate_partitioning(conn)
@@ -0,0 +1,52 @@
+"""Scheduled ingestion jobs, shared by the API lifespan and the standalone worker."""
+from app.config import get_settings
+from app.db.database import get_session_factory
+from app.db.partitions import SCHEMES, maintain_partitions
+from app.services.scheduler import Scheduler
+
+
+async def sync_alpha_vantage():
+    from app.services.earnings_calendar import _sync_alpha_vantage_data
+
+    async with get_session_factory()() as db:
+        await _sync_alpha_vantage_data(db, when_due=False)
+
+
+async def enrich_market_caps():
+    from app.services.earnings_calendar import enrich_upcoming_weeks
+
+    async with get_session_factory()() as db:
+        await enrich_upcoming_weeks(db)
+
+
+async def recompute_highlights():
+    from app.services.highlights import load_highlights
+
+    await load_highlights(refresh=True)
+
+
+async def warm_hot_caches():
+    from app.services.cache_warmer import warm_caches
+
+    await warm_caches()
+
+
+def build_scheduler(ingestion: bool = True) -> Scheduler:
+    """All background jobs, or with ``ingestion=False`` only the cache and partition ones.
+
+    ``INGEST_SCHEDULER=off`` ingests on the request path but still needs the rest.
+    """
+    settings = get_settings()
+    jitter = settings.SCHEDULER_JITTER
+    scheduler = Scheduler()
+    if ingestion:
+        scheduler.add_job("alpha_vantage_sync", sync_alpha_vantage, settings.AV_SYNC_INTERVAL, jitter)
+        scheduler.add_job("nasdaq_enrichment", enrich_market_caps, settings.ENRICH_INTERVAL, jitter)
+    scheduler.add_job("highlights", recompute_highlights, settings.HIGHLIGHTS_INTERVAL, jitter)
+    scheduler.add_job("cache_warm", warm_hot_caches, settings.WARM_INTERVAL, jitter)
+    if settings.EARNINGS_PARTITIONING in SCHEMES:
+        scheduler.add_job(
+            "partition_maintenance", maintain_partitions,
+            settings.PARTITION_MAINTENANCE_INTERVAL, jitter,
+        )
+    return scheduler
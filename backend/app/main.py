@@ -7,12 +7,18 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
+from app.config import get_settings
 from app.db.database import get_engine
+from app.db.migrations import run_migrations
 from app.db.models import Base
+from app.jobs import build_scheduler
 from app.routers import calendar, analysis, favorites, news, chart
-from app.services.cache import close_redis
+from app.services.cache import close_redis, l1_stats, redis_status, start_invalidation_listener
+from app.services.earnings_calendar import close_nasdaq_client
+from app.services.metrics import registry
+from app.services.price_series import close_http_client
 
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
 logger = logging.getLogger(__name__)
@@ -25,6 +31,7 @@ async def lifespan(app: FastAPI):
         try:
             async with engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                await run_migrations(conn)
             break
         except Exception as exc:
             if attempt == 4:
@@ -32,8 +39,22 @@ async def lifespan(app: FastAPI):
             wait = 2 ** attempt
             logger.warning("DB connect attempt %d failed (%s), retrying in %ds...", attempt + 1, exc, wait)
             await asyncio.sleep(wait)
+
+    invalidations = start_invalidation_listener()
+    scheduler = None
+    mode = get_settings().INGEST_SCHEDULER
+    if mode in ("lifespan", "off"):
+        scheduler = build_scheduler(ingestion=mode == "lifespan")
+        scheduler.start()
     yield
+    if scheduler is not None:
+        await scheduler.stop()
+    if invalidations is not None:
+        invalidations.cancel()
+        await asyncio.gather(invalidations, return_exceptions=True)
     await close_redis()
+    await close_http_client()
+    await close_nasdaq_client()
     await engine.dispose()
 
 
@@ -64,7 +85,14 @@ app.include_router(chart.router)
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    redis_info = redis_status()
+    status = "ok" if redis_info["state"] == "closed" else "degraded"
+    return {"status": status, "redis": redis_info, "l1_cache": l1_stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 if STATIC_DIR.is_dir():
@@ -1,20 +1,29 @@
+import asyncio
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
 from datetime import date, timedelta
+from functools import partial
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-import httpx
 
 from app.config import get_settings
 from app.db.database import get_db
 from app.db.models import ReportTime
 from app.services.cache import (
-    get_cached_highlights, set_cached_highlights,
-    get_cached_sparkline, set_cached_sparkline,
+    get_cached_calendar, get_calendar_version, set_cached_calendar,
+    get_many_cached_sparklines, set_many_cached_sparklines,
 )
-from app.services.earnings_calendar import get_week_earnings, search_ticker, week_bounds
+from app.services.earnings_calendar import (
+    get_week_earnings, get_week_page, search_ticker, stream_range_events, week_bounds,
+)
+from app.services.highlights import load_highlights
+from app.services.price_series import fetch_sparkline, load_sparkline
+from app.services.ticker_index import suggest_tickers
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +62,7 @@ class WeekEarningsResponse(BaseModel):
     week_start: date
     week_end: date
     events: list[EarningsEventResponse]
+    next_cursor: str | None = None
 
 
 class HighlightsSection(BaseModel):
@@ -66,9 +76,29 @@ class HighlightsResponse(BaseModel):
     this_week: HighlightsSection
 
 
+class Suggestion(BaseModel):
+    ticker: str
+    company_name: str
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    results: list[Suggestion]
+
+
 class SearchResponse(BaseModel):
     ticker: str
     events: list[EarningsEventResponse]
+    served: str = "fresh"
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    return SuggestResponse(query=q, results=await suggest_tickers(db, q, limit))
 
 
 @router.get("/search", response_model=SearchResponse)
@@ -76,194 +106,239 @@ async def search_stock(
     ticker: str = Query(...),
     db: AsyncSession = Depends(get_db),
 ):
-    events = await search_ticker(db, ticker)
+    events, served = await search_ticker(db, ticker)
     return SearchResponse(
         ticker=ticker.upper().strip(),
         events=[_to_response(e) for e in events],
+        served=served,
     )
 
 
-@router.get("/week", response_model=WeekEarningsResponse)
-async def get_calendar_week(
-    target_date: date = Query(default=None, alias="date"),
-    db: AsyncSession = Depends(get_db),
-):
-    if target_date is None:
-        target_date = date.today()
+_DEFAULT_PAGE_SIZE = 100
+
+
+class WeekFilters(BaseModel):
+    min_market_cap: float | None = None
+    report_time: ReportTime | None = None
+    tickers: list[str] | None = None
+    limit: int | None = None
+    cursor: str | None = None
+
+    def active(self) -> bool:
+        return any(v is not None for v in self.model_dump().values())
+
+
+def week_filters(
+    min_market_cap: float | None = Query(default=None, ge=0),
+    report_time: ReportTime | None = Query(default=None),
+    ticker: list[str] | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+) -> WeekFilters:
+    tickers = None
+    if ticker:
+        tickers = sorted({t.strip().upper() for raw in ticker for t in raw.split(",") if t.strip()})
+    if cursor is not None and limit is None:
+        limit = _DEFAULT_PAGE_SIZE
+    return WeekFilters(
+        min_market_cap=min_market_cap,
+        report_time=report_time,
+        tickers=tickers or None,
+        limit=limit,
+        cursor=cursor,
+    )
 
-    events = await get_week_earnings(db, target_date)
-    monday, friday = week_bounds(target_date)
 
+async def _filtered_week_response(db: AsyncSession, target_date: date, filters: WeekFilters):
+    monday, friday = week_bounds(target_date)
+    try:
+        events, next_cursor = await get_week_page(
+            db,
+            target_date,
+            min_market_cap=filters.min_market_cap,
+            report_time=filters.report_time,
+            tickers=filters.tickers,
+            limit=filters.limit,
+            cursor=filters.cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return WeekEarningsResponse(
+        week_start=monday,
+        week_end=friday,
+        events=[EarningsEventResponse(**e) for e in events],
+        next_cursor=next_cursor,
+    )
+
+
+async def _week_response(db: AsyncSession, target_date: date, filters: WeekFilters | None = None):
+    """Serve a week from the calendar cache, building and caching it on a miss.
+
+    Cached weeks are dropped whenever an upsert or market-cap enrichment touches one
+    of their rows, so the stored payload is returned as-is. A miss snapshots the
+    week's version first and the write is skipped if an invalidation bumped it
+    while Postgres was being read. Filtered or paginated
+    requests bypass the cache and read just their slice from Postgres.
+    """
+    if filters is not None and filters.active():
+        return await _filtered_week_response(db, target_date, filters)
+
+    monday, friday = week_bounds(target_date)
+    cached = await get_cached_calendar(monday.isoformat())
+    if cached is not None:
+        return JSONResponse(cached)
+
+    version = await get_calendar_version(monday.isoformat())
+    events = await get_week_earnings(db, target_date)
+    response = WeekEarningsResponse(
         week_start=monday,
         week_end=friday,
         events=[_to_response(e) for e in events],
     )
+    if events:
+        await set_cached_calendar(monday.isoformat(), response.model_dump(mode="json"), version=version)
+    return response
+
+
+@router.get("/week", response_model=WeekEarningsResponse)
+async def get_calendar_week(
+    target_date: date = Query(default=None, alias="date"),
+    filters: WeekFilters = Depends(week_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    if target_date is None:
+        target_date = date.today()
+    return await _week_response(db, target_date, filters)
 
 
 @router.get("/week/next", response_model=WeekEarningsResponse)
 async def get_next_week(
     target_date: date = Query(default=None, alias="date"),
+    filters: WeekFilters = Depends(week_filters),
     db: AsyncSession = Depends(get_db),
 ):
     if target_date is None:
         target_date = date.today()
-    next_week = target_date + timedelta(weeks=1)
-    events = await get_week_earnings(db, next_week)
-    monday, friday = week_bounds(next_week)
-
-    return WeekEarningsResponse(
-        week_start=monday,
-        week_end=friday,
-        events=[_to_response(e) for e in events],
-    )
+    return await _week_response(db, target_date + timedelta(weeks=1), filters)
 
 
 @router.get("/week/prev", response_model=WeekEarningsResponse)
 async def get_prev_week(
     target_date: date = Query(default=None, alias="date"),
+    filters: WeekFilters = Depends(week_filters),
     db: AsyncSession = Depends(get_db),
 ):
     if target_date is None:
         target_date = date.today()
-    prev_week = target_date - timedelta(weeks=1)
-    events = await get_week_earnings(db, prev_week)
-    monday, friday = week_bounds(prev_week)
+    return await _week_response(db, target_date - timedelta(weeks=1), filters)
 
-    return WeekEarningsResponse(
-        week_start=monday,
-        week_end=friday,
-        events=[_to_response(e) for e in events],
-    )
 
+# Roughly two quarters; wider spans should be paged by the client.
+_RANGE_MAX_DAYS = 186
 
-_HIGHLIGHTS_LIMIT = 10
 
+def _dump_event(event: dict) -> str:
+    return json.dumps(event, default=date.isoformat, separators=(",", ":"))
 
-@router.get("/highlights", response_model=HighlightsResponse)
-async def get_highlights(
-    db: AsyncSession = Depends(get_db),
-    refresh: bool = False,
+
+async def _ndjson_lines(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for event in events:
+        yield _dump_event(event) + "\n"
+
+
+async def _json_chunks(start: date, end: date, events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    yield f'{{"start":"{start.isoformat()}","end":"{end.isoformat()}","events":['
+    sep = ""
+    async for event in events:
+        yield sep + _dump_event(event)
+        sep = ","
+    yield "]}"
+
+
+@router.get("/range")
+async def get_calendar_range(
+    start: date = Query(...),
+    end: date = Query(...),
+    format: str = Query(default="ndjson", pattern="^(ndjson|json)$"),
 ):
-    if not refresh:
-        cached = await get_cached_highlights()
-        if cached:
-            return HighlightsResponse(**cached)
-
-    today = date.today()
-    anchor = today
-    if anchor.weekday() >= 5:
-        anchor = anchor + timedelta(days=(7 - anchor.weekday()))
-
-    last_mon, last_fri = week_bounds(anchor - timedelta(weeks=1))
-    this_mon, this_fri = week_bounds(anchor)
-
-    last_events = await get_week_earnings(db, last_mon)
-    this_events = await get_week_earnings(db, this_mon)
-
-    last_top = sorted(
-        last_events, key=lambda e: -(e.market_cap or 0)
-    )[:_HIGHLIGHTS_LIMIT]
-    this_top = sorted(
-        this_events, key=lambda e: -(e.market_cap or 0)
-    )[:_HIGHLIGHTS_LIMIT]
-
-    logger.info(
-        "Highlights: last_week top tickers=%s, this_week top tickers=%s",
-        [(e.ticker, e.market_cap) for e in last_top[:5]],
-        [(e.ticker, e.market_cap) for e in this_top[:5]],
-    )
+    """Stream every event in ``[start, end]`` from a single range scan.
 
-    response = HighlightsResponse(
-        last_week=HighlightsSection(
-            week_start=last_mon,
-            week_end=last_fri,
-            events=[_to_response(e) for e in last_top],
-        ),
-        this_week=HighlightsSection(
-            week_start=this_mon,
-            week_end=this_fri,
-            events=[_to_response(e) for e in this_top],
-        ),
-    )
+    ``format=ndjson`` (the default) writes one event per line; ``format=json`` writes
+    a single ``{"start", "end", "events": [...]}`` document in chunks.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days > _RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"range may span at most {_RANGE_MAX_DAYS} days"
+        )
 
-    await set_cached_highlights(response.model_dump(mode="json"))
+    events = stream_range_events(start, end)
+    if format == "json":
+        return StreamingResponse(_json_chunks(start, end, events), media_type="application/json")
+    return StreamingResponse(_ndjson_lines(events), media_type="application/x-ndjson")
 
-    return response
+
+@router.get("/highlights", response_model=HighlightsResponse)
+async def get_highlights(refresh: bool = False):
+    return HighlightsResponse(**await load_highlights(refresh=refresh))
 
 
 @router.get("/sparkline/{ticker}")
 async def get_sparkline(ticker: str):
     upper = ticker.upper().strip()
-
-    cached = await get_cached_sparkline(upper)
-    if cached is not None:
-        return JSONResponse({"ticker": upper, "prices": cached})
-
-    prices = await _fetch_sparkline_yahoo(upper)
-    if prices:
-        await set_cached_sparkline(upper, prices)
-    return JSONResponse({"ticker": upper, "prices": prices})
+    return JSONResponse({"ticker": upper, "prices": await load_sparkline(upper)})
 
 
 @router.get("/sparklines")
 async def get_sparklines(tickers: list[str] = Query(..., alias="t")):
-    result = {}
-    to_fetch = []
-
-    for t in tickers:
-        upper = t.upper().strip()
-        cached = await get_cached_sparkline(upper)
-        if cached is not None:
-            result[upper] = cached
-        else:
-            to_fetch.append(upper)
-
-    if to_fetch:
-        import asyncio
-        tasks = [_fetch_sparkline_yahoo(t) for t in to_fetch]
-        fetched = await asyncio.gather(*tasks, return_exceptions=True)
-        for t, prices in zip(to_fetch, fetched):
-            if isinstance(prices, Exception) or not prices:
-                result[t] = []
-            else:
-                result[t] = prices
-                await set_cached_sparkline(t, prices)
-
-    return JSONResponse(result)
-
-
-async def _fetch_sparkline_yahoo(ticker: str) -> list[float]:
-    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
-    params = {"range": "1mo", "interval": "1d"}
-    headers = {"User-Agent": "Mozilla/5.0"}
+    """Sparklines for many tickers as one ``{ticker: prices}`` object, streamed.
+
+    Cached tickers are read with a single MGET and written first. The rest are
+    derived from their 1M charts (fetched ``SPARKLINE_CONCURRENCY`` at a time when
+    not cached), each written as soon as it finishes, and cached together with one
+    pipelined write.
+    """
+    uppers = list(dict.fromkeys(t.upper().strip() for t in tickers))
+    cached = await get_many_cached_sparklines(uppers, lambda t: partial(fetch_sparkline, t))
+    missing = [t for t, prices in cached.items() if prices is None]
+    return StreamingResponse(_sparkline_chunks(cached, missing), media_type="application/json")
+
+
+async def _sparkline_chunks(cached: dict[str, list[float] | None], missing: list[str]) -> AsyncIterator[str]:
+    yield "{"
+    sep = ""
+    for ticker, prices in cached.items():
+        if prices is not None:
+            yield f"{sep}{json.dumps(ticker)}:{json.dumps(prices)}"
+            sep = ","
+    fetched: dict[str, tuple[list[float], float]] = {}
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(url, params=params, headers=headers)
-        data = resp.json()
-        closes = data["chart"]["result"][0]["indicators"]["quote"][0]["close"]
-        return [round(p, 2) for p in closes if p is not None]
-    except Exception:
-        logger.warning("Yahoo Finance failed for %s, trying Alpha Vantage", ticker)
-
-    settings = get_settings()
-    params = {
-        "function": "TIME_SERIES_DAILY",
-        "symbol": ticker,
-        "outputsize": "compact",
-        "apikey": settings.ALPHA_VANTAGE_API_KEY,
-    }
+        async for ticker, prices, seconds in _fetch_sparklines(missing):
+            fetched[ticker] = (prices, seconds)
+            yield f"{sep}{json.dumps(ticker)}:{json.dumps(prices)}"
+            sep = ","
+    finally:
+        await set_many_cached_sparklines(fetched)
+    yield "}"
+
+
+async def _fetch_sparklines(tickers: list[str]) -> AsyncIterator[tuple[str, list[float], float]]:
+    """Yield ``(ticker, prices, fetch_seconds)`` in completion order."""
+    if not tickers:
+        return
+    semaphore = asyncio.Semaphore(max(1, get_settings().SPARKLINE_CONCURRENCY))
+
+    async def fetch(ticker: str) -> tuple[str, list[float], float]:
+        async with semaphore:
+            started = time.perf_counter()
+            prices = await fetch_sparkline(ticker)
+            return ticker, prices, time.perf_counter() - started
+
+    tasks = [asyncio.create_task(fetch(t)) for t in tickers]
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://www.alphavantage.co/query", params=params
-            )
-        data = resp.json()
-        ts = data.get("Time Series (Daily)", {})
-        if not ts:
-            return []
-        sorted_dates = sorted(ts.keys())[-30:]
-        return [float(ts[d]["4. close"]) for d in sorted_dates]
-    except Exception:
-        logger.exception("All sparkline sources failed for %s", ticker)
-        return []
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,36 +1,191 @@
+import asyncio
 import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from functools import partial
 from typing import Any
 
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 
 from app.config import get_settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.codec import CacheCodec
+from app.services.local_cache import LocalCache
+from app.services.metrics import SIZE_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
 
 _redis_client: redis.Redis | None = None
 
 EARNINGS_CALENDAR_TTL = 4 * 60 * 60  # 4 hours
+CALENDAR_VERSION_TTL = 7 * 24 * 60 * 60  # 7 days, refreshed on every invalidation
 AV_SYNC_TTL = 4 * 60 * 60  # 4 hours - throttle Alpha Vantage bulk syncs
+AV_SYNC_LEASE = 2 * 60  # 2 minutes - single-flight claim on a running sync
+AV_SYNC_RETRY_BACKOFF = 30 * 60  # 30 minutes before an inline sync retries a failure
 MARKET_CAP_TTL = 24 * 60 * 60  # 24 hours
 ANALYSIS_TTL = 7 * 24 * 60 * 60  # 7 days
 ANALYSIS_UNREPORTED_TTL = 4 * 60 * 60  # 4 hours for pre-report analyses
 HIGHLIGHTS_TTL = 4 * 60 * 60  # 4 hours
 SPARKLINE_TTL = 12 * 60 * 60  # 12 hours
+NASDAQ_DAY_TTL = 4 * 60 * 60  # 4 hours for today and upcoming days
+NASDAQ_PAST_DAY_TTL = 7 * 24 * 60 * 60  # 7 days - past days rarely change
+NASDAQ_ENRICHED_TTL = 6 * 60 * 60  # 6 hours between market-cap enrichments of a date
+MARKET_CAP_MISSING_TTL = 24 * 60 * 60  # 24 hours - tickers Nasdaq has no cap for
+TICKER_FRESH_FOR = 6 * 60 * 60  # 6 hours before a searched ticker is refreshed again
+TICKER_REFRESH_RECORD_TTL = 7 * 24 * 60 * 60  # 7 days
+TICKER_REFRESH_LEASE = 60  # 1 minute - single-flight claim on a ticker refresh
 
 
-async def get_redis() -> redis.Redis | None:
+_breaker: CircuitBreaker | None = None
+
+
+def redis_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        settings = get_settings()
+        _breaker = CircuitBreaker(
+            "Redis", settings.REDIS_BREAKER_FAILURES, settings.REDIS_BREAKER_COOLDOWN,
+        )
+    return _breaker
+
+
+def redis_status() -> dict:
+    return {"configured": bool(get_settings().REDIS_URL), **redis_breaker().snapshot()}
+
+
+@registry.collector
+def _breaker_metrics():
+    snapshot = redis_breaker().snapshot()
+    is_open = 0 if snapshot["state"] == "closed" else 1
+    yield "cache_redis_circuit_open", "gauge", "1 while the Redis circuit breaker is open or half-open.", [
+        ("", {}, is_open),
+    ]
+    yield "cache_redis_circuit_trips", "counter", "Times the Redis circuit breaker has opened.", [
+        ("_total", {}, snapshot["trips"]),
+    ]
+
+
+_lookups = registry.counter(
+    "cache_lookups", "Cache reads by key family and the tier that answered (l1, redis or miss).",
+    ("family", "result"),
+)
+_redis_seconds = registry.histogram(
+    "cache_redis_command_seconds", "Redis round-trip latency by key family and command.",
+    ("family", "command"),
+)
+_redis_errors = registry.counter(
+    "cache_redis_errors", "Failed Redis commands by key family and command.", ("family", "command"),
+)
+_value_bytes = registry.histogram(
+    "cache_value_bytes", "Size of values written to (write) and read from (read) Redis.",
+    ("family", "op"), buckets=SIZE_BUCKETS,
+)
+
+
+def key_family(key: str | bytes) -> str:
+    """``earnings:calendar:2026-02-16`` -> ``calendar``, ``chart:AAPL:1M`` -> ``chart``."""
+    if isinstance(key, bytes):
+        key = key.decode(errors="replace")
+    parts = str(key).split(":", 2)
+    if parts[0] == "earnings" and len(parts) > 1:
+        return parts[1]
+    return parts[0]
+
+
+def _command_family(args: tuple) -> str:
+    if len(args) < 2:
+        return "none"
+    if args[0] in ("EVAL", "EVALSHA"):
+        return key_family(args[3]) if len(args) > 3 and int(args[2]) > 0 else "none"
+    return key_family(args[1])
+
+
+def _observe_written(family: str, args: tuple):
+    if args[0] == "SETEX" and len(args) == 4:
+        _value_bytes.observe(len(args[3]), family, "write")
+    elif args[0] == "SET" and len(args) >= 3:
+        _value_bytes.observe(len(args[2]), family, "write")
+
+
+def _observe_read(family: str, result: Any):
+    for value in result if isinstance(result, list) else (result,):
+        if isinstance(value, bytes):
+            _value_bytes.observe(len(value), family, "read")
+
+
+async def _guarded(family: str, command: str, call):
+    """Await a Redis call, timing it and reporting reachability to the breaker."""
+    started = time.perf_counter()
+    try:
+        result = await call
+    except Exception as e:
+        _redis_errors.inc(family, command)
+        if isinstance(e, (RedisConnectionError, RedisTimeoutError)):
+            redis_breaker().record_failure()
+        raise
+    finally:
+        _redis_seconds.observe(time.perf_counter() - started, family, command)
+    redis_breaker().record_success()
+    return result
+
+
+class _BreakerPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        stack = [args for args, _ in self.command_stack]
+        family = _command_family(stack[0]) if stack else "none"
+        for args in stack:
+            _observe_written(_command_family(args), args)
+        return await _guarded(family, "PIPELINE", super().execute(raise_on_error))
+
+
+class _BreakerRedis(redis.Redis):
+    async def execute_command(self, *args, **options):
+        family, command = _command_family(args), str(args[0])
+        _observe_written(family, args)
+        result = await _guarded(family, command, super().execute_command(*args, **options))
+        if command in ("GET", "MGET"):
+            _observe_read(family, result)
+        return result
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return _BreakerPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def _client() -> redis.Redis | None:
     global _redis_client
     settings = get_settings()
     if not settings.REDIS_URL:
         return None
     if _redis_client is None:
-        _redis_client = redis.from_url(
+        _redis_client = _BreakerRedis.from_url(
             settings.REDIS_URL,
-            decode_responses=True,
+            # Values are codec bytes; see app/services/codec.py.
+            decode_responses=False,
             socket_connect_timeout=2,
             socket_timeout=2,
         )
     return _redis_client
 
 
+async def get_redis() -> redis.Redis | None:
+    """The shared client, or None without ``REDIS_URL`` or while the breaker is open.
+
+    Every helper treats None as "no Redis" and falls back to its in-process path, so
+    an outage costs a few timed-out calls rather than two seconds per cache call.
+    """
+    client = _client()
+    if client is None or not redis_breaker().allow():
+        return None
+    return client
+
+
 async def close_redis():
     global _redis_client
     if _redis_client is not None:
@@ -38,6 +193,180 @@ async def close_redis():
         _redis_client = None
 
 
+_codec: CacheCodec | None = None
+
+
+def codec() -> CacheCodec:
+    global _codec
+    if _codec is None:
+        settings = get_settings()
+        _codec = CacheCodec(settings.CACHE_COMPRESSION, settings.CACHE_COMPRESS_MIN_BYTES)
+    return _codec
+
+
+# --- In-process L1 -----------------------------------------------------------
+#
+# Reads check a per-process LRU before Redis, and Redis hits are copied into it.
+# Writes and deletes update the local copy and publish the keys on a pub/sub
+# channel so every other worker evicts them.
+
+_INVALIDATION_CHANNEL = "earnings:l1:invalidate"
+_INSTANCE_ID = uuid.uuid4().hex
+_local_cache: LocalCache | None = None
+
+
+def local_cache() -> LocalCache:
+    global _local_cache
+    if _local_cache is None:
+        settings = get_settings()
+        disabled = {f.strip() for f in settings.L1_CACHE_DISABLED.split(",") if f.strip()}
+        _local_cache = LocalCache(
+            settings.L1_CACHE_MAX_ENTRIES,
+            settings.L1_CACHE_TTL,
+            disabled,
+            # Parsed Nasdaq days only change when refetched, which publishes an eviction.
+            family_ttls={"nasdaq_day": NASDAQ_PAST_DAY_TTL},
+        )
+    return _local_cache
+
+
+def l1_stats() -> dict:
+    cache = local_cache()
+    return {"entries": len(cache), "families": cache.stats()}
+
+
+@registry.collector
+def _l1_metrics():
+    cache = local_cache()
+    events = [
+        ("_total", {"family": family, "event": event}, n)
+        for family, stats in sorted(cache.stats().items())
+        for event, n in stats.items()
+    ]
+    yield "cache_l1_events", "counter", "L1 hits, misses, evictions and expirations by key family.", events
+    yield "cache_l1_entries", "gauge", "Entries held in the L1 cache.", [("", {}, len(cache))]
+
+
+async def _publish_invalidation(keys: list[str]):
+    r = await get_redis()
+    if r is None or not keys:
+        return
+    try:
+        await r.publish(_INVALIDATION_CHANNEL, json.dumps({"origin": _INSTANCE_ID, "keys": keys}))
+    except Exception:
+        pass
+
+
+def _as_stored(value: Any) -> Any:
+    """``value`` as it reads back from Redis, so L1 hits match Redis hits."""
+    return json.loads(json.dumps(value, default=str))
+
+
+async def _l1_store(family: str, values: dict[str, Any], ttl: int):
+    """Record values this process just wrote and evict them everywhere else."""
+    cache = local_cache()
+    for key, value in values.items():
+        cache.set(family, key, value, ttl)
+    if cache.enabled(family):
+        await _publish_invalidation(list(values))
+
+
+async def _l1_evict(keys: list[str]):
+    local_cache().delete(*keys)
+    await _publish_invalidation(keys)
+
+
+def _apply_invalidation(data: str | bytes):
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return
+    if message.get("origin") != _INSTANCE_ID:
+        local_cache().delete(*message.get("keys", []))
+
+
+async def listen_for_invalidations():
+    """Evict L1 entries that other workers publish; run as a long-lived task.
+
+    Messages sent while disconnected are lost, so the whole L1 is dropped on every
+    (re)subscribe.
+    """
+    backoff = 1
+    while True:
+        # The listener reconnects on its own schedule rather than the breaker's.
+        r = _client()
+        if r is None:
+            return
+        pubsub = r.pubsub()
+        try:
+            await pubsub.subscribe(_INVALIDATION_CHANNEL)
+            local_cache().clear()
+            backoff = 1
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    _apply_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("L1 invalidation listener lost Redis (%s), retrying in %ds", e, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+
+def start_invalidation_listener() -> asyncio.Task | None:
+    if not get_settings().REDIS_URL:
+        return None
+    return asyncio.create_task(listen_for_invalidations(), name="l1-invalidation")
+
+
+async def _get_json(family: str, key: str, ttl: int) -> Any | None:
+    cache = local_cache()
+    value = cache.get(family, key)
+    if value is not None:
+        _lookups.inc(family, "l1")
+        return value
+    r = await get_redis()
+    if r is not None:
+        try:
+            data = await r.get(key)
+            if data:
+                value = codec().decode(data)
+                cache.set(family, key, value, ttl)
+                _lookups.inc(family, "redis")
+                return value
+        except Exception:
+            pass
+    _lookups.inc(family, "miss")
+    return None
+
+
+async def _mget_json(family: str, keys: list[str], ttl: int) -> dict[str, Any | None]:
+    cache = local_cache()
+    result = {k: cache.get(family, k) for k in keys}
+    missing = [k for k in keys if result[k] is None]
+    _lookups.inc(family, "l1", amount=len(keys) - len(missing))
+    r = await get_redis() if missing else None
+    if r is not None:
+        try:
+            values = await r.mget(missing)
+            for key, data in zip(missing, values):
+                if data:
+                    result[key] = codec().decode(data)
+                    cache.set(family, key, result[key], ttl)
+        except Exception:
+            pass
+    still_missing = sum(1 for k in missing if result[k] is None)
+    _lookups.inc(family, "redis", amount=len(missing) - still_missing)
+    _lookups.inc(family, "miss", amount=still_missing)
+    return result
+
+
 def _calendar_key(week_start: str) -> str:
     return f"earnings:calendar:{week_start}"
 
@@ -46,47 +375,96 @@ def _market_cap_key(ticker: str) -> str:
     return f"earnings:mcap:{ticker.upper()}"
 
 
-async def get_cached_calendar(week_start: str) -> list[dict] | None:
+async def get_cached_calendar(week_start: str) -> dict | None:
+    return await _get_json("calendar", _calendar_key(week_start), EARNINGS_CALENDAR_TTL)
+
+
+def _calendar_version_key(week_start: str) -> str:
+    return f"earnings:calendar_version:{week_start}"
+
+
+# Invalidations of each week seen by this process; Redis holds the shared count.
+_calendar_generations: dict[str, int] = {}
+
+# (local generation, Redis version or None when Redis could not be read)
+CalendarVersion = tuple[int, int | None]
+
+_SET_IF_VERSION_SCRIPT = """
+if tonumber(redis.call("get", KEYS[2]) or "0") ~= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+
+
+async def get_calendar_version(week_start: str) -> CalendarVersion:
+    """Snapshot the week's invalidation count; take it before reading Postgres."""
+    local = _calendar_generations.get(week_start, 0)
     r = await get_redis()
     if r is None:
-        return None
+        return local, None
     try:
-        data = await r.get(_calendar_key(week_start))
-        if data:
-            return json.loads(data)
+        return local, int(await r.get(_calendar_version_key(week_start)) or 0)
     except Exception:
-        pass
-    return None
+        return local, None
+
 
+async def set_cached_calendar(week_start: str, payload: dict, version: CalendarVersion | None = None):
+    """Cache a built week.
 
-async def set_cached_calendar(week_start: str, events: list[dict]):
+    With ``version`` the write is dropped if the week was invalidated since that
+    snapshot, so a payload read before an upsert cannot overwrite the eviction.
+    """
+    key = _calendar_key(week_start)
+    if version is not None and version[0] != _calendar_generations.get(week_start, 0):
+        return
     r = await get_redis()
     if r is None:
+        await _l1_store("calendar", {key: payload}, EARNINGS_CALENDAR_TTL)
         return
     try:
-        await r.setex(
-            _calendar_key(week_start),
-            EARNINGS_CALENDAR_TTL,
-            json.dumps(events),
-        )
+        if version is None:
+            await r.setex(key, EARNINGS_CALENDAR_TTL, codec().encode(payload))
+        elif version[1] is None or not await r.eval(
+            _SET_IF_VERSION_SCRIPT, 2, key, _calendar_version_key(week_start),
+            codec().encode(payload), EARNINGS_CALENDAR_TTL, version[1],
+        ):
+            return
     except Exception:
-        pass
+        if version is not None:
+            return
+    await _l1_store("calendar", {key: payload}, EARNINGS_CALENDAR_TTL)
 
 
-async def get_cached_market_cap(ticker: str) -> float | None:
+async def invalidate_cached_calendars(week_starts: list[str]):
+    """Drop the weeks' calendar and highlights entries and bump their versions."""
+    if not week_starts:
+        return
+    for week_start in week_starts:
+        _calendar_generations[week_start] = _calendar_generations.get(week_start, 0) + 1
+    keys = [_calendar_key(w) for w in week_starts] + [_highlights_key(w) for w in week_starts]
+    await _l1_evict(keys)
     r = await get_redis()
     if r is None:
-        return None
+        return
     try:
-        data = await r.get(_market_cap_key(ticker))
-        if data:
-            return float(data)
+        pipe = r.pipeline()
+        pipe.delete(*keys)
+        for week_start in week_starts:
+            pipe.incr(_calendar_version_key(week_start))
+            pipe.expire(_calendar_version_key(week_start), CALENDAR_VERSION_TTL)
+        await pipe.execute()
     except Exception:
         pass
-    return None
+
+
+async def get_cached_market_cap(ticker: str) -> float | None:
+    return await _get_json("mcap", _market_cap_key(ticker), MARKET_CAP_TTL)
 
 
 async def set_cached_market_cap(ticker: str, market_cap: float):
+    await _l1_store("mcap", {_market_cap_key(ticker): market_cap}, MARKET_CAP_TTL)
     r = await get_redis()
     if r is None:
         return
@@ -101,21 +479,12 @@ async def set_cached_market_cap(ticker: str, market_cap: float):
 
 
 async def get_many_cached_market_caps(tickers: list[str]) -> dict[str, float | None]:
-    r = await get_redis()
-    if r is None:
-        return {t: None for t in tickers}
-    try:
-        keys = [_market_cap_key(t) for t in tickers]
-        values = await r.mget(keys)
-        result = {}
-        for ticker, val in zip(tickers, values):
-            result[ticker] = float(val) if val else None
-        return result
-    except Exception:
-        return {t: None for t in tickers}
+    by_key = await _mget_json("mcap", [_market_cap_key(t) for t in tickers], MARKET_CAP_TTL)
+    return {t: by_key[_market_cap_key(t)] for t in tickers}
 
 
 async def set_many_cached_market_caps(caps: dict[str, float]):
+    await _l1_store("mcap", {_market_cap_key(t): cap for t, cap in caps.items()}, MARKET_CAP_TTL)
     r = await get_redis()
     if r is None:
         return
@@ -133,58 +502,132 @@ def _analysis_key(ticker: str, quarter: str) -> str:
 
 
 async def get_cached_analysis_redis(ticker: str, quarter: str) -> dict | None:
-    r = await get_redis()
-    if r is None:
-        return None
-    try:
-        data = await r.get(_analysis_key(ticker, quarter))
-        if data:
-            return json.loads(data)
-    except Exception:
-        pass
-    return None
+    # Unreported analyses expire sooner, so L1 entries never outlive the shorter TTL.
+    return await _get_json("analysis", _analysis_key(ticker, quarter), ANALYSIS_UNREPORTED_TTL)
 
 
 async def set_cached_analysis_redis(ticker: str, quarter: str, analysis: dict):
+    ttl = ANALYSIS_UNREPORTED_TTL if analysis.get("has_reported") is False else ANALYSIS_TTL
+    await _l1_store("analysis", {_analysis_key(ticker, quarter): _as_stored(analysis)}, ttl)
     r = await get_redis()
     if r is None:
         return
     try:
-        ttl = ANALYSIS_UNREPORTED_TTL if analysis.get("has_reported") is False else ANALYSIS_TTL
         await r.setex(
             _analysis_key(ticker, quarter),
             ttl,
-            json.dumps(analysis, default=str),
+            codec().encode(analysis),
         )
     except Exception:
         pass
 
 
-_HIGHLIGHTS_KEY = "earnings:highlights"
+def _nasdaq_day_key(day: str) -> str:
+    return f"earnings:nasdaq:{day}"
 
 
-async def get_cached_highlights() -> dict | None:
+async def get_many_cached_nasdaq_days(days: list[str]) -> dict[str, list[dict] | None]:
+    by_key = await _mget_json("nasdaq_day", [_nasdaq_day_key(d) for d in days], NASDAQ_DAY_TTL)
+    return {d: by_key[_nasdaq_day_key(d)] for d in days}
+
+
+async def set_many_cached_nasdaq_days(days: dict[str, list[dict]], ttls: dict[str, int]):
+    cache = local_cache()
+    for day, rows in days.items():
+        cache.set("nasdaq_day", _nasdaq_day_key(day), rows, ttls[day])
+    if cache.enabled("nasdaq_day"):
+        await _publish_invalidation([_nasdaq_day_key(d) for d in days])
+
     r = await get_redis()
     if r is None:
-        return None
+        return
     try:
-        data = await r.get(_HIGHLIGHTS_KEY)
-        if data:
-            return json.loads(data)
+        pipe = r.pipeline()
+        for day, rows in days.items():
+            pipe.setex(_nasdaq_day_key(day), ttls[day], codec().encode(rows))
+        await pipe.execute()
     except Exception:
         pass
-    return None
 
 
-async def set_cached_highlights(highlights: dict):
+def _enrichment_marker_key(day: str) -> str:
+    return f"earnings:nasdaq_enriched:{day}"
+
+
+def _market_cap_missing_key(ticker: str) -> str:
+    return f"earnings:mcap_missing:{ticker.upper()}"
+
+
+async def get_many_enrichment_markers(days: list[str]) -> dict[str, dict | None]:
+    r = await get_redis()
+    if r is None or not days:
+        return {d: None for d in days}
+    try:
+        values = await r.mget([_enrichment_marker_key(d) for d in days])
+        return {d: codec().decode(v) if v else None for d, v in zip(days, values)}
+    except Exception:
+        return {d: None for d in days}
+
+
+async def set_many_enrichment_markers(markers: dict[str, dict]):
+    """Record per date when market caps were last enriched and how many events were filled."""
+    r = await get_redis()
+    if r is None or not markers:
+        return
+    try:
+        pipe = r.pipeline()
+        for day, marker in markers.items():
+            pipe.setex(_enrichment_marker_key(day), NASDAQ_ENRICHED_TTL, codec().encode(marker))
+        await pipe.execute()
+    except Exception:
+        pass
+
+
+async def get_missing_market_caps(tickers: list[str]) -> set[str]:
+    r = await get_redis()
+    if r is None or not tickers:
+        return set()
+    try:
+        values = await r.mget([_market_cap_missing_key(t) for t in tickers])
+        return {t for t, v in zip(tickers, values) if v}
+    except Exception:
+        return set()
+
+
+async def set_missing_market_caps(tickers: list[str]):
+    """Negative-cache tickers the Nasdaq calendar reported without a market cap."""
+    r = await get_redis()
+    if r is None or not tickers:
+        return
+    try:
+        pipe = r.pipeline()
+        for ticker in tickers:
+            pipe.setex(_market_cap_missing_key(ticker), MARKET_CAP_MISSING_TTL, "1")
+        await pipe.execute()
+    except Exception:
+        pass
+
+
+def _highlights_key(week_start: str) -> str:
+    return f"earnings:highlights:{week_start}"
+
+
+async def get_cached_highlights(week_starts: list[str]) -> dict[str, dict | None]:
+    """Cached highlight sections keyed by week start; misses map to None."""
+    by_key = await _mget_json("highlights", [_highlights_key(w) for w in week_starts], HIGHLIGHTS_TTL)
+    return {w: by_key[_highlights_key(w)] for w in week_starts}
+
+
+async def set_cached_highlights(week_start: str, section: dict):
+    await _l1_store("highlights", {_highlights_key(week_start): _as_stored(section)}, HIGHLIGHTS_TTL)
     r = await get_redis()
     if r is None:
         return
     try:
         await r.setex(
-            _HIGHLIGHTS_KEY,
+            _highlights_key(week_start),
             HIGHLIGHTS_TTL,
-            json.dumps(highlights, default=str),
+            codec().encode(section),
         )
     except Exception:
         pass
@@ -194,54 +637,299 @@ def _sparkline_key(ticker: str) -> str:
     return f"earnings:sparkline:{ticker.upper()}"
 
 
-async def get_cached_sparkline(ticker: str) -> list[float] | None:
+async def cached_sparkline(
+    ticker: str, fetch: Callable[[], Awaitable[list[float]]], min_fresh: float | None = None,
+) -> list[float]:
+    return await cached_fetch(_sparkline_key(ticker), fetch, SPARKLINE_TTL, family="sparkline", min_fresh=min_fresh)
+
+
+async def get_many_cached_sparklines(
+    tickers: list[str], fetch_for: Callable[[str], Callable[[], Awaitable[list[float]]]],
+) -> dict[str, list[float] | None]:
+    """Cached sparklines for ``tickers`` from one MGET, None where nothing is cached.
+
+    As with ``cached_sparkline``, stale prices are returned and refreshed in the
+    background with ``fetch_for(ticker)``. Misses are left to the caller, which
+    stores what it fetches with ``set_many_cached_sparklines``.
+    """
+    hard_ttl = _hard_ttl(SPARKLINE_TTL)
+    keys = {_sparkline_key(t): t for t in tickers}
+    entries = await _mget_json("sparkline", list(keys), hard_ttl)
+    return {
+        ticker: _serve_cached(key, entries[key], ("sparkline", fetch_for(ticker), SPARKLINE_TTL, hard_ttl, bool))
+        for key, ticker in keys.items()
+    }
+
+
+async def set_many_cached_sparklines(fetched: dict[str, tuple[list[float], float]]):
+    """Store ``{ticker: (prices, fetch_seconds)}`` with one pipelined write, skipping empty prices."""
+    hard_ttl = _hard_ttl(SPARKLINE_TTL)
+    entries = {
+        _sparkline_key(t): (_envelope(prices, SPARKLINE_TTL, seconds), _stored_ttl(SPARKLINE_TTL, hard_ttl))
+        for t, (prices, seconds) in fetched.items()
+        if prices
+    }
+    if not entries:
+        return
+    await _l1_store("sparkline", {key: entry for key, (entry, _) in entries.items()}, hard_ttl)
     r = await get_redis()
     if r is None:
-        return None
+        return
     try:
-        data = await r.get(_sparkline_key(ticker))
-        if data:
-            return json.loads(data)
+        pipe = r.pipeline()
+        for key, (entry, ttl) in entries.items():
+            pipe.setex(key, ttl, codec().encode(entry))
+        await pipe.execute()
     except Exception:
         pass
-    return None
 
 
-async def set_cached_sparkline(ticker: str, prices: list[float]):
+def _family(key: str) -> str:
+    """Generic keys are grouped by their first segment, e.g. ``chart`` or ``news``."""
+    return key.split(":", 1)[0]
+
+
+async def get_cached(key: str) -> Any | None:
+    # The key's TTL isn't known on a read; L1_CACHE_TTL is kept below the shortest
+    # TTL callers pass to ``set_cached``.
+    return await _get_json(_family(key), key, get_settings().L1_CACHE_TTL)
+
+
+async def set_cached(key: str, value: Any, ttl: int = 3600):
+    await _l1_store(_family(key), {key: _as_stored(value)}, ttl)
     r = await get_redis()
     if r is None:
         return
     try:
-        await r.setex(
-            _sparkline_key(ticker),
-            SPARKLINE_TTL,
-            json.dumps(prices),
-        )
+        await r.setex(key, ttl, codec().encode(value))
     except Exception:
         pass
 
 
-async def get_cached(key: str) -> Any | None:
+# Stale-while-revalidate for upstream responses. Values are wrapped in an envelope
+# carrying a soft expiry (wall-clock seconds, shared by every worker) and how long
+# the fetch took; Redis keeps the envelope until the hard TTL.
+SWR_REFRESH_LEASE = 30  # seconds - single-flight claim on a background refresh
+
+_swr_refreshes: dict[str, asyncio.Task] = {}
+
+
+def _swr_lock_key(key: str) -> str:
+    return f"earnings:swr_lock:{key}"
+
+
+def _jittered(ttl: float) -> float:
+    spread = ttl * get_settings().CACHE_TTL_JITTER
+    return ttl + random.uniform(-spread, spread)
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and entry.keys() == {"v", "soft", "delta"}
+
+
+def _envelope(value: Any, soft_ttl: int, fetch_seconds: float) -> dict:
+    return {"v": value, "soft": time.time() + _jittered(soft_ttl), "delta": round(fetch_seconds, 3)}
+
+
+def _hard_ttl(soft_ttl: int) -> int:
+    return soft_ttl * max(get_settings().CACHE_STALE_FACTOR, 1)
+
+
+def _stored_ttl(soft_ttl: int, hard_ttl: int) -> int:
+    return max(int(_jittered(hard_ttl)), soft_ttl)
+
+
+def should_refresh_early(soft_expires_at: float, delta: float, now: float, beta: float) -> bool:
+    """XFetch: refresh once ``now - delta * beta * ln(U)`` passes the soft expiry.
+
+    ``-ln(U)`` is exponentially distributed, so a value that took ``delta`` seconds
+    to fetch is refreshed early with a probability that grows as its expiry nears,
+    and a hot key is usually refreshed by one request well before it goes stale.
+    """
+    return now - delta * beta * math.log(1.0 - random.random()) >= soft_expires_at
+
+
+async def _fetch_and_store(
+    key: str,
+    family: str,
+    fetch: Callable[[], Awaitable[Any]],
+    soft_ttl: int,
+    hard_ttl: int,
+    keep: Callable[[Any], bool],
+) -> Any:
+    started = time.perf_counter()
+    value = await fetch()
+    if not keep(value):
+        return value
+    entry = _envelope(value, soft_ttl, time.perf_counter() - started)
+    ttl = _stored_ttl(soft_ttl, hard_ttl)
+    await _l1_store(family, {key: _as_stored(entry)}, ttl)
     r = await get_redis()
     if r is None:
-        return None
+        return value
     try:
-        data = await r.get(key)
-        if data:
-            return json.loads(data)
+        await r.setex(key, ttl, codec().encode(entry))
     except Exception:
         pass
-    return None
+    return value
 
 
-async def set_cached(key: str, value: Any, ttl: int = 3600):
+async def _refresh(key: str, *args):
+    token = await _acquire_lock(_swr_lock_key(key), SWR_REFRESH_LEASE * 1000)
+    if token is None:
+        return  # another worker is already refreshing this key
+    try:
+        await _fetch_and_store(key, *args)
+    except Exception:
+        logger.warning("Background refresh of %s failed, serving the stale value", key, exc_info=True)
+    finally:
+        await _release_lock(_swr_lock_key(key), token)
+
+
+def _schedule_refresh(key: str, *args):
+    task = _swr_refreshes.get(key)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh(key, *args))
+        _swr_refreshes[key] = task
+        task.add_done_callback(lambda _: _swr_refreshes.pop(key, None))
+
+
+# Cache misses for the same key share one upstream fetch: callers in this process
+# await the same task, and across workers the first to take the lock fetches while
+# the others wait for it to publish the result.
+SINGLE_FLIGHT_LEASE = 15  # seconds - a fetch holding the lock longer is presumed dead
+SINGLE_FLIGHT_WAIT = 10  # seconds to wait on another worker before fetching ourselves
+
+_flights: dict[str, asyncio.Task] = {}
+
+
+def _flight_lock_key(key: str) -> str:
+    return f"earnings:flight_lock:{key}"
+
+
+def _flight_channel(key: str) -> str:
+    return f"earnings:flight_done:{key}"
+
+
+async def _await_flight_result(pubsub, timeout: float) -> tuple[bool, Any]:
+    """The result another worker published for this flight, as ``(found, value)``."""
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+        if message is None:
+            continue
+        result = codec().decode(message["data"])
+        return result["ok"], result.get("v")
+    return False, None
+
+
+async def _lead_flight(r: redis.Redis, key: str, fetch: Callable[[], Awaitable[Any]], token: str) -> Any:
+    ok, value = False, None
+    try:
+        value = await fetch()
+        ok = True
+        return value
+    finally:
+        try:
+            await r.publish(_flight_channel(key), codec().encode({"ok": ok, "v": value}))
+        except Exception:
+            pass
+        await _release_lock(_flight_lock_key(key), token)
+
+
+async def _fly(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
     r = await get_redis()
     if r is None:
-        return
+        return await fetch()
+    pubsub = r.pubsub()
     try:
-        await r.setex(key, ttl, json.dumps(value, default=str))
-    except Exception:
-        pass
+        try:
+            # Subscribe before trying the lock, so a holder finishing in between
+            # can't publish before we listen.
+            await pubsub.subscribe(_flight_channel(key))
+        except Exception:
+            return await fetch()
+        token = await _acquire_lock(_flight_lock_key(key), SINGLE_FLIGHT_LEASE * 1000)
+        if token is not None:
+            return await _lead_flight(r, key, fetch, token)
+        try:
+            found, value = await _await_flight_result(pubsub, SINGLE_FLIGHT_WAIT)
+        except Exception:
+            found, value = False, None
+        if found:
+            return value
+        logger.info("No result from the worker fetching %s, fetching it here", key)
+        return await fetch()
+    finally:
+        try:
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+
+async def single_flight(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``fetch()`` once for all concurrent callers asking for ``key``.
+
+    Callers in this process share one task. With Redis, the worker holding the
+    ``SINGLE_FLIGHT_LEASE`` lock runs the fetch and publishes its result; the others
+    wait for that result up to ``SINGLE_FLIGHT_WAIT`` seconds and fall back to their
+    own fetch if it fails or never arrives. A caller being cancelled does not
+    cancel the shared fetch.
+    """
+    task = _flights.get(key)
+    if task is None:
+        task = asyncio.create_task(_fly(key, fetch))
+        _flights[key] = task
+        task.add_done_callback(lambda _: _flights.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def cached_fetch(
+    key: str,
+    fetch: Callable[[], Awaitable[Any]],
+    ttl: int,
+    *,
+    family: str | None = None,
+    keep: Callable[[Any], bool] = bool,
+    min_fresh: float | None = None,
+) -> Any:
+    """Return the cached result of ``fetch()``, refreshing it in the background.
+
+    Within ``ttl`` the cached value is returned as is, except that XFetch may start
+    a refresh early. Past ``ttl`` and up to ``CACHE_STALE_FACTOR * ttl`` the stale
+    value is still returned immediately while one background task (per process, and
+    per key across workers) fetches a new one. Only a cold or fully expired key waits
+    on ``fetch``, and concurrent misses share one fetch through ``single_flight``.
+    Results for which ``keep`` is false (failed upstream calls) are returned but
+    never cached, so they can't replace a good stale value.
+
+    With ``min_fresh`` (used by the cache warmer), a value that is stale or goes
+    stale within that many seconds is refetched before returning instead.
+    """
+    family = family or _family(key)
+    hard_ttl = _hard_ttl(ttl)
+    args = (family, fetch, ttl, hard_ttl, keep)
+
+    entry = await _get_json(family, key, hard_ttl)
+    if min_fresh is not None and not (_is_envelope(entry) and entry["soft"] > time.time() + min_fresh):
+        return await single_flight(key, partial(_fetch_and_store, key, *args))
+    value = _serve_cached(key, entry, args)
+    if value is not None:
+        return value
+    return await single_flight(key, partial(_fetch_and_store, key, *args))
+
+
+def _serve_cached(key: str, entry: Any, args: tuple) -> Any | None:
+    """The value to serve from a cached ``entry``, scheduling a refresh when due."""
+    if _is_envelope(entry):
+        beta = get_settings().CACHE_XFETCH_BETA
+        if should_refresh_early(entry["soft"], entry["delta"], time.time(), beta):
+            _schedule_refresh(key, *args)
+        return entry["v"]
+    if entry is not None:
+        # Written by ``set_cached`` before envelopes existed; its age is unknown.
+        _schedule_refresh(key, *args)
+    return entry
 
 
 _AV_SYNC_KEY = "earnings:av_last_sync"
@@ -265,3 +953,119 @@ async def mark_alpha_vantage_synced():
         await r.setex(_AV_SYNC_KEY, AV_SYNC_TTL, "1")
     except Exception:
         pass
+
+
+async def mark_alpha_vantage_failed():
+    """Hold off inline syncs for ``AV_SYNC_RETRY_BACKOFF`` without shortening a success marker."""
+    r = await get_redis()
+    if r is None:
+        return
+    try:
+        await r.set(_AV_SYNC_KEY, "failed", ex=AV_SYNC_RETRY_BACKOFF, nx=True)
+    except Exception:
+        pass
+
+
+def _job_lock_key(name: str) -> str:
+    return f"scheduler:lock:{name}"
+
+
+# Deletes the lock only if it still holds our token, so an expired lease never
+# releases a lock another replica has since acquired.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+async def _acquire_lock(key: str, lease_ms: int) -> str | None:
+    """SET NX PX a random token. Returns it, or None if the lock is held elsewhere.
+
+    Without Redis (or when it errors) the caller is treated as the only process.
+    """
+    token = uuid.uuid4().hex
+    r = await get_redis()
+    if r is None:
+        return token
+    try:
+        if await r.set(key, token, nx=True, px=lease_ms):
+            return token
+        return None
+    except Exception:
+        return token
+
+
+async def _release_lock(key: str, token: str):
+    r = await get_redis()
+    if r is None:
+        return
+    try:
+        await r.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+    except Exception:
+        pass
+
+
+async def acquire_job_lock(name: str, lease_ms: int) -> str | None:
+    return await _acquire_lock(_job_lock_key(name), lease_ms)
+
+
+async def release_job_lock(name: str, token: str):
+    await _release_lock(_job_lock_key(name), token)
+
+
+_AV_SYNC_LOCK_KEY = "earnings:av_sync_lock"
+
+
+async def claim_alpha_vantage_sync() -> str | None:
+    """Claim the right to run the next Alpha Vantage sync for ``AV_SYNC_LEASE`` seconds."""
+    return await _acquire_lock(_AV_SYNC_LOCK_KEY, AV_SYNC_LEASE * 1000)
+
+
+async def release_alpha_vantage_sync(token: str):
+    await _release_lock(_AV_SYNC_LOCK_KEY, token)
+
+
+def _ticker_refreshed_key(ticker: str) -> str:
+    return f"earnings:ticker_refreshed:{ticker.upper()}"
+
+
+def _ticker_refresh_lock_key(ticker: str) -> str:
+    return f"earnings:ticker_refresh_lock:{ticker.upper()}"
+
+
+# Fallback freshness records when Redis is not configured.
+_ticker_refreshed_local: dict[str, datetime] = {}
+
+
+async def get_ticker_refreshed_at(ticker: str) -> datetime | None:
+    r = await get_redis()
+    if r is None:
+        return _ticker_refreshed_local.get(ticker.upper())
+    try:
+        data = await r.get(_ticker_refreshed_key(ticker))
+        if data:
+            return datetime.fromisoformat(data.decode() if isinstance(data, bytes) else data)
+    except Exception:
+        pass
+    return None
+
+
+async def set_ticker_refreshed_at(ticker: str, when: datetime):
+    r = await get_redis()
+    if r is None:
+        _ticker_refreshed_local[ticker.upper()] = when
+        return
+    try:
+        await r.setex(_ticker_refreshed_key(ticker), TICKER_REFRESH_RECORD_TTL, when.isoformat())
+    except Exception:
+        pass
+
+
+async def claim_ticker_refresh(ticker: str) -> str | None:
+    return await _acquire_lock(_ticker_refresh_lock_key(ticker), TICKER_REFRESH_LEASE * 1000)
+
+
+async def release_ticker_refresh(ticker: str, token: str):
+    await _release_lock(_ticker_refresh_lock_key(ticker), token)
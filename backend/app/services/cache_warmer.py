@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.models import EarningsEvent, UserFavorite
+from app.services.earnings_calendar import week_bounds
+from app.services.highlights import load_highlights
+from app.services.news import load_news
+from app.services.price_series import load_chart, load_sparkline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmStats:
+    tickers: int = 0
+    loads: int = 0
+    failed: int = 0
+
+
+async def top_reporters(db: AsyncSession, start: date, end: date, limit: int) -> list[str]:
+    """Tickers reporting between ``start`` and ``end``, largest market cap first."""
+    if limit <= 0:
+        return []
+    result = await db.execute(
+        select(EarningsEvent.ticker)
+        .where(EarningsEvent.report_date >= start, EarningsEvent.report_date <= end)
+        .group_by(EarningsEvent.ticker)
+        .order_by(func.max(EarningsEvent.market_cap).desc().nulls_last(), EarningsEvent.ticker)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def most_favorited(db: AsyncSession, limit: int) -> list[str]:
+    if limit <= 0:
+        return []
+    result = await db.execute(
+        select(UserFavorite.ticker)
+        .group_by(UserFavorite.ticker)
+        .order_by(func.count().desc(), UserFavorite.ticker)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def hot_tickers(db: AsyncSession, today: date | None = None) -> list[str]:
+    """This and next week's biggest reporters, then the most favorited tickers."""
+    settings = get_settings()
+    monday, _ = week_bounds(today or date.today())
+    reporters = await top_reporters(db, monday, monday + timedelta(days=11), settings.WARM_TOP_N)
+    favorites = await most_favorited(db, settings.WARM_FAVORITES_N)
+    return list(dict.fromkeys(t.upper() for t in reporters + favorites))
+
+
+async def warm_caches(today: date | None = None) -> WarmStats:
+    """Fill the caches the first visitors of the day would otherwise miss.
+
+    Entries that are still fresh for another ``WARM_INTERVAL`` are left alone, so
+    each run only calls upstream for what would expire before the next one.
+    """
+    from app.db.database import get_session_factory
+
+    settings = get_settings()
+    async with get_session_factory()() as db:
+        tickers = await hot_tickers(db, today)
+
+    stats = WarmStats(tickers=len(tickers))
+    semaphore = asyncio.Semaphore(max(1, settings.WARM_CONCURRENCY))
+    min_fresh = settings.WARM_INTERVAL
+
+    async def warm(name: str, load):
+        async with semaphore:
+            try:
+                await load()
+                stats.loads += 1
+            except Exception:
+                stats.failed += 1
+                logger.warning("Cache warm-up of %s failed", name, exc_info=True)
+
+    loads = [warm("highlights", load_highlights)]
+    for ticker in tickers:
+        loads.append(warm(f"sparkline {ticker}", partial(load_sparkline, ticker, min_fresh)))
+        loads.append(warm(f"chart {ticker}", partial(load_chart, ticker, "1M", min_fresh)))
+        loads.append(warm(f"news {ticker}", partial(load_news, ticker, 30, min_fresh)))
+    await asyncio.gather(*loads)
+
+    logger.info(
+        "Warmed caches for %d tickers: %d loads, %d failed", stats.tickers, stats.loads, stats.failed,
+    )
+    return stats
@@ -0,0 +1,81 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Closed, calls go through and ``failure_threshold`` failures in a row open it.
+    Open, ``allow`` refuses calls for ``reset_timeout`` seconds. Then it is half-open:
+    one probe call at a time is let through (another after ``probe_timeout`` if the
+    probe never reports back), and its success closes the breaker while its failure
+    opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, probe_timeout: float = 5.0):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: float | None = None
+        self._probe_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        now = time.monotonic()
+        if self._probe_started is not None and now - self._probe_started < self.probe_timeout:
+            return False
+        self._probe_started = now
+        return True
+
+    def record_success(self):
+        if self._opened_at is not None:
+            logger.info("%s circuit closed after %d failures", self.name, self.failures)
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        state = self.state
+        if state == HALF_OPEN or (state == CLOSED and self.failures >= self.failure_threshold):
+            if state == CLOSED:
+                self.trips += 1
+                logger.warning(
+                    "%s circuit opened after %d consecutive failures, skipping it for %ss",
+                    self.name, self.failures, self.reset_timeout,
+                )
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def snapshot(self) -> dict:
+        state = self.state
+        retry_in = 0.0
+        if state == OPEN:
+            retry_in = round(self.reset_timeout - (time.monotonic() - self._opened_at), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "retry_in": retry_in,
+        }
@@ -0,0 +1,94 @@
+"""Serialization for values stored in Redis.
+
+Encoded values are one header byte followed by the payload:
+
+    0x01  JSON
+    0x02  JSON, zlib-compressed
+    0x03  JSON, zstd-compressed
+
+JSON is produced by ``orjson`` when it is installed and by the standard library
+otherwise; both decode each other's output. Payloads at or above ``min_bytes`` are
+compressed. Anything that does not start with a known header byte is read as plain
+JSON text, which is how values were stored before the codec existed (and how
+scalar values such as market caps are still stored).
+"""
+import json
+import logging
+import zlib
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional speedup
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+HEADER_JSON = 0x01
+HEADER_JSON_ZLIB = 0x02
+HEADER_JSON_ZSTD = 0x03
+
+COMPRESSIONS = ("none", "zlib", "zstd")
+
+
+def _orjson_default(value: Any) -> str:
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """JSON bytes matching ``json.dumps(value, default=str)`` up to whitespace."""
+    if orjson is not None:
+        return orjson.dumps(
+            value,
+            default=_orjson_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(value, default=str, separators=(",", ":")).encode()
+
+
+def loads_json(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class CacheCodec:
+    def __init__(self, compression: str = "zlib", min_bytes: int = 1024, level: int | None = None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"unknown cache compression {compression!r}")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing cache values with zlib")
+            compression = "zlib"
+        self.compression = compression
+        self.min_bytes = min_bytes
+        self.level = level
+        self._zstd_c = zstandard.ZstdCompressor(level=level or 3) if compression == "zstd" else None
+        self._zstd_d = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, value: Any) -> bytes:
+        payload = dumps_json(value)
+        if self.compression == "none" or len(payload) < self.min_bytes:
+            return bytes((HEADER_JSON,)) + payload
+        if self.compression == "zstd":
+            return bytes((HEADER_JSON_ZSTD,)) + self._zstd_c.compress(payload)
+        level = self.level if self.level is not None else 1
+        return bytes((HEADER_JSON_ZLIB,)) + zlib.compress(payload, level)
+
+    def decode(self, data: bytes | str) -> Any:
+        if isinstance(data, str):
+            return loads_json(data)
+        header, payload = data[0], data[1:]
+        if header == HEADER_JSON:
+            return loads_json(payload)
+        if header == HEADER_JSON_ZLIB:
+            return loads_json(zlib.decompress(payload))
+        if header == HEADER_JSON_ZSTD:
+            if self._zstd_d is None:
+                raise ValueError("zstd-compressed cache value but zstandard is not installed")
+            return loads_json(self._zstd_d.decompress(payload))
+        return loads_json(data)
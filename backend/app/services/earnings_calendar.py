@@ -1,16 +1,25 @@
 import asyncio
+import base64
+import json
 import logging
-from datetime import date, timedelta
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta
 import csv
 import io
 
 import httpx
-from sqlalchemy import func, select
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import and_, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.db.models import EarningsEvent, ReportTime
+from app.services.earnings_store import (
+    RETURN_ALL,
+    RETURN_NONE,
+    bulk_upsert_rows,
+)
+
+logger = logging.getLogger(__name__)
 
 ALPHA_VANTAGE_BASE = "https://www.alphavantage.co/query"
 
@@ -109,42 +118,148 @@ def _parse_nasdaq_eps_forecast(raw: str | None) -> float | None:
     return _safe_float(cleaned)
 
 
+def _parse_nasdaq_rows(day: date, rows: list[dict]) -> list[dict]:
+    results = []
+    for row in rows:
+        symbol = row.get("symbol", "")
+        if not symbol:
+            continue
+        results.append({
+            "symbol": symbol,
+            "companyName": row.get("name", symbol),
+            "date": day.isoformat(),
+            "time": "",
+            "fiscalDateEnding": _normalize_fiscal_quarter(row.get("fiscalQuarterEnding")),
+            "epsEstimated": _parse_nasdaq_eps_forecast(row.get("epsForecast")),
+            "marketCap": _parse_nasdaq_market_cap(row.get("marketCap")),
+        })
+    return results
+
+
+async def fetch_nasdaq_day(client: httpx.AsyncClient, day: date) -> list[dict] | None:
+    """Fetch and parse one Nasdaq calendar day, uncached and unthrottled.
+
+    Returns None when the call failed. Callers bound concurrency themselves;
+    ``fetch_nasdaq_days`` is the cached entry point.
+    """
+    try:
+        resp = await client.get(
+            NASDAQ_EARNINGS_URL,
+            params={"date": day.isoformat()},
+            headers=NASDAQ_HEADERS,
+        )
+        if resp.status_code != 200:
+            logger.warning("Nasdaq calendar returned %d for %s", resp.status_code, day)
+            return None
+        data = resp.json()
+        return _parse_nasdaq_rows(day, (data.get("data") or {}).get("rows") or [])
+    except Exception as e:
+        logger.warning("Nasdaq calendar fetch failed for %s: %s", day, e)
+        return None
+
+
+async def _fetch_nasdaq_day(
+    client: httpx.AsyncClient, day: date, semaphore: asyncio.Semaphore
+) -> list[dict] | None:
+    async with semaphore:
+        return await fetch_nasdaq_day(client, day)
+
+
+# Days currently being fetched, so overlapping callers share one request per day.
+_nasdaq_inflight: dict[date, asyncio.Task] = {}
+# Owned by the module rather than a caller, so a shared fetch outlives the caller
+# that started it and NASDAQ_CONCURRENCY caps the whole process.
+_nasdaq_client: httpx.AsyncClient | None = None
+_nasdaq_semaphore: asyncio.Semaphore | None = None
+
+
+def nasdaq_client() -> httpx.AsyncClient:
+    """Pooled client for Nasdaq calendar requests, shared by every caller in the process."""
+    global _nasdaq_client
+    if _nasdaq_client is None or _nasdaq_client.is_closed:
+        _nasdaq_client = httpx.AsyncClient(timeout=15.0)
+    return _nasdaq_client
+
+
+def nasdaq_semaphore() -> asyncio.Semaphore:
+    global _nasdaq_semaphore
+    if _nasdaq_semaphore is None:
+        _nasdaq_semaphore = asyncio.Semaphore(max(1, get_settings().NASDAQ_CONCURRENCY))
+    return _nasdaq_semaphore
+
+
+async def close_nasdaq_client():
+    global _nasdaq_client
+    if _nasdaq_client is not None:
+        await _nasdaq_client.aclose()
+        _nasdaq_client = None
+
+
+def _start_nasdaq_fetch(day: date) -> asyncio.Task:
+    task = asyncio.create_task(_fetch_nasdaq_day(nasdaq_client(), day, nasdaq_semaphore()))
+    _nasdaq_inflight[day] = task
+    task.add_done_callback(lambda _: _nasdaq_inflight.pop(day, None))
+    return task
+
+
+async def fetch_nasdaq_days(days: list[date]) -> dict[date, list[dict]]:
+    """Return parsed Nasdaq rows per weekday, served from cache where possible.
+
+    Uncached days are fetched concurrently on the module's pooled client, bounded
+    process-wide by ``NASDAQ_CONCURRENCY``, and cached so each trading day hits
+    Nasdaq at most once per TTL. Days whose fetch
+    failed are omitted from the result and not cached.
+    """
+    from app.services.cache import (
+        NASDAQ_DAY_TTL,
+        NASDAQ_PAST_DAY_TTL,
+        get_many_cached_nasdaq_days,
+        set_many_cached_nasdaq_days,
+    )
+
+    weekdays = [d for d in dict.fromkeys(days) if d.weekday() < 5]
+    if not weekdays:
+        return {}
+
+    cached = await get_many_cached_nasdaq_days([d.isoformat() for d in weekdays])
+    results = {d: cached[d.isoformat()] for d in weekdays if cached[d.isoformat()] is not None}
+    missing = [d for d in weekdays if d not in results]
+    if not missing:
+        return results
+
+    owned: dict[date, asyncio.Task] = {}
+    tasks = {}
+    for d in missing:
+        task = _nasdaq_inflight.get(d)
+        if task is None:
+            task = owned[d] = _start_nasdaq_fetch(d)
+        tasks[d] = task
+    # Shielded: cancelling this caller must not cancel fetches other callers share.
+    fetched = await asyncio.gather(*(asyncio.shield(t) for t in tasks.values()))
+
+    today = date.today()
+    to_cache: dict[str, list[dict]] = {}
+    ttls: dict[str, int] = {}
+    for d, rows in zip(tasks, fetched):
+        if rows is None:
+            continue
+        results[d] = rows
+        if d in owned:
+            to_cache[d.isoformat()] = rows
+            ttls[d.isoformat()] = NASDAQ_PAST_DAY_TTL if d < today else NASDAQ_DAY_TTL
+    if to_cache:
+        await set_many_cached_nasdaq_days(to_cache, ttls)
+
+    logger.info("Nasdaq days: %d cached, %d fetched", len(weekdays) - len(missing), len(owned))
+    return {d: results[d] for d in weekdays if d in results}
+
+
 async def _fetch_historical_earnings_nasdaq(
     start: date, end: date
 ) -> list[dict]:
-    results = []
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        current = start
-        while current <= end:
-            if current.weekday() >= 5:
-                current += timedelta(days=1)
-                continue
-            try:
-                resp = await client.get(
-                    NASDAQ_EARNINGS_URL,
-                    params={"date": current.isoformat()},
-                    headers=NASDAQ_HEADERS,
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    rows = data.get("data", {}).get("rows") or []
-                    for row in rows:
-                        symbol = row.get("symbol", "")
-                        if not symbol:
-                            continue
-                        results.append({
-                            "symbol": symbol,
-                            "companyName": row.get("name", symbol),
-                            "date": current.isoformat(),
-                            "time": "",
-                            "fiscalDateEnding": _normalize_fiscal_quarter(row.get("fiscalQuarterEnding")),
-                            "epsEstimated": _parse_nasdaq_eps_forecast(row.get("epsForecast")),
-                            "marketCap": _parse_nasdaq_market_cap(row.get("marketCap")),
-                        })
-            except Exception:
-                pass
-            current += timedelta(days=1)
-    return results
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    by_day = await fetch_nasdaq_days(days)
+    return [row for rows in by_day.values() for row in rows]
 
 
 def _safe_float(val: str | None) -> float | None:
@@ -156,17 +271,27 @@ def _safe_float(val: str | None) -> float | None:
         return None
 
 
-async def upsert_earnings_events(
-    db: AsyncSession, events_data: list[dict]
-) -> list[EarningsEvent]:
-    if not events_data:
-        return []
+def _index_tickers(rows: list[dict]) -> None:
+    from app.services.ticker_index import ticker_index
+
+    ticker_index.add((r["ticker"], r["company_name"]) for r in rows)
+
+
+async def invalidate_weeks(dates) -> None:
+    """Drop cached calendar weeks containing any of ``dates``. Call after committing."""
+    from app.services.cache import invalidate_cached_calendars
 
+    mondays = sorted({week_bounds(d)[0].isoformat() for d in dates})
+    if mondays:
+        await invalidate_cached_calendars(mondays)
+
+
+def _build_event_rows(events_data: list[dict]) -> list[dict]:
     rows = []
     for item in events_data:
         if not item.get("symbol") or not item.get("date"):
             continue
-        row = {
+        rows.append({
             "ticker": item["symbol"],
             "company_name": item.get("companyName", item["symbol"]),
             "report_date": date.fromisoformat(item["date"]),
@@ -174,38 +299,25 @@ async def upsert_earnings_events(
             "fiscal_quarter": item.get("fiscalDateEnding"),
             "eps_estimate": item.get("epsEstimated"),
             "revenue_estimate": item.get("revenueEstimated"),
-        }
-        if item.get("marketCap") is not None:
-            row["market_cap"] = item["marketCap"]
-        rows.append(row)
+            "market_cap": item.get("marketCap"),
+        })
+    return rows
 
+
+async def upsert_earnings_events(
+    db: AsyncSession, events_data: list[dict], returning: str = RETURN_ALL
+) -> list[EarningsEvent]:
+    """Upsert provider rows and return the affected events (see ``bulk_upsert_rows``)."""
+    rows = _build_event_rows(events_data)
     if not rows:
         return []
 
-    stmt = pg_insert(EarningsEvent).values(rows)
-    stmt = stmt.on_conflict_do_update(
-        constraint="uq_ticker_report_date",
-        set_={
-            "company_name": stmt.excluded.company_name,
-            "report_time": stmt.excluded.report_time,
-            "fiscal_quarter": stmt.excluded.fiscal_quarter,
-            "eps_estimate": stmt.excluded.eps_estimate,
-            "revenue_estimate": stmt.excluded.revenue_estimate,
-            "market_cap": func.coalesce(stmt.excluded.market_cap, EarningsEvent.market_cap),
-        },
-    )
-    await db.execute(stmt)
+    result = await bulk_upsert_rows(db, rows, returning=returning)
     await db.commit()
+    await invalidate_weeks(result.changed_dates)
+    _index_tickers(rows)
+    return result.events
 
-    query = select(EarningsEvent).where(
-        EarningsEvent.report_date >= rows[0]["report_date"],
-        EarningsEvent.report_date <= rows[-1]["report_date"],
-    )
-    result = await db.execute(query)
-    return list(result.scalars().all())
-
-
-logger = logging.getLogger(__name__)
 
 _ENRICH_TIMEOUT = 30
 
@@ -213,138 +325,467 @@ _ENRICH_TIMEOUT = 30
 async def _enrich_market_caps_from_nasdaq(
     db: AsyncSession, events: list[EarningsEvent]
 ) -> list[EarningsEvent]:
+    """Fill missing market caps from the Nasdaq calendar pages for the events' dates.
+
+    Tickers Nasdaq recently had no cap for are skipped, and dates enriched within
+    ``NASDAQ_ENRICHED_TTL`` are not re-fetched. Each fetched date records when it
+    was enriched and how many events it filled.
+    """
+    from app.services.cache import (
+        get_many_enrichment_markers,
+        get_missing_market_caps,
+        set_many_enrichment_markers,
+        set_missing_market_caps,
+    )
+
     needs_cap = [e for e in events if e.market_cap is None]
     if not needs_cap:
         return events
 
-    dates_to_fetch = list(dict.fromkeys(e.report_date for e in needs_cap))
+    known_missing = await get_missing_market_caps(list({e.ticker for e in needs_cap}))
+    needs_cap = [e for e in needs_cap if e.ticker not in known_missing]
+    if not needs_cap:
+        return events
+
+    candidate_dates = list(dict.fromkeys(e.report_date for e in needs_cap))
+    markers = await get_many_enrichment_markers([d.isoformat() for d in candidate_dates])
+    dates_to_fetch = [d for d in candidate_dates if markers[d.isoformat()] is None]
+    if not dates_to_fetch:
+        logger.info("Nasdaq enrichment: all %d dates enriched recently, skipping", len(candidate_dates))
+        return events
     logger.info("Enriching market caps from Nasdaq for %d dates", len(dates_to_fetch))
 
+    fetched = await fetch_nasdaq_days(dates_to_fetch)
     caps: dict[str, float] = {}
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        for d in dates_to_fetch:
-            if d.weekday() >= 5:
-                continue
-            try:
-                resp = await client.get(
-                    NASDAQ_EARNINGS_URL,
-                    params={"date": d.isoformat()},
-                    headers=NASDAQ_HEADERS,
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    for row in data.get("data", {}).get("rows") or []:
-                        symbol = row.get("symbol", "")
-                        mcap = _parse_nasdaq_market_cap(row.get("marketCap"))
-                        if symbol and mcap is not None:
-                            caps[symbol] = mcap
-            except Exception as e:
-                logger.warning("Nasdaq market cap fetch failed for %s: %s", d, e)
+    listed_without_cap: set[str] = set()
+    for rows in fetched.values():
+        for row in rows:
+            if row["marketCap"] is not None:
+                caps[row["symbol"]] = row["marketCap"]
+            else:
+                listed_without_cap.add(row["symbol"])
 
     updated = 0
+    updated_dates = set()
     for event in events:
         cap = caps.get(event.ticker)
         if cap is not None and event.market_cap != cap:
             event.market_cap = cap
             updated += 1
+            updated_dates.add(event.report_date)
 
     logger.info("Nasdaq enrichment: got %d caps, updated %d events", len(caps), updated)
 
-    if updated:
+    if updated_dates:
         try:
             await db.commit()
+            await invalidate_weeks(updated_dates)
         except Exception:
             await db.rollback()
 
+    enriched_at = datetime.utcnow().isoformat()
+    new_markers = {}
+    still_missing = set()
+    for d in fetched:
+        on_date = [e for e in needs_cap if e.report_date == d]
+        filled = sum(1 for e in on_date if e.market_cap is not None)
+        # Only tickers Nasdaq listed without a cap; absent ones may just be on another date.
+        still_missing.update(
+            e.ticker for e in on_date if e.market_cap is None and e.ticker in listed_without_cap
+        )
+        new_markers[d.isoformat()] = {"at": enriched_at, "filled": filled, "missing": len(on_date) - filled}
+    await set_many_enrichment_markers(new_markers)
+    await set_missing_market_caps(sorted(still_missing))
+
     return events
 
 
-async def search_ticker(
-    db: AsyncSession, ticker: str
-) -> list[EarningsEvent]:
-    upper_ticker = ticker.upper().strip()
+async def fetch_ticker_from_alpha_vantage(ticker: str) -> list[dict] | None:
+    """Fetch one ticker's upcoming earnings. Returns None when the call failed."""
+    settings = get_settings()
+    params = {
+        "function": "EARNINGS_CALENDAR",
+        "horizon": "3month",
+        "symbol": ticker,
+        "apikey": settings.ALPHA_VANTAGE_API_KEY,
+    }
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        resp = await client.get(ALPHA_VANTAGE_BASE, params=params)
+    if resp.status_code != 200 or not resp.text or resp.text.startswith("{"):
+        return None
 
-    try:
-        settings = get_settings()
-        params = {
-            "function": "EARNINGS_CALENDAR",
-            "horizon": "3month",
-            "symbol": upper_ticker,
-            "apikey": settings.ALPHA_VANTAGE_API_KEY,
+    reader = csv.DictReader(io.StringIO(resp.text))
+    return [
+        {
+            "symbol": row.get("symbol", ""),
+            "companyName": row.get("name", row.get("symbol", "")),
+            "date": row.get("reportDate", ""),
+            "time": row.get("timeOfTheDay", ""),
+            "fiscalDateEnding": row.get("fiscalDateEnding"),
+            "epsEstimated": _safe_float(row.get("estimate")),
         }
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(ALPHA_VANTAGE_BASE, params=params)
-            if resp.status_code == 200 and resp.text and not resp.text.startswith("{"):
-                reader = csv.DictReader(io.StringIO(resp.text))
-                av_results = []
-                for row in reader:
-                    av_results.append({
-                        "symbol": row.get("symbol", ""),
-                        "companyName": row.get("name", row.get("symbol", "")),
-                        "date": row.get("reportDate", ""),
-                        "time": row.get("timeOfTheDay", ""),
-                        "fiscalDateEnding": row.get("fiscalDateEnding"),
-                        "epsEstimated": _safe_float(row.get("estimate")),
-                    })
-                if av_results:
-                    await upsert_earnings_events(db, av_results)
-    except Exception:
-        pass
+        for row in reader
+    ]
+
+
+async def _refresh_ticker(ticker: str) -> None:
+    """Re-fetch a ticker from Alpha Vantage on a dedicated session.
+
+    Only one worker refreshes a ticker at a time; a failed refresh keeps its claim
+    until the lease expires so repeated searches don't retry against the quota.
+    """
+    from app.db.database import get_session_factory
+    from app.services.cache import (
+        claim_ticker_refresh,
+        release_ticker_refresh,
+        set_ticker_refreshed_at,
+    )
+
+    token = await claim_ticker_refresh(ticker)
+    if token is None:
+        return
+    try:
+        av_results = await fetch_ticker_from_alpha_vantage(ticker)
+        if av_results is None:
+            return
+        if av_results:
+            async with get_session_factory()() as db:
+                await upsert_earnings_events(db, av_results, returning=RETURN_NONE)
+        await set_ticker_refreshed_at(ticker, datetime.utcnow())
+    except Exception as e:
+        logger.warning("Ticker refresh failed for %s: %s", ticker, e)
+        return
+    await release_ticker_refresh(ticker, token)
+
 
+# In-flight refreshes per ticker, so concurrent searches share one upstream call.
+_ticker_refreshes: dict[str, asyncio.Task] = {}
+
+
+def _schedule_ticker_refresh(ticker: str) -> asyncio.Task:
+    task = _ticker_refreshes.get(ticker)
+    if task is None:
+        task = asyncio.create_task(_refresh_ticker(ticker))
+        _ticker_refreshes[ticker] = task
+        task.add_done_callback(lambda _: _ticker_refreshes.pop(ticker, None))
+    return task
+
+
+async def _read_ticker_events(db: AsyncSession, ticker: str) -> list[EarningsEvent]:
     query = (
         select(EarningsEvent)
-        .where(EarningsEvent.ticker == upper_ticker)
+        .where(EarningsEvent.ticker == ticker)
         .order_by(EarningsEvent.report_date)
     )
     result = await db.execute(query)
     return list(result.scalars().all())
 
 
-async def _sync_alpha_vantage_data(db: AsyncSession):
-    from app.services.cache import should_sync_alpha_vantage, mark_alpha_vantage_synced
+async def search_ticker(
+    db: AsyncSession, ticker: str
+) -> tuple[list[EarningsEvent], str]:
+    """Serve a ticker's events from Postgres, refreshing from Alpha Vantage when stale.
+
+    Returns the events and ``"fresh"`` or ``"stale"``. Stale rows are returned
+    immediately while a background refresh runs; only a ticker with no rows at
+    all waits for the upstream call.
+    """
+    from app.services.cache import TICKER_FRESH_FOR, get_ticker_refreshed_at
+
+    upper_ticker = ticker.upper().strip()
+    events = await _read_ticker_events(db, upper_ticker)
+
+    refreshed_at = await get_ticker_refreshed_at(upper_ticker)
+    if refreshed_at is not None and (datetime.utcnow() - refreshed_at).total_seconds() < TICKER_FRESH_FOR:
+        return events, "fresh"
+
+    task = _schedule_ticker_refresh(upper_ticker)
+    if events:
+        return events, "stale"
+
+    await asyncio.shield(task)
+    events = await _read_ticker_events(db, upper_ticker)
+    refreshed_at = await get_ticker_refreshed_at(upper_ticker)
+    return events, "fresh" if refreshed_at is not None else "stale"
+
+
+# Held while this process syncs; concurrent callers skip instead of queueing.
+_av_sync_lock = asyncio.Lock()
+
+
+async def _sync_alpha_vantage_data(db: AsyncSession, *, when_due: bool = True):
+    """Run the bulk Alpha Vantage sync if it is due and nobody else is running it.
 
-    if not await should_sync_alpha_vantage():
+    Callers that lose the race (in this process or on another replica) return
+    immediately and serve whatever is already in the database. A failed sync rolls
+    the session back, so the caller can still read from it, and marks the sync as
+    not due for ``AV_SYNC_RETRY_BACKOFF``, which spaces out retries against the quota.
+
+    ``when_due=False`` skips the ``AV_SYNC_TTL`` gate: the scheduled job is already
+    spaced by its own lease, and the gate, set when the previous sync finished,
+    would make every run that wakes a little early do nothing.
+    """
+    from app.services.cache import (
+        claim_alpha_vantage_sync,
+        mark_alpha_vantage_failed,
+        mark_alpha_vantage_synced,
+        release_alpha_vantage_sync,
+        should_sync_alpha_vantage,
+    )
+
+    if _av_sync_lock.locked():
         return
 
-    try:
-        all_data = await fetch_all_earnings_from_alpha_vantage()
-        if all_data:
-            await upsert_earnings_events(db, all_data)
-            logger.info("Synced %d events from Alpha Vantage", len(all_data))
-        await mark_alpha_vantage_synced()
-    except Exception as e:
-        logger.warning("Alpha Vantage sync failed: %s", e)
+    async with _av_sync_lock:
+        if when_due and not await should_sync_alpha_vantage():
+            return
+
+        token = await claim_alpha_vantage_sync()
+        if token is None:
+            logger.info("Alpha Vantage sync already running elsewhere, serving current data")
+            return
+
+        if when_due and not await should_sync_alpha_vantage():
+            await release_alpha_vantage_sync(token)
+            return
+
+        try:
+            all_data = await fetch_all_earnings_from_alpha_vantage()
+            rows = _build_event_rows(all_data)
+            if rows:
+                result = await bulk_upsert_rows(db, rows, returning=RETURN_NONE)
+                await db.commit()
+                await invalidate_weeks(result.changed_dates)
+                _index_tickers(rows)
+                logger.info(
+                    "Synced %d events from Alpha Vantage: inserted=%d updated=%d skipped=%d",
+                    len(rows), result.inserted, result.updated, result.skipped,
+                )
+            await mark_alpha_vantage_synced()
+        except Exception as e:
+            logger.warning("Alpha Vantage sync failed: %s", e)
+            await db.rollback()
+            await mark_alpha_vantage_failed()
+            return
+
+        await release_alpha_vantage_sync(token)
+
+
+def _scheduled_ingestion() -> bool:
+    return get_settings().INGEST_SCHEDULER != "off"
+
+
+def enrichment_window(today: date | None = None) -> tuple[date, date]:
+    """Week range kept enriched by the scheduled job: last week through ENRICH_WEEKS_AHEAD."""
+    this_monday, _ = week_bounds(today or date.today())
+    start = this_monday - timedelta(weeks=1)
+    _, end = week_bounds(this_monday + timedelta(weeks=get_settings().ENRICH_WEEKS_AHEAD))
+    return start, end
+
+
+async def enrich_upcoming_weeks(db: AsyncSession) -> int:
+    """Fill missing market caps across the enrichment window. Returns events checked."""
+    start, end = enrichment_window()
+    result = await db.execute(
+        select(EarningsEvent).where(
+            EarningsEvent.report_date >= start,
+            EarningsEvent.report_date <= end,
+        )
+    )
+    events = list(result.scalars().all())
+    await _enrich_market_caps_from_nasdaq(db, events)
+    return len(events)
+
+
+def week_events_query(monday: date, friday: date):
+    """Calendar order for a week, served by ``ix_earnings_events_calendar``."""
+    return select(EarningsEvent).where(
+        EarningsEvent.report_date >= monday,
+        EarningsEvent.report_date <= friday,
+    ).order_by(
+        EarningsEvent.report_date,
+        EarningsEvent.market_cap.desc().nulls_last(),
+        EarningsEvent.ticker,
+    )
+
+
+def _calendar_order(events) -> list[EarningsEvent]:
+    """Python twin of ``week_events_query``'s ORDER BY."""
+    return sorted(events, key=lambda e: (
+        e.report_date, e.market_cap is None, -(e.market_cap or 0), e.ticker,
+    ))
+
+
+async def _read_week(db: AsyncSession, monday: date, friday: date) -> list[EarningsEvent]:
+    result = await db.execute(week_events_query(monday, friday))
+    return list(result.scalars().all())
 
 
 async def get_week_earnings(
     db: AsyncSession, target_date: date
 ) -> list[EarningsEvent]:
     monday, friday = week_bounds(target_date)
+    scheduled = _scheduled_ingestion()
 
-    await _sync_alpha_vantage_data(db)
+    if not scheduled:
+        await _sync_alpha_vantage_data(db)
 
-    query = select(EarningsEvent).where(
-        EarningsEvent.report_date >= monday,
-        EarningsEvent.report_date <= friday,
-    ).order_by(EarningsEvent.report_date, EarningsEvent.ticker)
-    result = await db.execute(query)
-    events = list(result.scalars().all())
+    events = await _read_week(db, monday, friday)
 
     if not events and friday < date.today():
         try:
             nasdaq_data = await _fetch_historical_earnings_nasdaq(monday, friday)
             if nasdaq_data:
-                events = await upsert_earnings_events(db, nasdaq_data)
+                # The upsert returns every row it touched, so the week needs no re-read.
+                written = await upsert_earnings_events(db, nasdaq_data, returning=RETURN_ALL)
+                events = _calendar_order(e for e in written if monday <= e.report_date <= friday)
                 logger.info("Fetched %d historical events from Nasdaq for %s", len(events), monday)
         except Exception as e:
             logger.warning("Nasdaq historical fetch failed: %s", e)
 
+    window_start, window_end = enrichment_window()
+    if not scheduled or not (window_start <= monday <= window_end):
+        caps_before = [e.market_cap for e in events]
+        try:
+            events = await _enrich_market_caps_from_nasdaq(db, events)
+        except Exception as e:
+            logger.warning("Market cap enrichment failed: %s", e)
+        if [e.market_cap for e in events] != caps_before:
+            # New caps change the order; let the index re-rank the week.
+            events = await _read_week(db, monday, friday)
+
+    return events
+
+
+# Columns served to clients; selecting them directly skips ORM identity tracking.
+EVENT_COLUMNS = (
+    EarningsEvent.id,
+    EarningsEvent.ticker,
+    EarningsEvent.company_name,
+    EarningsEvent.report_date,
+    EarningsEvent.report_time,
+    EarningsEvent.fiscal_quarter,
+    EarningsEvent.eps_estimate,
+    EarningsEvent.revenue_estimate,
+    EarningsEvent.market_cap,
+)
+
+
+def event_row(row) -> dict:
+    """Plain dict for a row selected with ``EVENT_COLUMNS``."""
+    event = dict(row)
+    if isinstance(event["report_time"], ReportTime):
+        event["report_time"] = event["report_time"].value
+    return event
+
+
+async def stream_range_events(
+    start: date, end: date, batch_size: int = 500
+) -> AsyncIterator[dict]:
+    """Yield events between ``start`` and ``end`` as plain dicts, straight off a cursor.
+
+    Runs one range scan on its own session (a streamed response outlives the request's
+    dependencies) and fetches ``batch_size`` rows at a time, so memory stays flat
+    regardless of the span. No sync or enrichment happens here; the scheduler keeps
+    the table current.
+    """
+    from app.db.database import get_session_factory
+
+    query = (
+        select(*EVENT_COLUMNS)
+        .where(EarningsEvent.report_date >= start, EarningsEvent.report_date <= end)
+        .order_by(
+            EarningsEvent.report_date,
+            EarningsEvent.market_cap.desc().nulls_last(),
+            EarningsEvent.ticker,
+        )
+        .execution_options(yield_per=batch_size)
+    )
+    async with get_session_factory()() as db:
+        result = await db.stream(query)
+        async for row in result.mappings():
+            yield event_row(row)
+
+
+def encode_cursor(event: dict) -> str:
+    """Opaque keyset cursor for the calendar order ``(report_date, market_cap, ticker)``."""
+    key = [event["report_date"].isoformat(), event["market_cap"], event["ticker"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, float | None, str]:
+    """Inverse of ``encode_cursor``. Raises ``ValueError`` for malformed cursors."""
     try:
-        events = await _enrich_market_caps_from_nasdaq(db, events)
+        padded = cursor + "=" * (-len(cursor) % 4)
+        report_date, market_cap, ticker = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(report_date), market_cap, str(ticker)
     except Exception as e:
-        logger.warning("Market cap enrichment failed: %s", e)
+        raise ValueError("invalid cursor") from e
+
+
+def _after_cursor(cursor: tuple[date, float | None, str]):
+    """Rows that sort after ``cursor`` in calendar order, where null caps sort last."""
+    report_date, market_cap, ticker = cursor
+    if market_cap is None:
+        same_day = and_(EarningsEvent.market_cap.is_(None), EarningsEvent.ticker > ticker)
+    else:
+        same_day = or_(
+            EarningsEvent.market_cap < market_cap,
+            EarningsEvent.market_cap.is_(None),
+            and_(EarningsEvent.market_cap == market_cap, EarningsEvent.ticker > ticker),
+        )
+    return or_(
+        EarningsEvent.report_date > report_date,
+        and_(EarningsEvent.report_date == report_date, same_day),
+    )
+
 
-    return sorted(
-        events,
-        key=lambda e: (e.report_date, -(e.market_cap or 0), e.ticker),
+async def get_week_page(
+    db: AsyncSession,
+    target_date: date,
+    *,
+    min_market_cap: float | None = None,
+    report_time: ReportTime | None = None,
+    tickers: list[str] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """One filtered slice of a week in calendar order, plus the cursor for the next.
+
+    Filters and the keyset condition run in SQL: the week range and cap floor use
+    ``ix_earnings_events_calendar`` and a ticker list uses ``uq_ticker_report_date``,
+    so the cost follows the page size rather than the week's size. Ingestion is
+    left to the scheduler, except with ``INGEST_SCHEDULER=off``, where the week is
+    first synced, backfilled and enriched exactly as ``get_week_earnings`` does.
+    """
+    if not _scheduled_ingestion():
+        await get_week_earnings(db, target_date)
+
+    monday, friday = week_bounds(target_date)
+    query = select(*EVENT_COLUMNS).where(
+        EarningsEvent.report_date >= monday,
+        EarningsEvent.report_date <= friday,
+    )
+    if min_market_cap is not None:
+        query = query.where(EarningsEvent.market_cap >= min_market_cap)
+    if report_time is not None:
+        query = query.where(EarningsEvent.report_time == report_time)
+    if tickers:
+        query = query.where(EarningsEvent.ticker.in_(tickers))
+    if cursor is not None:
+        query = query.where(_after_cursor(decode_cursor(cursor)))
+    query = query.order_by(
+        EarningsEvent.report_date,
+        EarningsEvent.market_cap.desc().nulls_last(),
+        EarningsEvent.ticker,
     )
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    result = await db.execute(query)
+    events = [event_row(row) for row in result.mappings().all()]
+    next_cursor = None
+    if limit is not None and len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1])
+    return events, next_cursor
@@ -0,0 +1,308 @@
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import EarningsEvent
+
+logger = logging.getLogger(__name__)
+
+# asyncpg refuses statements with more than 32767 bind parameters.
+_MAX_BIND_PARAMS = 32767
+_CHUNK_ROWS = 1000
+# Below this many rows a single multi-row INSERT beats creating a staging table.
+COPY_THRESHOLD = 500
+# Up to this many distinct tickers, existing-row lookups also filter by ticker.
+_TICKER_FILTER_LIMIT = 500
+
+_HASHED_COLUMNS = (
+    "company_name",
+    "report_time",
+    "fiscal_quarter",
+    "eps_estimate",
+    "revenue_estimate",
+    "market_cap",
+)
+
+_COLUMNS = (
+    "ticker",
+    "company_name",
+    "report_date",
+    "report_time",
+    "fiscal_quarter",
+    "eps_estimate",
+    "revenue_estimate",
+    "market_cap",
+    "content_hash",
+    "created_at",
+)
+
+_STAGE_TABLE = "_earnings_stage"
+_stage = table(_STAGE_TABLE, *(column(c) for c in _COLUMNS))
+
+RETURN_ALL = "all"
+RETURN_CHANGED = "changed"
+RETURN_NONE = "none"
+
+
+@dataclass
+class UpsertResult:
+    method: str
+    events: list[EarningsEvent] = field(default_factory=list)
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    # Report dates of inserted or modified rows, for cache invalidation.
+    changed_dates: set = field(default_factory=set)
+
+
+def content_hash(row: dict) -> str:
+    """Digest of the provider-supplied values, stored on the row to detect no-op writes."""
+    parts = []
+    for c in _HASHED_COLUMNS:
+        value = row.get(c)
+        parts.append(value.value if hasattr(value, "value") else repr(value))
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _dedupe(rows: list[dict]) -> list[dict]:
+    """Keep the last row per (ticker, report_date); ON CONFLICT cannot touch a row twice."""
+    by_key = {(r["ticker"], r["report_date"]): r for r in rows}
+    return list(by_key.values())
+
+
+def _chunk_size() -> int:
+    return min(_CHUNK_ROWS, _MAX_BIND_PARAMS // len(_COLUMNS))
+
+
+def _values_changed(stmt):
+    excluded = stmt.excluded
+    return or_(
+        # Rows written before content hashes existed carry NULL; rewrite them once
+        # so ``_drop_unchanged`` can skip them from then on.
+        EarningsEvent.content_hash.is_distinct_from(excluded.content_hash),
+        EarningsEvent.company_name.is_distinct_from(excluded.company_name),
+        EarningsEvent.report_time.is_distinct_from(excluded.report_time),
+        EarningsEvent.fiscal_quarter.is_distinct_from(excluded.fiscal_quarter),
+        EarningsEvent.eps_estimate.is_distinct_from(excluded.eps_estimate),
+        EarningsEvent.revenue_estimate.is_distinct_from(excluded.revenue_estimate),
+        func.coalesce(excluded.market_cap, EarningsEvent.market_cap).is_distinct_from(
+            EarningsEvent.market_cap
+        ),
+    )
+
+
+def _on_conflict(stmt, returning: str = RETURN_NONE):
+    """Attach the upsert clause and RETURNING.
+
+    The update only fires when a value or the stored content hash differs, so
+    unchanged rows are neither rewritten nor returned. An ``inserted`` flag (``xmax = 0``) is always returned
+    so callers can tell inserts from updates; ``RETURN_NONE`` returns only that
+    and the report date.
+    """
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_ticker_report_date",
+        set_={
+            "company_name": stmt.excluded.company_name,
+            "report_time": stmt.excluded.report_time,
+            "fiscal_quarter": stmt.excluded.fiscal_quarter,
+            "eps_estimate": stmt.excluded.eps_estimate,
+            "revenue_estimate": stmt.excluded.revenue_estimate,
+            "market_cap": func.coalesce(stmt.excluded.market_cap, EarningsEvent.market_cap),
+            "content_hash": stmt.excluded.content_hash,
+        },
+        where=_values_changed(stmt),
+    )
+    inserted = literal_column("(xmax = 0)").label("inserted")
+    if returning == RETURN_NONE:
+        return stmt.returning(EarningsEvent.report_date, inserted)
+    return stmt.returning(EarningsEvent, inserted)
+
+
+async def _execute(db: AsyncSession, stmt, returning: str) -> list[tuple]:
+    """Run an upsert and return ``(event_or_None, report_date, inserted)`` per written row."""
+    if returning == RETURN_NONE:
+        result = await db.execute(stmt)
+        return [(None, report_date, flag) for report_date, flag in result.all()]
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    return [(event, event.report_date, flag) for event, flag in result.all()]
+
+
+def _with_defaults(rows: list[dict]) -> list[dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            **{c: row.get(c) for c in _COLUMNS},
+            "content_hash": content_hash(row),
+            "created_at": row.get("created_at") or now,
+        }
+        for row in rows
+    ]
+
+
+def _existing_rows_query(rows: list[dict], *entities):
+    tickers = {r["ticker"] for r in rows}
+    query = select(*entities).where(
+        EarningsEvent.report_date >= min(r["report_date"] for r in rows),
+        EarningsEvent.report_date <= max(r["report_date"] for r in rows),
+    )
+    if len(tickers) <= _TICKER_FILTER_LIMIT:
+        query = query.where(EarningsEvent.ticker.in_(tickers))
+    return query
+
+
+async def _drop_unchanged(db: AsyncSession, rows: list[dict]) -> list[dict]:
+    """Drop rows whose stored content hash matches, so they never reach the write path."""
+    result = await db.execute(_existing_rows_query(
+        rows, EarningsEvent.ticker, EarningsEvent.report_date, EarningsEvent.content_hash,
+    ))
+    stored = {(t, d): h for t, d, h in result.all()}
+    return [r for r in rows if stored.get((r["ticker"], r["report_date"])) != r["content_hash"]]
+
+
+def _unwritten_chunk_size() -> int:
+    return (_MAX_BIND_PARAMS - 2) // 2
+
+
+async def _load_unwritten(
+    db: AsyncSession, rows: list[dict], written: list[EarningsEvent]
+) -> list[EarningsEvent]:
+    seen = {(e.ticker, e.report_date) for e in written}
+    missing = [r for r in rows if (r["ticker"], r["report_date"]) not in seen]
+    if not missing:
+        return []
+    # Exact keys: the date range alone would also pull in unrelated rows.
+    keys = [(r["ticker"], r["report_date"]) for r in missing]
+    events = []
+    # Two binds per key, plus the two report_date bounds.
+    size = _unwritten_chunk_size()
+    for i in range(0, len(keys), size):
+        chunk = keys[i:i + size]
+        result = await db.scalars(
+            select(EarningsEvent).where(
+                EarningsEvent.report_date >= min(d for _, d in chunk),
+                EarningsEvent.report_date <= max(d for _, d in chunk),
+                tuple_(EarningsEvent.ticker, EarningsEvent.report_date).in_(chunk),
+            )
+        )
+        events.extend(result.all())
+    return events
+
+
+async def _copy_driver(db: AsyncSession):
+    """Return the raw asyncpg connection, or None when COPY is not available."""
+    try:
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+    except Exception:
+        return None
+    if not hasattr(driver, "copy_records_to_table"):
+        return None
+    return driver
+
+
+async def _upsert_chunked(
+    db: AsyncSession, rows: list[dict], returning: str
+) -> list[tuple]:
+    events = []
+    size = _chunk_size()
+    for i in range(0, len(rows), size):
+        stmt = _on_conflict(pg_insert(EarningsEvent).values(rows[i:i + size]), returning)
+        events.extend(await _execute(db, stmt, returning))
+    return events
+
+
+async def _upsert_copy(
+    db: AsyncSession, driver, rows: list[dict], returning: str
+) -> list[tuple]:
+    await db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} ON COMMIT DROP AS "
+        f"SELECT {', '.join(_COLUMNS)} FROM earnings_events WITH NO DATA"
+    ))
+    await db.execute(text(f"TRUNCATE {_STAGE_TABLE}"))
+    records = [
+        tuple(
+            row[c].name if c == "report_time" and row[c] is not None else row[c]
+            for c in _COLUMNS
+        )
+        for row in rows
+    ]
+    await driver.copy_records_to_table(_STAGE_TABLE, records=records, columns=list(_COLUMNS))
+    stmt = _on_conflict(
+        pg_insert(EarningsEvent).from_select(list(_COLUMNS), select(*_stage.c)),
+        returning,
+    )
+    return await _execute(db, stmt, returning)
+
+
+async def _write(
+    db: AsyncSession, rows: list[dict], method: str, returning: str
+) -> tuple[str, list[tuple]]:
+    use_copy = method == "copy" or (method == "auto" and len(rows) >= COPY_THRESHOLD)
+    if use_copy:
+        driver = await _copy_driver(db)
+        if driver is not None:
+            try:
+                async with db.begin_nested():
+                    written = await _upsert_copy(db, driver, rows, returning)
+                return "copy", written
+            except Exception as e:
+                logger.warning("COPY upsert of %d rows failed, falling back to chunked inserts: %s", len(rows), e)
+        else:
+            logger.info("COPY unavailable for this connection, using chunked inserts")
+
+    return "chunked", await _upsert_chunked(db, rows, returning)
+
+
+async def bulk_upsert_rows(
+    db: AsyncSession,
+    rows: list[dict],
+    method: str = "auto",
+    returning: str = RETURN_NONE,
+    skip_unchanged: bool = True,
+) -> UpsertResult:
+    """Upsert ``earnings_events`` rows without committing.
+
+    Large batches are streamed into a temporary staging table with COPY and merged
+    with a single ``INSERT ... SELECT ... ON CONFLICT``; small batches, or sessions
+    whose driver has no COPY support, use chunked multi-row inserts that stay under
+    asyncpg's bind-parameter limit. ``method`` forces ``"copy"`` or ``"chunked"``.
+
+    Rows whose stored ``content_hash`` matches are dropped before the write when
+    ``skip_unchanged`` is set, and the conflict update only rewrites rows whose
+    values differ.
+
+    ``returning`` selects which rows come back: every input row (``RETURN_ALL``),
+    only inserted or modified rows (``RETURN_CHANGED``), or none.
+    """
+    rows = _with_defaults(_dedupe(rows))
+    if not rows:
+        return UpsertResult(method="none")
+
+    to_write = await _drop_unchanged(db, rows) if skip_unchanged else rows
+    method_used, written = ("none", [])
+    if to_write:
+        method_used, written = await _write(db, to_write, method, returning)
+
+    inserted = sum(1 for _, _, flag in written if flag)
+    result = UpsertResult(
+        method=method_used,
+        events=[e for e, _, _ in written if e is not None],
+        inserted=inserted,
+        updated=len(written) - inserted,
+        skipped=len(rows) - len(written),
+        changed_dates={d for _, d, _ in written},
+    )
+    if returning == RETURN_ALL:
+        result.events.extend(await _load_unwritten(db, rows, result.events))
+
+    logger.info(
+        "Upserted %d earnings rows via %s: inserted=%d updated=%d skipped=%d",
+        len(rows), result.method, result.inserted, result.updated, result.skipped,
+    )
+    return result
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.db.models import EarningsEvent
+from app.services.cache import get_cached_highlights, set_cached_highlights
+from app.services.earnings_calendar import (
+    EVENT_COLUMNS,
+    _scheduled_ingestion,
+    event_row,
+    get_week_earnings,
+    week_bounds,
+)
+
+logger = logging.getLogger(__name__)
+
+HIGHLIGHTS_LIMIT = 10
+
+
+def highlight_weeks(today: date | None = None) -> tuple[date, date]:
+    """Mondays of last week and this week; on weekends "this week" is the coming one."""
+    anchor = today or date.today()
+    if anchor.weekday() >= 5:
+        anchor = anchor + timedelta(days=(7 - anchor.weekday()))
+    this_mon, _ = week_bounds(anchor)
+    return this_mon - timedelta(weeks=1), this_mon
+
+
+async def top_week_events(week_start: date, limit: int = HIGHLIGHTS_LIMIT) -> list[dict]:
+    """The week's ``limit`` largest reporters by market cap, ranked in SQL."""
+    from app.db.database import get_session_factory
+
+    monday, friday = week_bounds(week_start)
+    query = (
+        select(*EVENT_COLUMNS)
+        .where(EarningsEvent.report_date >= monday, EarningsEvent.report_date <= friday)
+        .order_by(EarningsEvent.market_cap.desc().nulls_last(), EarningsEvent.ticker)
+        .limit(limit)
+    )
+    async with get_session_factory()() as db:
+        result = await db.execute(query)
+        return [event_row(row) for row in result.mappings().all()]
+
+
+async def compute_week_highlights(week_start: date) -> dict:
+    """Rank one week's reporters and store the section under its week-start key."""
+    monday, friday = week_bounds(week_start)
+    events = await top_week_events(monday)
+    section = {"week_start": monday, "week_end": friday, "events": events}
+    await set_cached_highlights(monday.isoformat(), section)
+    logger.info(
+        "Highlights for %s: top tickers=%s",
+        monday, [(e["ticker"], e["market_cap"]) for e in events[:5]],
+    )
+    return section
+
+
+async def _ingest_inline(weeks: tuple[date, ...]):
+    # Without the scheduler nothing else syncs or enriches these weeks.
+    from app.db.database import get_session_factory
+
+    async with get_session_factory()() as db:
+        for monday in weeks:
+            await get_week_earnings(db, monday)
+
+
+async def load_highlights(refresh: bool = False) -> dict:
+    """Last and this week's highlights, each read from its own cache key.
+
+    Weeks missing from the cache (or all of them with ``refresh``) are ranked
+    concurrently, each on its own session.
+    """
+    weeks = highlight_weeks()
+    cached = {} if refresh else await get_cached_highlights([w.isoformat() for w in weeks])
+    missing = [w for w in weeks if cached.get(w.isoformat()) is None]
+
+    if missing:
+        if not _scheduled_ingestion():
+            await _ingest_inline(tuple(missing))
+        computed = await asyncio.gather(*(compute_week_highlights(w) for w in missing))
+        cached.update({w.isoformat(): section for w, section in zip(missing, computed)})
+
+    last_mon, this_mon = weeks
+    return {
+        "last_week": cached[last_mon.isoformat()],
+        "this_week": cached[this_mon.isoformat()],
+    }
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class FamilyStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry TTLs, sitting in front of Redis.
+
+    Entries are grouped into key families (``calendar``, ``sparkline``, ...) for
+    per-family stats and opt-out. Values are the decoded objects shared between
+    callers, so they must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_ttl: float,
+        disabled: set[str] | None = None,
+        family_ttls: dict[str, float] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.disabled = disabled or set()
+        # Families whose entries may live longer than ``max_ttl``.
+        self.family_ttls = family_ttls or {}
+        self._entries: OrderedDict[str, tuple[float, str, Any]] = OrderedDict()
+        self._stats: dict[str, FamilyStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def enabled(self, family: str) -> bool:
+        return self.max_entries > 0 and self.max_ttl > 0 and family not in self.disabled
+
+    def _family_stats(self, family: str) -> FamilyStats:
+        stats = self._stats.get(family)
+        if stats is None:
+            stats = self._stats[family] = FamilyStats()
+        return stats
+
+    def get(self, family: str, key: str, default: Any = None) -> Any:
+        if not self.enabled(family):
+            return default
+        stats = self._family_stats(family)
+        entry = self._entries.get(key)
+        if entry is None:
+            stats.misses += 1
+            return default
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            stats.expirations += 1
+            stats.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        stats.hits += 1
+        return value
+
+    def set(self, family: str, key: str, value: Any, ttl: float):
+        """Store ``value`` for at most ``ttl`` seconds, evicting the LRU entry if full."""
+        if not self.enabled(family) or ttl <= 0:
+            return
+        ttl = min(ttl, self.family_ttls.get(family, self.max_ttl))
+        self._entries[key] = (time.monotonic() + ttl, family, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted_family, _) = self._entries.popitem(last=False)
+            self._family_stats(evicted_family).evictions += 1
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._stats.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {family: vars(s).copy() for family, s in self._stats.items()}
@@ -0,0 +1,154 @@
+"""Price series shared by the chart and sparkline endpoints.
+
+Charts come from Yahoo's ``v8/finance/chart`` endpoint and are cached per ticker
+and range. A sparkline is the daily closes of the 1M chart, so it is derived from
+that cached series rather than fetched separately: whichever endpoint is hit first
+makes the one upstream call and the other reads it from the cache. Alpha Vantage
+is only called for sparklines when Yahoo has nothing.
+"""
+import logging
+from functools import partial
+
+import httpx
+
+from app.config import get_settings
+from app.services.cache import cached_fetch, cached_sparkline
+
+logger = logging.getLogger(__name__)
+
+RANGE_MAP = {
+    "1D": ("1d", "5m"),
+    "5D": ("5d", "15m"),
+    "1M": ("1mo", "1d"),
+    "3M": ("3mo", "1d"),
+    "6M": ("6mo", "1d"),
+    "1Y": ("1y", "1wk"),
+    "5Y": ("5y", "1mo"),
+}
+SPARKLINE_RANGE = "1M"
+
+_client: httpx.AsyncClient | None = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """Pooled client for price requests, shared by every caller in the process."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=10.0)
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def chart_ttl(range_key: str) -> int:
+    return 300 if range_key in ("1D", "5D") else 3600
+
+
+async def load_chart(ticker: str, range_key: str, min_fresh: float | None = None) -> dict:
+    return await cached_fetch(
+        f"chart:{ticker}:{range_key}",
+        partial(fetch_yahoo_chart, ticker, range_key),
+        chart_ttl(range_key),
+        keep=lambda d: bool(d.get("points")),
+        min_fresh=min_fresh,
+    )
+
+
+def sparkline_closes(chart: dict) -> list[float]:
+    return [p["c"] for p in chart.get("points", []) if p.get("c") is not None]
+
+
+async def fetch_sparkline(ticker: str) -> list[float]:
+    """Closes of the (cached) 1M daily chart, or Alpha Vantage's when Yahoo fails."""
+    closes = sparkline_closes(await load_chart(ticker, SPARKLINE_RANGE))
+    if closes:
+        return closes
+    logger.warning("Yahoo Finance failed for %s, trying Alpha Vantage", ticker)
+    return await _fetch_alpha_vantage_closes(ticker)
+
+
+async def load_sparkline(ticker: str, min_fresh: float | None = None) -> list[float]:
+    return await cached_sparkline(ticker, partial(fetch_sparkline, ticker), min_fresh=min_fresh)
+
+
+async def _fetch_alpha_vantage_closes(ticker: str) -> list[float]:
+    settings = get_settings()
+    params = {
+        "function": "TIME_SERIES_DAILY",
+        "symbol": ticker,
+        "outputsize": "compact",
+        "apikey": settings.ALPHA_VANTAGE_API_KEY,
+    }
+    try:
+        resp = await http_client().get(
+            "https://www.alphavantage.co/query", params=params
+        )
+        data = resp.json()
+        ts = data.get("Time Series (Daily)", {})
+        if not ts:
+            return []
+        sorted_dates = sorted(ts.keys())[-30:]
+        return [float(ts[d]["4. close"]) for d in sorted_dates]
+    except Exception:
+        logger.exception("All sparkline sources failed for %s", ticker)
+        return []
+
+
+async def fetch_yahoo_chart(ticker: str, range_key: str) -> dict:
+    """One upstream call for the ``range_key`` series; empty points on failure."""
+    yrange, interval = RANGE_MAP[range_key]
+    url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+    params = {"range": yrange, "interval": interval, "includePrePost": "false"}
+    headers = {"User-Agent": "Mozilla/5.0"}
+
+    try:
+        resp = await http_client().get(url, params=params, headers=headers)
+        raw = resp.json()
+        result = raw.get("chart", {}).get("result", [])
+        if not result:
+            return {"ticker": ticker, "points": [], "meta": {}}
+
+        chart = result[0]
+        meta = chart.get("meta", {})
+        timestamps = chart.get("timestamp", [])
+        quote = chart.get("indicators", {}).get("quote", [{}])[0]
+
+        opens = quote.get("open", [])
+        highs = quote.get("high", [])
+        lows = quote.get("low", [])
+        closes = quote.get("close", [])
+        volumes = quote.get("volume", [])
+
+        points = []
+        for i, ts in enumerate(timestamps):
+            c = closes[i] if i < len(closes) else None
+            if c is None:
+                continue
+            points.append({
+                "t": ts,
+                "o": round(opens[i], 2) if i < len(opens) and opens[i] is not None else None,
+                "h": round(highs[i], 2) if i < len(highs) and highs[i] is not None else None,
+                "l": round(lows[i], 2) if i < len(lows) and lows[i] is not None else None,
+                "c": round(c, 2),
+                "v": volumes[i] if i < len(volumes) else None,
+            })
+
+        return {
+            "ticker": ticker,
+            "points": points,
+            "meta": {
+                "currency": meta.get("currency", "USD"),
+                "regularMarketPrice": meta.get("regularMarketPrice"),
+                "previousClose": meta.get("chartPreviousClose") or meta.get("previousClose"),
+                "exchangeName": meta.get("exchangeName", ""),
+                "shortName": meta.get("shortName", ticker),
+            },
+        }
+    except Exception:
+        logger.exception("Yahoo chart fetch failed for %s", ticker)
+        return {"ticker": ticker, "points": [], "meta": {}}
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.services.cache import acquire_job_lock, release_job_lock
+
+logger = logging.getLogger(__name__)
+
+# First runs are spread over this many seconds so replicas don't start in lockstep.
+_STARTUP_SPREAD = 5.0
+# Leases expire this long before the earliest jittered wake-up of the replica that
+# holds them, so a replica never finds its own lease still held.
+_LEASE_MARGIN = 1.0
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[], Awaitable[object]]
+    interval: float
+    jitter: float = 0.1
+    run_on_start: bool = True
+
+    def next_delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def lease_seconds(self) -> float:
+        """Shorter than the shortest ``next_delay``, minus ``_LEASE_MARGIN``."""
+        shortest = self.interval * (1 - self.jitter)
+        return max(shortest - _LEASE_MARGIN, shortest / 2)
+
+
+class Scheduler:
+    """Runs async jobs on fixed intervals with jitter.
+
+    Each run first claims a Redis lease named after the job that lasts just under
+    the shortest jittered interval, so with several replicas a job runs about once
+    per interval while the replica that ran it is never blocked by its own lease.
+    Failed runs release the lease so another replica can retry.
+    """
+
+    def __init__(self):
+        self.jobs: list[ScheduledJob] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+        jitter: float = 0.1,
+        run_on_start: bool = True,
+    ):
+        self.jobs.append(ScheduledJob(name, func, interval, jitter, run_on_start))
+
+    async def run_once(self, job: ScheduledJob) -> bool:
+        """Run ``job`` if this process wins its lease. Returns whether it ran."""
+        token = await acquire_job_lock(job.name, int(job.lease_seconds() * 1000))
+        if token is None:
+            logger.debug("Skipping job %s, another replica holds the lease", job.name)
+            return False
+        try:
+            await job.func()
+            logger.info("Scheduled job %s finished", job.name)
+        except Exception:
+            logger.exception("Scheduled job %s failed", job.name)
+            await release_job_lock(job.name, token)
+        return True
+
+    async def _loop(self, job: ScheduledJob):
+        delay = random.uniform(0, _STARTUP_SPREAD) if job.run_on_start else job.next_delay()
+        while True:
+            await asyncio.sleep(delay)
+            await self.run_once(job)
+            delay = job.next_delay()
+
+    def start(self):
+        if self._tasks:
+            return
+        for job in self.jobs:
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+        logger.info("Scheduler started with jobs: %s", [j.name for j in self.jobs])
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
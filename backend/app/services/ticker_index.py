@@ -0,0 +1,227 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.models import EarningsEvent
+
+logger = logging.getLogger(__name__)
+
+# A background rebuild picks up rows written by other workers.
+INDEX_MAX_AGE = 15 * 60  # 15 minutes
+_MIN_FUZZY_SCORE = 0.3
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TickerIndex:
+    """In-memory ticker/company lookup for type-ahead.
+
+    Prefix matches come from two sorted lists probed with ``bisect``: tickers
+    ordered by length, so the shortest ticker matches are read first, and company
+    search keys (the full name and each word of it). Both scans stop as soon as
+    ``limit`` results are ranked. When those run short, a trigram index supplies
+    fuzzy matches.
+    """
+
+    def __init__(self):
+        self._names: dict[str, str] = {}
+        self._tickers: list[tuple[int, str, str]] = []
+        self._keys: list[tuple[str, str]] = []
+        self._trigrams: dict[str, set[str]] = {}
+        self.built_at: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _ticker_key(ticker: str) -> tuple[int, str, str]:
+        return len(ticker), ticker.lower(), ticker
+
+    @staticmethod
+    def _name_keys(ticker: str, company_name: str) -> set[str]:
+        name = company_name.lower()
+        return {name, *name.split()} - {ticker.lower()}
+
+    @staticmethod
+    def _index_grams(ticker: str, company_name: str, trigrams: dict[str, set[str]]):
+        for gram in _trigrams(ticker.lower()) | _trigrams(company_name.lower()):
+            trigrams.setdefault(gram, set()).add(ticker)
+
+    def add(self, entries: Iterable[tuple[str, str]]):
+        """Insert or update ``(ticker, company_name)`` pairs in place.
+
+        New keys are appended and the lists re-sorted once per call, so a large
+        batch costs one near-linear sort rather than an ``insort`` per key.
+        """
+        stale_tickers, stale_keys = set(), set()
+        new_tickers, new_keys = [], []
+        for ticker, company_name in entries:
+            ticker = ticker.upper()
+            company_name = company_name or ticker
+            old_name = self._names.get(ticker)
+            if old_name == company_name:
+                continue
+            if old_name is None:
+                new_tickers.append(self._ticker_key(ticker))
+            else:
+                stale_keys.update((key, ticker) for key in self._name_keys(ticker, old_name))
+                stale_tickers.add(ticker)
+                for gram in _trigrams(ticker.lower()) | _trigrams(old_name.lower()):
+                    self._trigrams.get(gram, set()).discard(ticker)
+            self._names[ticker] = company_name
+            new_keys.extend((key, ticker) for key in self._name_keys(ticker, company_name))
+            self._index_grams(ticker, company_name, self._trigrams)
+
+        if stale_keys:
+            self._keys = [k for k in self._keys if k not in stale_keys]
+        if new_keys:
+            self._keys.extend(new_keys)
+            self._keys.sort()
+        if new_tickers:
+            self._tickers.extend(new_tickers)
+            self._tickers.sort()
+
+    def replace(self, entries: Iterable[tuple[str, str]]):
+        """Swap in a full rebuild, sorting the keys once instead of inserting each."""
+        names: dict[str, str] = {}
+        trigrams: dict[str, set[str]] = {}
+        for ticker, company_name in entries:
+            ticker = ticker.upper()
+            names[ticker] = company_name or ticker
+        keys: list[tuple[str, str]] = []
+        for ticker, company_name in names.items():
+            keys.extend((key, ticker) for key in self._name_keys(ticker, company_name))
+            self._index_grams(ticker, company_name, trigrams)
+        keys.sort()
+        self._names, self._keys, self._trigrams = names, keys, trigrams
+        self._tickers = sorted(self._ticker_key(t) for t in names)
+        self.built_at = time.monotonic()
+
+    def _prefix_matches(self, q: str, limit: int) -> list[str]:
+        """Exact ticker, then ticker prefixes shortest first, then company-name prefixes."""
+        if not self._tickers:
+            return []
+        found: dict[str, None] = {}
+        for length in range(len(q), self._tickers[-1][0] + 1):
+            i = bisect.bisect_left(self._tickers, (length, q, ""))
+            while len(found) < limit and i < len(self._tickers):
+                key_length, key, ticker = self._tickers[i]
+                if key_length != length or not key.startswith(q):
+                    break
+                found[ticker] = None
+                i += 1
+            if len(found) >= limit:
+                return list(found)
+        i = bisect.bisect_left(self._keys, (q, ""))
+        while len(found) < limit and i < len(self._keys) and self._keys[i][0].startswith(q):
+            found.setdefault(self._keys[i][1], None)
+            i += 1
+        return list(found)
+
+    def _fuzzy_matches(self, q: str, limit: int, exclude: set[str]) -> list[str]:
+        grams = _trigrams(q)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._trigrams.get(gram, ()))
+        scored = []
+        for ticker, shared in counts.items():
+            if ticker in exclude:
+                continue
+            score = shared / len(grams)
+            if score >= _MIN_FUZZY_SCORE:
+                scored.append((-score, ticker))
+        scored.sort()
+        return [t for _, t in scored[:limit]]
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict]:
+        q = query.strip().lower()
+        if not q:
+            return []
+        tickers = self._prefix_matches(q, limit)
+        if len(tickers) < limit:
+            tickers += self._fuzzy_matches(q, limit - len(tickers), set(tickers))
+        return [{"ticker": t, "company_name": self._names[t]} for t in tickers]
+
+
+ticker_index = TickerIndex()
+_rebuild_task: asyncio.Task | None = None
+
+
+async def _load_entries(db: AsyncSession) -> list[tuple[str, str]]:
+    result = await db.execute(
+        select(EarningsEvent.ticker, func.max(EarningsEvent.company_name))
+        .group_by(EarningsEvent.ticker)
+    )
+    return [(t, name) for t, name in result.all()]
+
+
+async def rebuild_ticker_index():
+    from app.db.database import get_session_factory
+
+    async with get_session_factory()() as db:
+        entries = await _load_entries(db)
+    ticker_index.replace(entries)
+    logger.info("Ticker index rebuilt with %d tickers", len(ticker_index))
+
+
+def _schedule_rebuild():
+    global _rebuild_task
+    if _rebuild_task is None or _rebuild_task.done():
+        _rebuild_task = asyncio.create_task(rebuild_ticker_index())
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _suggest_pg_trgm(db: AsyncSession, query: str, limit: int) -> list[dict]:
+    q = query.strip()
+    pattern = _escape_like(q)
+    score = func.max(func.greatest(
+        func.similarity(EarningsEvent.ticker, q),
+        func.similarity(EarningsEvent.company_name, q),
+    ))
+    result = await db.execute(
+        select(EarningsEvent.ticker, func.max(EarningsEvent.company_name))
+        .where(or_(
+            EarningsEvent.ticker.ilike(f"{pattern}%", escape="\\"),
+            EarningsEvent.company_name.ilike(f"%{pattern}%", escape="\\"),
+            EarningsEvent.company_name.op("%")(q),
+        ))
+        .group_by(EarningsEvent.ticker)
+        .order_by(
+            EarningsEvent.ticker.ilike(f"{pattern}%", escape="\\").desc(),
+            score.desc(),
+            EarningsEvent.ticker,
+        )
+        .limit(limit)
+    )
+    return [{"ticker": t, "company_name": name} for t, name in result.all()]
+
+
+async def suggest_tickers(db: AsyncSession, query: str, limit: int = 10) -> list[dict]:
+    """Type-ahead over tickers and company names.
+
+    Served from the in-process index, built from Postgres on first use and rebuilt
+    in the background once it is older than ``INDEX_MAX_AGE``. With
+    ``SUGGEST_BACKEND=pg_trgm`` the lookup runs against the trigram GIN indexes
+    instead, which keeps every worker consistent without an in-memory copy.
+    """
+    if get_settings().SUGGEST_BACKEND == "pg_trgm":
+        return await _suggest_pg_trgm(db, query, limit)
+
+    if ticker_index.built_at is None:
+        ticker_index.replace(await _load_entries(db))
+    elif time.monotonic() - ticker_index.built_at > INDEX_MAX_AGE:
+        _schedule_rebuild()
+    return ticker_index.suggest(query, limit)
@@ -0,0 +1,43 @@
+"""Standalone ingestion worker: ``python -m app.worker``.
+
+Runs the scheduled jobs outside the API process; set ``INGEST_SCHEDULER=worker``
+on the API replicas so they only read.
+"""
+import asyncio
+import logging
+import signal
+
+from app.db.database import get_engine
+from app.jobs import build_scheduler
+from app.services.cache import close_redis, start_invalidation_listener
+from app.services.earnings_calendar import close_nasdaq_client
+from app.services.price_series import close_http_client
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    scheduler = build_scheduler()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    invalidations = start_invalidation_listener()
+    scheduler.start()
+    try:
+        await stop.wait()
+    finally:
+        await scheduler.stop()
+        if invalidations is not None:
+            invalidations.cancel()
+            await asyncio.gather(invalidations, return_exceptions=True)
+        await close_redis()
+        await close_http_client()
+        await close_nasdaq_client()
+        await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
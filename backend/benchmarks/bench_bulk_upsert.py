@@ -0,0 +1,65 @@
+"""Compare COPY-staged and chunked upserts into earnings_events.
+
+Runs against DATABASE_URL. Every batch is rolled back, so the table is left untouched.
+
+    cd backend
+    python -m benchmarks.bench_bulk_upsert --sizes 1000 10000 100000
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app.db.database import get_engine, get_session_factory
+from app.db.models import Base, ReportTime
+from app.services.earnings_store import bulk_upsert_rows
+
+
+def _synthetic_rows(n: int) -> list[dict]:
+    start = date(2000, 1, 3)
+    return [
+        {
+            "ticker": f"B{i % 5000:05d}",
+            "company_name": f"Benchmark {i % 5000}",
+            "report_date": start + timedelta(days=i // 5000),
+            "report_time": ReportTime.POST_MARKET,
+            "fiscal_quarter": "1999-12-31",
+            "eps_estimate": 1.23,
+            "revenue_estimate": 1e9,
+            "market_cap": float(i),
+        }
+        for i in range(n)
+    ]
+
+
+async def _run(size: int, method: str) -> float:
+    rows = _synthetic_rows(size)
+    factory = get_session_factory()
+    async with factory() as db:
+        started = time.perf_counter()
+        result = await bulk_upsert_rows(db, rows, method=method, skip_unchanged=False)
+        elapsed = time.perf_counter() - started
+        await db.rollback()
+    if result.method != method:
+        raise RuntimeError(f"requested {method} upsert but {result.method} was used")
+    return size / elapsed
+
+
+async def main(sizes: list[int]):
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"{'rows':>8}  {'chunked rows/s':>15}  {'copy rows/s':>12}  {'speedup':>7}")
+    for size in sizes:
+        chunked = await _run(size, "chunked")
+        copy = await _run(size, "copy")
+        print(f"{size:>8}  {chunked:>15,.0f}  {copy:>12,.0f}  {copy / chunked:>6.1f}x")
+
+    await get_engine().dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes))
@@ -0,0 +1,106 @@
+"""Encode/decode time and stored bytes per cache key family, for each codec setting.
+
+Payloads are synthetic but shaped like the real ones; no Redis is needed.
+
+    cd backend
+    python -m benchmarks.bench_cache_codec --iterations 200
+"""
+import argparse
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from app.services import codec as codec_module
+from app.services.codec import CacheCodec
+
+
+def _event(i: int, day: date) -> dict:
+    return {
+        "id": i,
+        "ticker": f"T{i:04d}",
+        "company_name": f"Company {i} Holdings Inc.",
+        "report_date": day.isoformat(),
+        "report_time": random.choice(["pre_market", "post_market", "unknown"]),
+        "fiscal_quarter": "Q4 2025",
+        "eps_estimate": round(random.uniform(-1, 5), 2),
+        "revenue_estimate": None,
+        "market_cap": random.uniform(1e7, 3e12),
+    }
+
+
+def _chart(points: int, step: timedelta) -> dict:
+    start = datetime(2021, 1, 1)
+    price = 100.0
+    rows = []
+    for i in range(points):
+        price *= 1 + random.uniform(-0.02, 0.02)
+        rows.append({
+            "t": int((start + i * step).timestamp()),
+            "o": round(price, 2), "h": round(price * 1.01, 2),
+            "l": round(price * 0.99, 2), "c": round(price, 2),
+            "v": random.randint(10_000, 5_000_000),
+        })
+    return {"ticker": "AAPL", "points": rows}
+
+
+def _families() -> dict[str, object]:
+    monday = date(2026, 2, 16)
+    week = [_event(i, monday + timedelta(days=i % 5)) for i in range(1500)]
+    return {
+        "calendar (1500 events)": {"week_start": "2026-02-16", "week_end": "2026-02-20", "events": week},
+        "highlights": {"week_start": "2026-02-16", "week_end": "2026-02-20", "events": week[:10]},
+        "chart 5Y monthly": _chart(60, timedelta(days=30)),
+        "chart 1D 5-minute": _chart(78, timedelta(minutes=5)),
+        "analysis": {
+            "ticker": "AAPL",
+            "guidance_summary": "Management raised full-year guidance. " * 40,
+            "sentiment": "bullish",
+            "sources": [{"title": f"Source {i}", "url": f"https://example.com/{i}"} for i in range(10)],
+            "analyzed_at": datetime(2026, 2, 17, 16, 30),
+        },
+        "sparkline": [round(random.uniform(90, 110), 2) for _ in range(30)],
+    }
+
+
+def _measure(encode, decode, value, iterations: int) -> tuple[float, float, int]:
+    data = encode(value)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        encode(value)
+    encode_us = (time.perf_counter() - started) / iterations * 1e6
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode(data)
+    decode_us = (time.perf_counter() - started) / iterations * 1e6
+    return encode_us, decode_us, len(data)
+
+
+def main(iterations: int):
+    random.seed(7)
+    variants = {
+        "json.dumps (old)": (
+            lambda v: json.dumps(v, default=str).encode(),
+            json.loads,
+        ),
+    }
+    for compression in ("none", "zlib", "zstd"):
+        if compression == "zstd" and codec_module.zstandard is None:
+            continue
+        c = CacheCodec(compression)
+        variants[f"codec/{compression}"] = (c.encode, c.decode)
+
+    encoder = "orjson" if codec_module.orjson is not None else "stdlib json"
+    print(f"codec JSON encoder: {encoder}, compression threshold 1024 bytes\n")
+    print(f"{'family':<24} {'variant':<18} {'encode us':>10} {'decode us':>10} {'bytes':>9}")
+    for family, value in _families().items():
+        for name, (encode, decode) in variants.items():
+            enc, dec, size = _measure(encode, decode, value, iterations)
+            print(f"{family:<24} {name:<18} {enc:>10.1f} {dec:>10.1f} {size:>9,}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    main(parser.parse_args().iterations)
@@ -6,6 +6,18 @@ import pytest
 from httpx import AsyncClient, ASGITransport
 
 from app.main import app
+from app.services import cache, earnings_calendar
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_caches():
+    cache.local_cache().clear()
+    cache._ticker_refreshed_local.clear()
+    cache._breaker = None
+    earnings_calendar._nasdaq_client = None
+    yield
+    cache.local_cache().clear()
+    cache._ticker_refreshed_local.clear()
 
 
 @pytest.fixture(scope="session")
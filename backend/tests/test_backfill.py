@@ -0,0 +1,151 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.backfill import RateLimiter, load_checkpoint, run_backfill
+
+
+def _rows(day):
+    return [{"symbol": "AAPL", "date": day.isoformat()}]
+
+
+async def _run(tmp_path, fetch, end=date(2026, 2, 13), **kwargs):
+    upsert = AsyncMock()
+    with patch("app.backfill._prepare_schema", new_callable=AsyncMock), \
+            patch("app.backfill.fetch_nasdaq_day", side_effect=fetch), \
+            patch("app.backfill.upsert_earnings_events", upsert), \
+            patch("app.backfill.get_session_factory"):
+        stats = await run_backfill(
+            date(2026, 2, 2), end,
+            batch_days=3, rate=0, checkpoint=tmp_path / "cp.json", **kwargs,
+        )
+    return stats, upsert
+
+
+class TestRunBackfill:
+    @pytest.mark.asyncio
+    async def test_loads_weekdays_in_batches(self, tmp_path):
+        fetched = []
+
+        async def fetch(client, day):
+            fetched.append(day)
+            return _rows(day)
+
+        stats, upsert = await _run(tmp_path, fetch)
+
+        assert len(fetched) == 10
+        assert all(d.weekday() < 5 for d in fetched)
+        assert (stats.days, stats.rows, stats.failed) == (10, 10, [])
+        assert upsert.call_count == 4
+        assert json.loads((tmp_path / "cp.json").read_text())["next"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_days_are_checkpointed_and_retried(self, tmp_path):
+        async def flaky(client, day):
+            return None if day == date(2026, 2, 4) else _rows(day)
+
+        stats, _ = await _run(tmp_path, flaky)
+        assert stats.failed == [date(2026, 2, 4)]
+        assert json.loads((tmp_path / "cp.json").read_text())["failed"] == ["2026-02-04"]
+
+        retried = []
+
+        async def fetch(client, day):
+            retried.append(day)
+            return _rows(day)
+
+        stats, _ = await _run(tmp_path, fetch)
+        assert retried == [date(2026, 2, 4)]
+        assert stats.failed == []
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_interruption(self, tmp_path):
+        calls = []
+
+        async def crashing(client, day):
+            calls.append(day)
+            return _rows(day)
+
+        upsert = AsyncMock(side_effect=[None, RuntimeError("db down")])
+        with patch("app.backfill._prepare_schema", new_callable=AsyncMock), \
+                patch("app.backfill.fetch_nasdaq_day", side_effect=crashing), \
+                patch("app.backfill.upsert_earnings_events", upsert), \
+                patch("app.backfill.get_session_factory"):
+            with pytest.raises(RuntimeError):
+                await run_backfill(
+                    date(2026, 2, 2), date(2026, 2, 13),
+                    batch_days=3, rate=0, checkpoint=tmp_path / "cp.json",
+                )
+
+        saved = load_checkpoint(tmp_path / "cp.json", date(2026, 2, 2))
+        assert saved["next"] == "2026-02-05"
+
+        resumed = []
+
+        async def fetch(client, day):
+            resumed.append(day)
+            return _rows(day)
+
+        await _run(tmp_path, fetch)
+        assert resumed[0] == date(2026, 2, 5)
+        assert len(resumed) == 7
+
+    @pytest.mark.asyncio
+    async def test_rate_token_is_taken_inside_the_concurrency_slot(self, tmp_path):
+        in_flight = 0
+        seen_at_wait = []
+
+        async def fetch(client, day):
+            nonlocal in_flight
+            in_flight += 1
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return _rows(day)
+
+        async def wait():
+            seen_at_wait.append(in_flight)
+
+        with patch.object(RateLimiter, "wait", side_effect=wait):
+            await _run(tmp_path, fetch, concurrency=1)
+
+        assert len(seen_at_wait) == 10
+        assert set(seen_at_wait) == {0}
+
+    @pytest.mark.asyncio
+    async def test_later_end_extends_a_finished_run(self, tmp_path):
+        async def flaky(client, day):
+            return None if day == date(2026, 2, 4) else _rows(day)
+
+        await _run(tmp_path, flaky)
+
+        fetched = []
+
+        async def fetch(client, day):
+            fetched.append(day)
+            return _rows(day)
+
+        stats, _ = await _run(tmp_path, fetch, end=date(2026, 2, 20))
+        assert fetched == [date(2026, 2, 4)] + [date(2026, 2, 16) + timedelta(days=i) for i in range(5)]
+        assert stats.failed == []
+        assert json.loads((tmp_path / "cp.json").read_text())["end"] == "2026-02-20"
+
+    def test_checkpoint_for_other_start_is_ignored(self, tmp_path):
+        path = tmp_path / "cp.json"
+        path.write_text(json.dumps({"start": "2020-01-01", "end": "2020-12-31", "next": None, "failed": []}))
+        assert load_checkpoint(path, date(2026, 2, 2)) is None
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_spaces_calls(self):
+        limiter = RateLimiter(rate=10)
+        with patch("app.backfill.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            for _ in range(3):
+                await limiter.wait()
+
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 2
+        assert delays[1] > delays[0] > 0
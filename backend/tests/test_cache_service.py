@@ -1,14 +1,32 @@
+import asyncio
+import json
+import time
 from unittest.mock import AsyncMock, patch, MagicMock
 
 import pytest
+import redis.asyncio as redis
 
+from app.config import get_settings
+from app.services import cache
 from app.services.cache import (
     get_cached_market_cap,
     set_cached_market_cap,
     get_many_cached_market_caps,
     set_many_cached_market_caps,
     get_cached_calendar,
+    get_calendar_version,
     set_cached_calendar,
+    invalidate_cached_calendars,
+    cached_fetch,
+    should_refresh_early,
+    single_flight,
+    set_cached,
+    local_cache,
+    _apply_invalidation,
+    _INSTANCE_ID,
+    get_cached_highlights,
+    get_many_enrichment_markers,
+    get_missing_market_caps,
     get_cached_analysis_redis,
     set_cached_analysis_redis,
     _market_cap_key,
@@ -145,6 +163,30 @@ class TestGracefulDegradation:
         await set_cached_market_cap("AAPL", 1.0)
 
 
+class TestRedisCircuitBreaker:
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_trips_breaker(self):
+        settings = get_settings().model_copy(update={
+            "REDIS_URL": "redis://127.0.0.1:1/0", "REDIS_BREAKER_FAILURES": 2,
+        })
+        with patch("app.services.cache.get_settings", return_value=settings), \
+                patch.object(cache, "_redis_client", None):
+            assert await get_cached_market_cap("AAPL") is None
+            assert await get_cached_market_cap("AAPL") is None
+            assert cache.redis_status()["state"] == "open"
+            assert await cache.get_redis() is None
+            await cache.close_redis()
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_falls_back_to_local_paths(self):
+        settings = get_settings().model_copy(update={"REDIS_URL": "redis://127.0.0.1:1/0"})
+        with patch("app.services.cache.get_settings", return_value=settings):
+            cache.redis_breaker()._opened_at = time.monotonic()
+            await cache.set_cached("chart:AAPL:1M", {"points": [1]})
+            assert await cache.get_cached("chart:AAPL:1M") == {"points": [1]}
+            assert await cache.claim_ticker_refresh("AAPL") is not None
+
+
 class TestAnalysisCache:
     @pytest.mark.asyncio
     @patch("app.services.cache.get_redis")
@@ -198,3 +240,390 @@ class TestAnalysisCache:
 
         result = await get_cached_analysis_redis("AAPL", "Q4-2025")
         assert result is None
+
+
+class TestCalendarInvalidation:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_deletes_week_keys(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_get_redis.return_value = mock_redis
+
+        mock_pipe = MagicMock(execute=AsyncMock())
+        mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+        mock_get_redis.return_value = mock_redis
+
+        await invalidate_cached_calendars(["2026-02-16", "2026-02-23"])
+        mock_pipe.delete.assert_called_once_with(
+            "earnings:calendar:2026-02-16",
+            "earnings:calendar:2026-02-23",
+            "earnings:highlights:2026-02-16",
+            "earnings:highlights:2026-02-23",
+        )
+        assert [c.args[0] for c in mock_pipe.incr.call_args_list] == [
+            "earnings:calendar_version:2026-02-16",
+            "earnings:calendar_version:2026-02-23",
+        ]
+        mock_pipe.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_write_after_invalidation_is_dropped(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        version = await get_calendar_version("2026-03-02")
+
+        await invalidate_cached_calendars(["2026-03-02"])
+        await set_cached_calendar("2026-03-02", {"events": [1]}, version=version)
+        assert await get_cached_calendar("2026-03-02") is None
+
+        await set_cached_calendar("2026-03-02", {"events": [2]}, version=await get_calendar_version("2026-03-02"))
+        assert await get_cached_calendar("2026-03-02") == {"events": [2]}
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_write_checks_redis_version(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=b"4")
+        mock_redis.eval = AsyncMock(return_value=0)
+        mock_get_redis.return_value = mock_redis
+
+        version = await get_calendar_version("2026-03-09")
+        await set_cached_calendar("2026-03-09", {"events": []}, version=version)
+
+        args = mock_redis.eval.call_args[0]
+        assert args[1:4] == (2, "earnings:calendar:2026-03-09", "earnings:calendar_version:2026-03-09")
+        assert args[-1] == 4
+        mock_redis.setex.assert_not_called()
+        assert local_cache().get("calendar", "earnings:calendar:2026-03-09") is None
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_noop_for_no_weeks(self, mock_get_redis):
+        await invalidate_cached_calendars([])
+        mock_get_redis.assert_not_called()
+
+
+class TestHighlightsCache:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_reads_weeks_in_one_round_trip(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.mget = AsyncMock(return_value=['{"events": []}', None])
+        mock_get_redis.return_value = mock_redis
+
+        result = await get_cached_highlights(["2026-02-09", "2026-02-16"])
+        assert result == {"2026-02-09": {"events": []}, "2026-02-16": None}
+        mock_redis.mget.assert_called_once_with(
+            ["earnings:highlights:2026-02-09", "earnings:highlights:2026-02-16"]
+        )
+
+
+class TestLocalTier:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_redis_hit_is_served_locally_next_time(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.get = AsyncMock(return_value='{"events": []}')
+        mock_get_redis.return_value = mock_redis
+
+        assert await get_cached_calendar("2026-02-16") == {"events": []}
+        assert await get_cached_calendar("2026-02-16") == {"events": []}
+        mock_redis.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_write_publishes_eviction(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_get_redis.return_value = mock_redis
+
+        await set_cached("chart:AAPL:1M", [1.0])
+
+        channel, payload = mock_redis.publish.call_args[0]
+        assert channel == "earnings:l1:invalidate"
+        assert json.loads(payload)["keys"] == ["chart:AAPL:1M"]
+        assert local_cache().get("chart", "chart:AAPL:1M") == [1.0]
+
+    def test_remote_invalidation_evicts_but_own_is_ignored(self):
+        local_cache().set("calendar", "earnings:calendar:2026-02-16", {"events": []}, 60)
+
+        _apply_invalidation(json.dumps({"origin": _INSTANCE_ID, "keys": ["earnings:calendar:2026-02-16"]}))
+        assert local_cache().get("calendar", "earnings:calendar:2026-02-16") is not None
+
+        _apply_invalidation(json.dumps({"origin": "other", "keys": ["earnings:calendar:2026-02-16"]}))
+        assert local_cache().get("calendar", "earnings:calendar:2026-02-16") is None
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_invalidate_calendars_evicts_locally(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        local_cache().set("calendar", "earnings:calendar:2026-02-16", {"events": []}, 60)
+
+        await invalidate_cached_calendars(["2026-02-16"])
+        assert await get_cached_calendar("2026-02-16") is None
+
+
+class TestCacheMetrics:
+    def test_key_family(self):
+        assert cache.key_family("earnings:calendar:2026-02-16") == "calendar"
+        assert cache.key_family(b"earnings:mcap:AAPL") == "mcap"
+        assert cache.key_family("chart:AAPL:1M") == "chart"
+        assert cache._command_family(("EVAL", "script", 1, "scheduler:lock:sync", "t")) == "scheduler"
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_lookups_are_counted_by_tier(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.mget = AsyncMock(return_value=["1.5", None])
+        mock_get_redis.return_value = mock_redis
+        before = {r: cache._lookups.value("mcap", r) for r in ("l1", "redis", "miss")}
+
+        await get_many_cached_market_caps(["AAPL", "MSFT"])
+        await get_many_cached_market_caps(["AAPL"])
+
+        assert cache._lookups.value("mcap", "l1") - before["l1"] == 1
+        assert cache._lookups.value("mcap", "redis") - before["redis"] == 1
+        assert cache._lookups.value("mcap", "miss") - before["miss"] == 1
+
+    @pytest.mark.asyncio
+    async def test_commands_are_timed_and_sized(self):
+        client = cache._BreakerRedis()
+        before = cache._value_bytes.count("sparkline", "write")
+        with patch.object(redis.Redis, "execute_command", AsyncMock(return_value=True)):
+            await client.set("earnings:sparkline:AAPL", b"\x01[1.0]", ex=60)
+
+        assert cache._value_bytes.count("sparkline", "write") == before + 1
+        assert cache._redis_seconds.count("sparkline", "SET") >= 1
+
+
+class TestStaleWhileRevalidate:
+    def test_xfetch_refreshes_only_near_expiry(self):
+        with patch("app.services.cache.random.random", return_value=0.5):
+            # -ln(0.5) * delta 2s ~= 1.4s of lookahead
+            assert not should_refresh_early(100.0, 2.0, 98.0, 1.0)
+            assert should_refresh_early(100.0, 2.0, 99.0, 1.0)
+            assert not should_refresh_early(100.0, 2.0, 99.0, 0.1)
+        assert should_refresh_early(100.0, 0.0, 100.0, 1.0)
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_miss_fetches_and_stores_envelope(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.pubsub = MagicMock(return_value=AsyncMock())
+        mock_get_redis.return_value = mock_redis
+        fetch = AsyncMock(return_value={"points": [1]})
+
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == {"points": [1]}
+
+        key, ttl, data = mock_redis.setex.call_args[0]
+        entry = json.loads(data[1:])
+        assert key == "chart:AAPL:1M"
+        assert entry["v"] == {"points": [1]}
+        assert 3600 * 0.9 <= entry["soft"] - time.time() <= 3600 * 1.1
+        assert 3600 * 4 * 0.9 <= ttl <= 3600 * 4 * 1.1
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_failed_fetch_is_not_cached(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=None)
+        mock_redis.pubsub = MagicMock(return_value=AsyncMock())
+        mock_get_redis.return_value = mock_redis
+
+        assert await cached_fetch("news:AAPL:30", AsyncMock(return_value=[]), 3600) == []
+        mock_redis.setex.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_fresh_value_is_served_without_fetching(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        local_cache().set("chart", "chart:AAPL:1M", {"v": [1.0], "soft": 1e12, "delta": 0.1}, 60)
+        fetch = AsyncMock(return_value=[2.0])
+
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == [1.0]
+        fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_stale_value_is_served_and_refreshed_once(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        local_cache().set("chart", "chart:AAPL:1M", {"v": [1.0], "soft": 0.0, "delta": 0.1}, 60)
+        fetch = AsyncMock(return_value=[2.0])
+
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == [1.0]
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == [1.0]
+        await asyncio.gather(*cache._swr_refreshes.values())
+
+        fetch.assert_awaited_once()
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == [2.0]
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_refresh_skipped_when_another_worker_holds_lock(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.get = AsyncMock(return_value=json.dumps({"v": [1.0], "soft": 0.0, "delta": 0.1}))
+        mock_redis.set = AsyncMock(return_value=None)
+        mock_get_redis.return_value = mock_redis
+        fetch = AsyncMock(return_value=[2.0])
+
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600) == [1.0]
+        await asyncio.gather(*cache._swr_refreshes.values())
+        fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_legacy_value_is_served_and_refreshed(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        await set_cached("news:AAPL:30", {"ticker": "AAPL", "articles": [{"title": "old"}]})
+        fetch = AsyncMock(return_value={"ticker": "AAPL", "articles": [{"title": "new"}]})
+
+        result = await cached_fetch("news:AAPL:30", fetch, 3600, keep=lambda r: bool(r["articles"]))
+        assert result["articles"] == [{"title": "old"}]
+        await asyncio.gather(*cache._swr_refreshes.values())
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_min_fresh_refetches_entries_expiring_soon(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        soon = time.time() + 600
+        local_cache().set("chart", "chart:AAPL:1M", {"v": [1.0], "soft": soon, "delta": 0.1}, 60)
+        fetch = AsyncMock(return_value=[2.0])
+
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600, min_fresh=300) == [1.0]
+        assert await cached_fetch("chart:AAPL:1M", fetch, 3600, min_fresh=1800) == [2.0]
+        fetch.assert_awaited_once()
+
+
+class TestSparklineBatch:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_get_many_uses_one_mget_and_refreshes_stale(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.mget = AsyncMock(return_value=[
+            json.dumps({"v": [1.0], "soft": 1e12, "delta": 0.1}),
+            json.dumps({"v": [2.0], "soft": 0.0, "delta": 0.1}),
+            None,
+        ])
+        mock_get_redis.return_value = mock_redis
+        fetch = AsyncMock(return_value=[5.0])
+
+        with patch("app.services.cache._acquire_lock", new_callable=AsyncMock, return_value=None):
+            result = await cache.get_many_cached_sparklines(["AAPL", "MSFT", "NVDA"], lambda t: fetch)
+            await asyncio.gather(*cache._swr_refreshes.values())
+
+        assert result == {"AAPL": [1.0], "MSFT": [2.0], "NVDA": None}
+        mock_redis.mget.assert_called_once_with(
+            ["earnings:sparkline:AAPL", "earnings:sparkline:MSFT", "earnings:sparkline:NVDA"]
+        )
+        assert list(cache._swr_refreshes) == []
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_set_many_pipelines_envelopes(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_pipe = MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=mock_pipe)
+        mock_get_redis.return_value = mock_redis
+
+        await cache.set_many_cached_sparklines({"AAPL": ([1.0], 0.25), "NVDA": ([], 0.1)})
+
+        assert mock_pipe.setex.call_count == 1
+        key, ttl, data = mock_pipe.setex.call_args[0]
+        assert key == "earnings:sparkline:AAPL"
+        assert cache.codec().decode(data)["v"] == [1.0]
+        mock_pipe.execute.assert_awaited_once()
+        assert local_cache().get("sparkline", key)["delta"] == 0.25
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_concurrent_misses_share_one_fetch(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return [1.0]
+
+        fetch_mock = AsyncMock(side_effect=fetch)
+        calls = [asyncio.create_task(cached_fetch("chart:AAPL:1M", fetch_mock, 3600)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*calls) == [[1.0]] * 5
+        fetch_mock.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_leader_publishes_result(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.pubsub = MagicMock(return_value=AsyncMock())
+        mock_get_redis.return_value = mock_redis
+
+        assert await single_flight("news:AAPL:30", AsyncMock(return_value={"articles": []})) == {"articles": []}
+
+        channel, payload = mock_redis.publish.call_args[0]
+        assert channel == "earnings:flight_done:news:AAPL:30"
+        assert cache.codec().decode(payload) == {"ok": True, "v": {"articles": []}}
+        mock_redis.eval.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_follower_uses_published_result(self, mock_get_redis):
+        pubsub = AsyncMock()
+        pubsub.get_message = AsyncMock(side_effect=[
+            None,
+            {"data": cache.codec().encode({"ok": True, "v": [3.0]})},
+        ])
+        mock_redis = AsyncMock()
+        mock_redis.pubsub = MagicMock(return_value=pubsub)
+        mock_redis.set = AsyncMock(return_value=None)
+        mock_get_redis.return_value = mock_redis
+        fetch = AsyncMock(return_value=[9.0])
+
+        assert await single_flight("chart:AAPL:1M", fetch) == [3.0]
+        fetch.assert_not_called()
+        pubsub.subscribe.assert_awaited_once_with("earnings:flight_done:chart:AAPL:1M")
+        pubsub.aclose.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_follower_fetches_when_leader_fails(self, mock_get_redis):
+        pubsub = AsyncMock()
+        pubsub.get_message = AsyncMock(return_value={"data": cache.codec().encode({"ok": False, "v": None})})
+        mock_redis = AsyncMock()
+        mock_redis.pubsub = MagicMock(return_value=pubsub)
+        mock_redis.set = AsyncMock(return_value=None)
+        mock_get_redis.return_value = mock_redis
+        fetch = AsyncMock(return_value=[9.0])
+
+        assert await single_flight("chart:AAPL:1M", fetch) == [9.0]
+        fetch.assert_awaited_once()
+
+
+class TestEnrichmentCache:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_get_missing_market_caps(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.mget = AsyncMock(return_value=["1", None])
+        mock_get_redis.return_value = mock_redis
+
+        result = await get_missing_market_caps(["TINY", "AAPL"])
+        assert result == {"TINY"}
+        mock_redis.mget.assert_called_once_with(
+            ["earnings:mcap_missing:TINY", "earnings:mcap_missing:AAPL"]
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_get_enrichment_markers(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.mget = AsyncMock(return_value=['{"filled": 4}', None])
+        mock_get_redis.return_value = mock_redis
+
+        result = await get_many_enrichment_markers(["2026-02-16", "2026-02-17"])
+        assert result == {"2026-02-16": {"filled": 4}, "2026-02-17": None}
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.cache_warmer import hot_tickers, top_reporters, warm_caches
+
+
+def _session(db):
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=db)
+    session.__aexit__ = AsyncMock(return_value=False)
+    return session
+
+
+class TestHotTickers:
+    @pytest.mark.asyncio
+    async def test_top_reporters_ranked_in_sql(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(
+            scalars=MagicMock(return_value=MagicMock(all=MagicMock(return_value=["AAPL"])))
+        ))
+
+        assert await top_reporters(db, date(2026, 2, 16), date(2026, 2, 27), 5) == ["AAPL"]
+
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ORDER BY max(earnings_events.market_cap) DESC NULLS LAST" in sql
+        assert "LIMIT" in sql
+
+    @pytest.mark.asyncio
+    async def test_merges_this_and_next_week_with_favorites(self):
+        with patch("app.services.cache_warmer.top_reporters", new_callable=AsyncMock,
+                   return_value=["NVDA", "AAPL"]) as mock_top, \
+                patch("app.services.cache_warmer.most_favorited", new_callable=AsyncMock,
+                      return_value=["aapl", "TSLA"]):
+            tickers = await hot_tickers(MagicMock(), date(2026, 2, 18))
+
+        assert tickers == ["NVDA", "AAPL", "TSLA"]
+        _, start, end, _ = mock_top.call_args[0]
+        assert (start, end) == (date(2026, 2, 16), date(2026, 2, 27))
+
+
+class TestWarmCaches:
+    @pytest.mark.asyncio
+    async def test_warms_every_cache_under_the_concurrency_budget(self):
+        settings = MagicMock(WARM_CONCURRENCY=2, WARM_INTERVAL=1800)
+        running = peak = 0
+
+        async def load(*args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+        with patch("app.db.database.get_session_factory", return_value=lambda: _session(MagicMock())), \
+                patch("app.services.cache_warmer.get_settings", return_value=settings), \
+                patch("app.services.cache_warmer.hot_tickers", new_callable=AsyncMock, return_value=["AAPL", "MSFT"]), \
+                patch("app.services.cache_warmer.load_highlights", new_callable=AsyncMock) as mock_highlights, \
+                patch("app.services.cache_warmer.load_sparkline", side_effect=load) as mock_sparkline, \
+                patch("app.services.cache_warmer.load_chart", side_effect=load) as mock_chart, \
+                patch("app.services.cache_warmer.load_news", side_effect=RuntimeError("rate limited")):
+            stats = await warm_caches(date(2026, 2, 18))
+
+        assert (stats.tickers, stats.loads, stats.failed) == (2, 5, 2)
+        assert peak <= 2
+        mock_highlights.assert_awaited_once()
+        mock_sparkline.assert_any_call("AAPL", 1800)
+        mock_chart.assert_any_call("MSFT", "1M", 1800)
@@ -1,9 +1,14 @@
+import asyncio
+import json
 from datetime import date, timedelta
 from types import SimpleNamespace
 from unittest.mock import patch, AsyncMock
 
 import pytest
 
+from app.config import get_settings
+from app.db.models import ReportTime
+
 
 class TestCalendarWeekEndpoint:
     @pytest.mark.asyncio
@@ -104,7 +109,7 @@ class TestHighlightsEndpoint:
     @pytest.mark.asyncio
     async def test_highlights_returns_200(self, async_client):
         with patch(
-            "app.routers.calendar.get_week_earnings",
+            "app.services.highlights.top_week_events",
             new_callable=AsyncMock,
             return_value=[],
         ):
@@ -118,20 +123,19 @@ class TestHighlightsEndpoint:
         assert "events" in data["this_week"]
 
     @pytest.mark.asyncio
-    async def test_highlights_sorted_by_market_cap(self, async_client):
+    async def test_highlights_keep_sql_ranking(self, async_client):
         today = date.today()
         monday = today - timedelta(days=today.weekday())
-
-        mock_events = [
-            _make_event("SMALL", monday, market_cap=1_000_000),
-            _make_event("BIG", monday, market_cap=1_000_000_000_000),
-            _make_event("MID", monday, market_cap=50_000_000_000),
+        ranked = [
+            vars(_make_event("BIG", monday, market_cap=1_000_000_000_000)),
+            vars(_make_event("MID", monday, market_cap=50_000_000_000)),
+            vars(_make_event("SMALL", monday, market_cap=1_000_000)),
         ]
 
         with patch(
-            "app.routers.calendar.get_week_earnings",
+            "app.services.highlights.top_week_events",
             new_callable=AsyncMock,
-            return_value=mock_events,
+            return_value=ranked,
         ):
             response = await async_client.get("/api/calendar/highlights")
 
@@ -140,21 +144,296 @@ class TestHighlightsEndpoint:
         assert this_tickers == ["BIG", "MID", "SMALL"]
 
     @pytest.mark.asyncio
-    async def test_highlights_limited_to_10(self, async_client):
-        today = date.today()
-        monday = today - timedelta(days=today.weekday())
+    async def test_highlights_served_from_week_cache(self, async_client):
+        section = {"week_start": "2026-02-16", "week_end": "2026-02-20", "events": []}
 
-        mock_events = [
-            _make_event(f"T{i}", monday, market_cap=(15 - i) * 1e9)
-            for i in range(15)
-        ]
+        async def cached(week_starts):
+            return {w: section for w in week_starts}
+
+        with patch("app.services.highlights.get_cached_highlights", side_effect=cached), \
+                patch("app.services.highlights.top_week_events", new_callable=AsyncMock) as mock_top:
+            response = await async_client.get("/api/calendar/highlights")
+
+        assert response.status_code == 200
+        assert response.json()["this_week"]["week_start"] == "2026-02-16"
+        mock_top.assert_not_called()
+
+
+class TestWeekCache:
+    @pytest.mark.asyncio
+    async def test_cached_week_skips_query(self, async_client):
+        payload = {"week_start": "2026-02-16", "week_end": "2026-02-20", "events": []}
+        with patch(
+            "app.routers.calendar.get_cached_calendar",
+            new_callable=AsyncMock,
+            return_value=payload,
+        ) as mock_get_cache, patch(
+            "app.routers.calendar.get_week_earnings",
+            new_callable=AsyncMock,
+        ) as mock_week:
+            response = await async_client.get(
+                "/api/calendar/week/next", params={"date": "2026-02-09"}
+            )
 
+        assert response.json() == payload
+        mock_get_cache.assert_called_once_with("2026-02-16")
+        mock_week.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_miss_stores_serialized_week(self, async_client):
+        events = [_make_event("AAPL", date(2026, 2, 17), market_cap=3e12)]
         with patch(
+            "app.routers.calendar.get_cached_calendar",
+            new_callable=AsyncMock,
+            return_value=None,
+        ), patch(
+            "app.routers.calendar.get_calendar_version",
+            new_callable=AsyncMock,
+            return_value=(3, 7),
+        ), patch(
+            "app.routers.calendar.set_cached_calendar",
+            new_callable=AsyncMock,
+        ) as mock_set_cache, patch(
             "app.routers.calendar.get_week_earnings",
             new_callable=AsyncMock,
-            return_value=mock_events,
+            return_value=events,
         ):
-            response = await async_client.get("/api/calendar/highlights")
+            response = await async_client.get(
+                "/api/calendar/week", params={"date": "2026-02-18"}
+            )
+
+        week_start, payload = mock_set_cache.call_args[0]
+        assert week_start == "2026-02-16"
+        assert mock_set_cache.call_args.kwargs["version"] == (3, 7)
+        assert payload == response.json()
+        assert payload["events"][0]["ticker"] == "AAPL"
+
+
+class TestSearchEndpoint:
+    @pytest.mark.asyncio
+    async def test_reports_staleness(self, async_client):
+        events = [_make_event("AAPL", date(2026, 1, 29))]
+        with patch(
+            "app.routers.calendar.search_ticker",
+            new_callable=AsyncMock,
+            return_value=(events, "stale"),
+        ):
+            response = await async_client.get("/api/calendar/search", params={"ticker": "aapl"})
 
         data = response.json()
-        assert len(data["this_week"]["events"]) == 10
+        assert data["ticker"] == "AAPL"
+        assert data["served"] == "stale"
+        assert data["events"][0]["ticker"] == "AAPL"
+
+
+class TestSuggestEndpoint:
+    @pytest.mark.asyncio
+    async def test_returns_suggestions(self, async_client):
+        with patch(
+            "app.routers.calendar.suggest_tickers",
+            new_callable=AsyncMock,
+            return_value=[{"ticker": "AAPL", "company_name": "Apple Inc."}],
+        ) as mock_suggest:
+            response = await async_client.get("/api/calendar/suggest", params={"q": "app"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "query": "app",
+            "results": [{"ticker": "AAPL", "company_name": "Apple Inc."}],
+        }
+        assert mock_suggest.call_args[0][1:] == ("app", 10)
+
+    @pytest.mark.asyncio
+    async def test_requires_query(self, async_client):
+        response = await async_client.get("/api/calendar/suggest")
+        assert response.status_code == 422
+
+
+def _range_events(*rows):
+    async def fake_stream(start, end):
+        for row in rows:
+            yield row
+    return fake_stream
+
+
+_RANGE_ROW = {
+    "id": 1,
+    "ticker": "AAPL",
+    "company_name": "Apple Inc.",
+    "report_date": date(2026, 2, 17),
+    "report_time": "post_market",
+    "fiscal_quarter": "Q1 2026",
+    "eps_estimate": 2.1,
+    "revenue_estimate": None,
+    "market_cap": 3e12,
+}
+
+
+class TestRangeEndpoint:
+    @pytest.mark.asyncio
+    async def test_streams_ndjson(self, async_client):
+        second = {**_RANGE_ROW, "id": 2, "ticker": "MSFT"}
+        with patch(
+            "app.routers.calendar.stream_range_events",
+            side_effect=_range_events(_RANGE_ROW, second),
+        ) as mock_stream:
+            response = await async_client.get(
+                "/api/calendar/range", params={"start": "2026-02-16", "end": "2026-03-13"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["ticker"] for line in lines] == ["AAPL", "MSFT"]
+        assert json.loads(lines[0])["report_date"] == "2026-02-17"
+        assert mock_stream.call_args[0] == (date(2026, 2, 16), date(2026, 3, 13))
+
+    @pytest.mark.asyncio
+    async def test_streams_json_document(self, async_client):
+        with patch(
+            "app.routers.calendar.stream_range_events",
+            side_effect=_range_events(_RANGE_ROW),
+        ):
+            response = await async_client.get(
+                "/api/calendar/range",
+                params={"start": "2026-02-16", "end": "2026-02-20", "format": "json"},
+            )
+
+        data = response.json()
+        assert data["start"] == "2026-02-16"
+        assert [e["ticker"] for e in data["events"]] == ["AAPL"]
+
+    @pytest.mark.asyncio
+    async def test_empty_json_range(self, async_client):
+        with patch(
+            "app.routers.calendar.stream_range_events",
+            side_effect=_range_events(),
+        ):
+            response = await async_client.get(
+                "/api/calendar/range",
+                params={"start": "2026-02-16", "end": "2026-02-20", "format": "json"},
+            )
+
+        assert response.json()["events"] == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_ranges(self, async_client):
+        reversed_range = await async_client.get(
+            "/api/calendar/range", params={"start": "2026-03-01", "end": "2026-02-01"}
+        )
+        too_wide = await async_client.get(
+            "/api/calendar/range", params={"start": "2026-01-01", "end": "2026-12-31"}
+        )
+        assert reversed_range.status_code == 400
+        assert too_wide.status_code == 400
+
+
+class TestWeekFilters:
+    @pytest.mark.asyncio
+    async def test_filters_are_passed_to_sql_page(self, async_client):
+        with patch(
+            "app.routers.calendar.get_week_page",
+            new_callable=AsyncMock,
+            return_value=([_RANGE_ROW], "next-token"),
+        ) as mock_page, patch(
+            "app.routers.calendar.get_cached_calendar", new_callable=AsyncMock,
+        ) as mock_cache:
+            response = await async_client.get(
+                "/api/calendar/week",
+                params=[
+                    ("date", "2026-02-18"),
+                    ("min_market_cap", "1e10"),
+                    ("report_time", "post_market"),
+                    ("ticker", "aapl,msft"),
+                    ("ticker", "NVDA"),
+                    ("limit", "50"),
+                ],
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["next_cursor"] == "next-token"
+        assert [e["ticker"] for e in data["events"]] == ["AAPL"]
+        kwargs = mock_page.call_args.kwargs
+        assert kwargs["min_market_cap"] == 1e10
+        assert kwargs["report_time"] == ReportTime.POST_MARKET
+        assert kwargs["tickers"] == ["AAPL", "MSFT", "NVDA"]
+        assert kwargs["limit"] == 50
+        mock_cache.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cursor_defaults_page_size(self, async_client):
+        with patch(
+            "app.routers.calendar.get_week_page",
+            new_callable=AsyncMock,
+            return_value=([], None),
+        ) as mock_page:
+            await async_client.get("/api/calendar/week", params={"cursor": "abc"})
+
+        assert mock_page.call_args.kwargs["limit"] == 100
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_rejected(self, async_client):
+        response = await async_client.get(
+            "/api/calendar/week", params={"cursor": "not-a-cursor", "limit": 10}
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_unknown_report_time_is_rejected(self, async_client):
+        response = await async_client.get(
+            "/api/calendar/week", params={"report_time": "lunchtime"}
+        )
+        assert response.status_code == 422
+
+
+class TestSparklinesEndpoint:
+    @pytest.mark.asyncio
+    async def test_streams_cached_then_fetched(self, async_client):
+        with patch(
+            "app.routers.calendar.get_many_cached_sparklines",
+            new_callable=AsyncMock,
+            return_value={"AAPL": [1.0, 2.0], "MSFT": None, "NVDA": None},
+        ) as mock_get, patch(
+            "app.routers.calendar.fetch_sparkline",
+            new_callable=AsyncMock,
+            side_effect=lambda t: [3.0] if t == "MSFT" else [],
+        ) as mock_fetch, patch(
+            "app.routers.calendar.set_many_cached_sparklines", new_callable=AsyncMock,
+        ) as mock_set:
+            response = await async_client.get(
+                "/api/calendar/sparklines", params=[("t", "aapl"), ("t", "MSFT"), ("t", "nvda"), ("t", "AAPL")]
+            )
+
+        assert response.json() == {"AAPL": [1.0, 2.0], "MSFT": [3.0], "NVDA": []}
+        assert mock_get.call_args[0][0] == ["AAPL", "MSFT", "NVDA"]
+        assert mock_fetch.await_count == 2
+        stored = mock_set.call_args[0][0]
+        assert stored.keys() == {"MSFT", "NVDA"}
+        assert stored["MSFT"][0] == [3.0]
+
+    @pytest.mark.asyncio
+    async def test_fetches_are_bounded(self, async_client):
+        running = peak = 0
+
+        async def fetch(ticker):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return [1.0]
+
+        tickers = [f"T{i}" for i in range(10)]
+        settings = get_settings().model_copy(update={"SPARKLINE_CONCURRENCY": 3})
+        with patch(
+            "app.routers.calendar.get_many_cached_sparklines",
+            new_callable=AsyncMock,
+            return_value={t: None for t in tickers},
+        ), patch("app.routers.calendar.fetch_sparkline", side_effect=fetch), \
+                patch("app.routers.calendar.set_many_cached_sparklines", new_callable=AsyncMock), \
+                patch("app.routers.calendar.get_settings", return_value=settings):
+            response = await async_client.get("/api/calendar/sparklines", params=[("t", t) for t in tickers])
+
+        assert set(response.json()) == set(tickers)
+        assert peak == 3
@@ -1,7 +1,10 @@
-from datetime import date
+import asyncio
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
 from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from app.services.earnings_calendar import (
     week_bounds,
@@ -10,8 +13,18 @@ from app.services.earnings_calendar import (
     _parse_nasdaq_eps_forecast,
     _normalize_fiscal_quarter,
     _fetch_historical_earnings_nasdaq,
+    _enrich_market_caps_from_nasdaq,
+    fetch_nasdaq_days,
+    search_ticker,
+    _sync_alpha_vantage_data,
+    stream_range_events,
+    encode_cursor,
+    decode_cursor,
+    get_week_earnings,
+    get_week_page,
 )
 from app.db.models import ReportTime
+from app.services.earnings_store import RETURN_ALL
 
 
 class TestWeekBounds:
@@ -219,3 +232,420 @@ class TestFetchHistoricalEarningsNasdaq:
             )
 
         assert result == []
+
+
+def _make_nasdaq_client(rows_by_date):
+    async def _get(url, params=None, headers=None):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.json = MagicMock(return_value={"data": {"rows": rows_by_date.get(params["date"], [])}})
+        return resp
+
+    mock_client = MagicMock()
+    mock_client.get = AsyncMock(side_effect=_get)
+    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+    mock_client.__aexit__ = AsyncMock(return_value=False)
+    return mock_client
+
+
+class TestFetchNasdaqDays:
+    @pytest.mark.asyncio
+    async def test_second_call_served_from_cache(self):
+        mock_client = _make_nasdaq_client({
+            "2025-07-07": [{"symbol": "AAPL", "name": "Apple Inc.", "marketCap": "$3,000"}],
+        })
+        days = [date(2025, 7, 7), date(2025, 7, 8)]
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client):
+            first = await fetch_nasdaq_days(days)
+            second = await fetch_nasdaq_days(days)
+
+        assert mock_client.get.call_count == 2
+        assert first == second
+        assert first[date(2025, 7, 7)][0]["marketCap"] == 3000.0
+        assert first[date(2025, 7, 8)] == []
+
+    @pytest.mark.asyncio
+    async def test_failed_days_are_not_cached(self):
+        failing = _make_mock_httpx_client("", status_code=503)
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=failing):
+            assert await fetch_nasdaq_days([date(2025, 7, 7)]) == {}
+
+        ok = _make_nasdaq_client({"2025-07-07": [{"symbol": "AAPL", "name": "Apple Inc."}]})
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=ok):
+            result = await fetch_nasdaq_days([date(2025, 7, 7)])
+
+        assert ok.get.call_count == 1
+        assert result[date(2025, 7, 7)][0]["symbol"] == "AAPL"
+
+    @pytest.mark.asyncio
+    async def test_shared_fetch_survives_cancelled_owner(self):
+        release = asyncio.Event()
+        mock_client = _make_nasdaq_client({"2025-07-07": [{"symbol": "AAPL", "name": "Apple Inc."}]})
+        respond = mock_client.get.side_effect
+
+        async def _slow_get(*args, **kwargs):
+            await release.wait()
+            return await respond(*args, **kwargs)
+
+        mock_client.get.side_effect = _slow_get
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client):
+            owner = asyncio.create_task(fetch_nasdaq_days([date(2025, 7, 7)]))
+            await asyncio.sleep(0)
+            joiner = asyncio.create_task(fetch_nasdaq_days([date(2025, 7, 7)]))
+            await asyncio.sleep(0)
+            owner.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            result = await joiner
+
+        assert owner.cancelled()
+        assert result[date(2025, 7, 7)][0]["symbol"] == "AAPL"
+        assert mock_client.get.call_count == 1
+        mock_client.__aexit__.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_enrichment_reuses_historical_fetch(self):
+        mock_client = _make_nasdaq_client({
+            "2025-07-07": [{"symbol": "AAPL", "name": "Apple Inc.", "marketCap": "$3,000"}],
+        })
+        event = SimpleNamespace(ticker="AAPL", report_date=date(2025, 7, 7), market_cap=None)
+        db = MagicMock()
+        db.commit = AsyncMock()
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client):
+            await _fetch_historical_earnings_nasdaq(date(2025, 7, 7), date(2025, 7, 7))
+            await _enrich_market_caps_from_nasdaq(db, [event])
+
+        assert mock_client.get.call_count == 1
+        assert event.market_cap == 3000.0
+        db.commit.assert_called_once()
+
+
+def _make_read_db(*reads):
+    db = MagicMock()
+    results = []
+    for events in reads:
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = events
+        results.append(result)
+    db.execute = AsyncMock(side_effect=results)
+    return db
+
+
+class TestGetWeekEarnings:
+    @pytest.mark.asyncio
+    async def test_backfilled_past_week_uses_upserted_rows(self):
+        small = SimpleNamespace(ticker="TINY", report_date=date(2025, 7, 7), market_cap=None)
+        big = SimpleNamespace(ticker="AAPL", report_date=date(2025, 7, 7), market_cap=3e12)
+        db = _make_read_db([])
+
+        with patch("app.services.earnings_calendar._scheduled_ingestion", return_value=True), \
+                patch("app.services.earnings_calendar._fetch_historical_earnings_nasdaq",
+                      new_callable=AsyncMock, return_value=[{"symbol": "AAPL"}]), \
+                patch("app.services.earnings_calendar.upsert_earnings_events",
+                      new_callable=AsyncMock, return_value=[small, big]) as mock_upsert, \
+                patch("app.services.earnings_calendar._enrich_market_caps_from_nasdaq",
+                      new_callable=AsyncMock, side_effect=lambda db, events: events):
+            events = await get_week_earnings(db, date(2025, 7, 9))
+
+        assert events == [big, small]
+        assert mock_upsert.call_args.kwargs["returning"] == RETURN_ALL
+        db.execute.assert_called_once()
+
+
+class TestSearchTicker:
+    @pytest.mark.asyncio
+    async def test_fresh_ticker_served_from_db_only(self):
+        event = SimpleNamespace(ticker="AAPL", report_date=date(2026, 1, 29))
+        db = _make_read_db([event])
+
+        with patch("app.services.cache.get_ticker_refreshed_at", new_callable=AsyncMock,
+                   return_value=datetime.utcnow()), \
+                patch("app.services.earnings_calendar._refresh_ticker", new_callable=AsyncMock) as mock_refresh:
+            events, served = await search_ticker(db, "aapl")
+
+        assert (events, served) == ([event], "fresh")
+        mock_refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_ticker_returns_rows_and_refreshes_in_background(self):
+        event = SimpleNamespace(ticker="AAPL", report_date=date(2026, 1, 29))
+        db = _make_read_db([event])
+        release = asyncio.Event()
+
+        async def slow_refresh(ticker):
+            await release.wait()
+
+        with patch("app.services.cache.get_ticker_refreshed_at", new_callable=AsyncMock,
+                   return_value=datetime.utcnow() - timedelta(days=2)), \
+                patch("app.services.earnings_calendar._refresh_ticker", side_effect=slow_refresh) as mock_refresh:
+            first = await search_ticker(db, "AAPL")
+            second = await search_ticker(_make_read_db([event]), "AAPL")
+            release.set()
+            await asyncio.sleep(0)
+
+        assert first == ([event], "stale")
+        assert second == ([event], "stale")
+        assert mock_refresh.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_ticker_waits_for_refresh(self):
+        event = SimpleNamespace(ticker="NEW", report_date=date(2026, 1, 29))
+        db = _make_read_db([], [event])
+
+        with patch("app.services.cache.get_ticker_refreshed_at", new_callable=AsyncMock,
+                   side_effect=[None, datetime.utcnow()]), \
+                patch("app.services.earnings_calendar._refresh_ticker", new_callable=AsyncMock) as mock_refresh:
+            events, served = await search_ticker(db, "new")
+
+        mock_refresh.assert_called_once_with("NEW")
+        assert (events, served) == ([event], "fresh")
+
+
+class TestAlphaVantageSyncSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_sync(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_fetch():
+            started.set()
+            await release.wait()
+            return []
+
+        with patch("app.services.earnings_calendar.fetch_all_earnings_from_alpha_vantage",
+                   side_effect=slow_fetch) as mock_fetch, \
+                patch("app.services.cache.should_sync_alpha_vantage", new_callable=AsyncMock, return_value=True), \
+                patch("app.services.cache.mark_alpha_vantage_synced", new_callable=AsyncMock):
+            first = asyncio.create_task(_sync_alpha_vantage_data(MagicMock()))
+            await started.wait()
+            await _sync_alpha_vantage_data(MagicMock())
+            release.set()
+            await first
+
+        assert mock_fetch.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_rolls_back_and_backs_off(self):
+        db = MagicMock()
+        db.commit = AsyncMock(side_effect=RuntimeError("connection lost"))
+        db.rollback = AsyncMock()
+
+        with patch("app.services.earnings_calendar.fetch_all_earnings_from_alpha_vantage",
+                   new_callable=AsyncMock, return_value=[{"symbol": "AAPL", "date": "2026-02-17"}]), \
+                patch("app.services.earnings_calendar.bulk_upsert_rows", new_callable=AsyncMock), \
+                patch("app.services.cache.should_sync_alpha_vantage", new_callable=AsyncMock, return_value=True), \
+                patch("app.services.cache.mark_alpha_vantage_synced", new_callable=AsyncMock) as mock_synced, \
+                patch("app.services.cache.mark_alpha_vantage_failed", new_callable=AsyncMock) as mock_failed:
+            await _sync_alpha_vantage_data(db)
+
+        db.rollback.assert_awaited_once()
+        mock_failed.assert_awaited_once()
+        mock_synced.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_failure_backoff_outlasts_the_claim(self, mock_get_redis):
+        from app.services.cache import AV_SYNC_LEASE, AV_SYNC_RETRY_BACKOFF, mark_alpha_vantage_failed
+
+        mock_redis = AsyncMock()
+        mock_get_redis.return_value = mock_redis
+
+        await mark_alpha_vantage_failed()
+
+        mock_redis.set.assert_called_once_with(
+            "earnings:av_last_sync", "failed", ex=AV_SYNC_RETRY_BACKOFF, nx=True,
+        )
+        assert AV_SYNC_RETRY_BACKOFF > AV_SYNC_LEASE
+
+    @pytest.mark.asyncio
+    async def test_losing_the_redis_claim_skips_fetch(self):
+        with patch("app.services.earnings_calendar.fetch_all_earnings_from_alpha_vantage",
+                   new_callable=AsyncMock) as mock_fetch, \
+                patch("app.services.cache.should_sync_alpha_vantage", new_callable=AsyncMock, return_value=True), \
+                patch("app.services.cache.claim_alpha_vantage_sync", new_callable=AsyncMock, return_value=None):
+            await _sync_alpha_vantage_data(MagicMock())
+
+        mock_fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_claim_uses_set_nx_px(self, mock_get_redis):
+        from app.services.cache import AV_SYNC_LEASE, claim_alpha_vantage_sync
+
+        mock_redis = AsyncMock()
+        mock_redis.set = AsyncMock(return_value=True)
+        mock_get_redis.return_value = mock_redis
+
+        token = await claim_alpha_vantage_sync()
+        mock_redis.set.assert_called_once_with(
+            "earnings:av_sync_lock", token, nx=True, px=AV_SYNC_LEASE * 1000
+        )
+
+
+class TestWeekInvalidation:
+    @pytest.mark.asyncio
+    async def test_enrichment_invalidates_touched_weeks(self):
+        mock_client = _make_nasdaq_client({
+            "2025-07-07": [{"symbol": "AAPL", "name": "Apple Inc.", "marketCap": "$3,000"}],
+        })
+        events = [
+            SimpleNamespace(ticker="AAPL", report_date=date(2025, 7, 7), market_cap=None),
+            SimpleNamespace(ticker="TINY", report_date=date(2025, 7, 15), market_cap=None),
+        ]
+        db = MagicMock()
+        db.commit = AsyncMock()
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client), \
+                patch("app.services.cache.invalidate_cached_calendars", new_callable=AsyncMock) as mock_invalidate:
+            await _enrich_market_caps_from_nasdaq(db, events)
+
+        mock_invalidate.assert_called_once_with(["2025-07-07"])
+
+
+class TestEnrichmentFreshness:
+    @pytest.mark.asyncio
+    async def test_recently_enriched_dates_skip_network(self):
+        mock_client = _make_nasdaq_client({})
+        event = SimpleNamespace(ticker="AAPL", report_date=date(2025, 7, 7), market_cap=None)
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client), \
+                patch("app.services.cache.get_many_enrichment_markers", new_callable=AsyncMock,
+                      return_value={"2025-07-07": {"at": "2025-07-07T10:00:00", "filled": 3}}):
+            await _enrich_market_caps_from_nasdaq(MagicMock(), [event])
+
+        mock_client.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_negative_cached_tickers_skip_network(self):
+        mock_client = _make_nasdaq_client({})
+        event = SimpleNamespace(ticker="TINY", report_date=date(2025, 7, 7), market_cap=None)
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client), \
+                patch("app.services.cache.get_missing_market_caps", new_callable=AsyncMock,
+                      return_value={"TINY"}):
+            await _enrich_market_caps_from_nasdaq(MagicMock(), [event])
+
+        mock_client.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_records_markers_and_missing_tickers(self):
+        mock_client = _make_nasdaq_client({
+            "2025-07-07": [
+                {"symbol": "AAPL", "name": "Apple Inc.", "marketCap": "$3,000"},
+                {"symbol": "TINY", "name": "Tiny Corp", "marketCap": "N/A"},
+            ],
+        })
+        events = [
+            SimpleNamespace(ticker="AAPL", report_date=date(2025, 7, 7), market_cap=None),
+            SimpleNamespace(ticker="TINY", report_date=date(2025, 7, 7), market_cap=None),
+            # Not on Nasdaq's page for the date, so nothing is known about its cap.
+            SimpleNamespace(ticker="MOVED", report_date=date(2025, 7, 7), market_cap=None),
+        ]
+        db = MagicMock()
+        db.commit = AsyncMock()
+
+        with patch("app.services.earnings_calendar.httpx.AsyncClient", return_value=mock_client), \
+                patch("app.services.cache.set_many_enrichment_markers", new_callable=AsyncMock) as mock_markers, \
+                patch("app.services.cache.set_missing_market_caps", new_callable=AsyncMock) as mock_missing:
+            await _enrich_market_caps_from_nasdaq(db, events)
+
+        marker = mock_markers.call_args[0][0]["2025-07-07"]
+        assert marker["filled"] == 1
+        assert marker["missing"] == 2
+        mock_missing.assert_called_once_with(["TINY"])
+
+
+class TestStreamRangeEvents:
+    @pytest.mark.asyncio
+    async def test_streams_rows_from_one_range_query(self):
+        rows = [
+            {"ticker": "AAPL", "report_date": date(2026, 2, 17), "report_time": ReportTime.POST_MARKET},
+            {"ticker": "MSFT", "report_date": date(2026, 3, 3), "report_time": ReportTime.PRE_MARKET},
+        ]
+
+        async def mappings():
+            for row in rows:
+                yield row
+
+        db = MagicMock()
+        db.stream = AsyncMock(return_value=MagicMock(mappings=mappings))
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=db)
+        session.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("app.db.database.get_session_factory", return_value=lambda: session):
+            events = [e async for e in stream_range_events(date(2026, 2, 16), date(2026, 3, 13))]
+
+        assert [e["report_time"] for e in events] == ["post_market", "pre_market"]
+        query = db.stream.call_args[0][0]
+        assert query.get_execution_options()["yield_per"] == 500
+        db.stream.assert_called_once()
+
+
+class TestWeekPage:
+    def _db(self, rows):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(
+            mappings=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+        ))
+        return db
+
+    def test_cursor_round_trip(self):
+        event = {"report_date": date(2026, 2, 17), "market_cap": None, "ticker": "ZZZ"}
+        assert decode_cursor(encode_cursor(event)) == (date(2026, 2, 17), None, "ZZZ")
+
+    def test_malformed_cursor_raises(self):
+        with pytest.raises(ValueError):
+            decode_cursor("%%%")
+
+    @pytest.mark.asyncio
+    async def test_inline_mode_ingests_the_week_first(self):
+        db = self._db([])
+
+        with patch("app.services.earnings_calendar._scheduled_ingestion", return_value=False), \
+                patch("app.services.earnings_calendar.get_week_earnings", new_callable=AsyncMock) as mock_week:
+            await get_week_page(db, date(2025, 7, 9), limit=50)
+        mock_week.assert_awaited_once_with(db, date(2025, 7, 9))
+
+        with patch("app.services.earnings_calendar._scheduled_ingestion", return_value=True), \
+                patch("app.services.earnings_calendar.get_week_earnings", new_callable=AsyncMock) as mock_week:
+            await get_week_page(db, date(2025, 7, 9), limit=50)
+        mock_week.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_returns_next_cursor_when_more_rows(self):
+        rows = [
+            {"ticker": t, "report_date": date(2026, 2, 17), "market_cap": cap,
+             "report_time": ReportTime.UNKNOWN}
+            for t, cap in [("AAPL", 3e12), ("MSFT", 2e12), ("TINY", None)]
+        ]
+        db = self._db(rows)
+
+        events, cursor = await get_week_page(db, date(2026, 2, 18), limit=2)
+
+        assert [e["ticker"] for e in events] == ["AAPL", "MSFT"]
+        assert decode_cursor(cursor) == (date(2026, 2, 17), 2e12, "MSFT")
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "LIMIT" in sql
+
+    @pytest.mark.asyncio
+    async def test_filters_and_keyset_in_sql(self):
+        db = self._db([])
+        cursor = encode_cursor({"report_date": date(2026, 2, 17), "market_cap": 2e12, "ticker": "MSFT"})
+
+        events, next_cursor = await get_week_page(
+            db, date(2026, 2, 18),
+            min_market_cap=1e10, report_time=ReportTime.PRE_MARKET,
+            tickers=["AAPL"], limit=10, cursor=cursor,
+        )
+
+        assert (events, next_cursor) == ([], None)
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "earnings_events.market_cap >= " in sql
+        assert "earnings_events.report_time = " in sql
+        assert "earnings_events.ticker IN " in sql
+        assert "earnings_events.report_date > " in sql
+        assert "earnings_events.market_cap IS NULL" in sql
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from app.services.circuit_breaker import CircuitBreaker
+
+
+def _at(t: float):
+    return patch("app.services.circuit_breaker.time.monotonic", return_value=t)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+        with _at(100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+            breaker.record_success()
+            breaker.record_failure()
+            breaker.record_failure()
+            assert breaker.allow()
+            breaker.record_failure()
+            assert breaker.state == "open"
+            assert not breaker.allow()
+        assert breaker.trips == 1
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30, probe_timeout=5)
+        with _at(100.0):
+            breaker.record_failure()
+        with _at(131.0):
+            assert breaker.state == "half_open"
+            assert breaker.allow()
+            assert not breaker.allow()
+        with _at(137.0):
+            assert breaker.allow()  # the first probe never reported back
+
+    def test_probe_success_closes(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+        with _at(100.0):
+            breaker.record_failure()
+        with _at(131.0):
+            assert breaker.allow()
+            breaker.record_success()
+            assert breaker.state == "closed"
+            assert breaker.snapshot()["consecutive_failures"] == 0
+
+    def test_probe_failure_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+        with _at(100.0):
+            breaker.record_failure()
+        with _at(131.0):
+            assert breaker.allow()
+            breaker.record_failure()
+        with _at(141.0):
+            assert breaker.state == "open"
+            assert breaker.snapshot()["retry_in"] == 20.0
+        assert breaker.trips == 1
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services import codec as codec_module
+from app.services.codec import (
+    HEADER_JSON,
+    HEADER_JSON_ZLIB,
+    HEADER_JSON_ZSTD,
+    CacheCodec,
+)
+
+
+class TestCacheCodec:
+    def test_small_values_are_not_compressed(self):
+        codec = CacheCodec("zlib", min_bytes=1024)
+        data = codec.encode({"ticker": "AAPL"})
+        assert data[0] == HEADER_JSON
+        assert codec.decode(data) == {"ticker": "AAPL"}
+
+    def test_large_values_are_compressed(self):
+        codec = CacheCodec("zlib", min_bytes=1024)
+        value = [{"ticker": f"T{i}", "market_cap": i * 1e9} for i in range(500)]
+        data = codec.encode(value)
+        assert data[0] == HEADER_JSON_ZLIB
+        assert len(data) < len(json.dumps(value))
+        assert codec.decode(data) == value
+
+    @pytest.mark.skipif(codec_module.zstandard is None, reason="zstandard not installed")
+    def test_zstd(self):
+        codec = CacheCodec("zstd", min_bytes=16)
+        data = codec.encode({"events": list(range(100))})
+        assert data[0] == HEADER_JSON_ZSTD
+        assert codec.decode(data) == {"events": list(range(100))}
+
+    def test_reads_legacy_plain_json(self):
+        codec = CacheCodec()
+        assert codec.decode('{"a": [1, 2]}') == {"a": [1, 2]}
+        assert codec.decode(b'{"a": [1, 2]}') == {"a": [1, 2]}
+        assert codec.decode(b"3759435415339.0") == 3759435415339.0
+
+    def test_datetimes_match_stdlib_default_str(self):
+        when = datetime(2026, 2, 17, 16, 30)
+        decoded = CacheCodec().decode(CacheCodec().encode({"at": when}))
+        assert decoded == json.loads(json.dumps({"at": when}, default=str))
+
+    def test_compressed_entries_readable_with_other_settings(self):
+        value = ["x" * 2000]
+        data = CacheCodec("zlib", min_bytes=10).encode(value)
+        assert CacheCodec("none").decode(data) == value
+
+    def test_unknown_compression_rejected(self):
+        with pytest.raises(ValueError):
+            CacheCodec("lz4")
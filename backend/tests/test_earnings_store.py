@@ -0,0 +1,243 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy import Insert, Select
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import ReportTime
+from app.services.earnings_store import (
+    _COLUMNS,
+    _MAX_BIND_PARAMS,
+    RETURN_ALL,
+    RETURN_CHANGED,
+    _chunk_size,
+    _dedupe,
+    _unwritten_chunk_size,
+    bulk_upsert_rows,
+    content_hash,
+)
+
+
+def _row(ticker, day=date(2026, 2, 16), **extra):
+    return {
+        "ticker": ticker,
+        "company_name": f"{ticker} Inc.",
+        "report_date": day,
+        "report_time": ReportTime.PRE_MARKET,
+        "fiscal_quarter": "2025-12-31",
+        "eps_estimate": 1.0,
+        "revenue_estimate": None,
+        "market_cap": None,
+        **extra,
+    }
+
+
+def _make_db(driver=None, stored=None):
+    """Fake session: SELECTs return ``stored`` (ticker, date, hash) rows, INSERTs echo their rows."""
+    raw = SimpleNamespace(driver_connection=driver if driver is not None else object())
+    conn = MagicMock()
+    conn.get_raw_connection = AsyncMock(return_value=raw)
+
+    nested = MagicMock()
+    nested.__aenter__ = AsyncMock(return_value=nested)
+    nested.__aexit__ = AsyncMock(return_value=False)
+
+    async def _execute(stmt, *args, **kwargs):
+        result = MagicMock()
+        if isinstance(stmt, Select):
+            result.all.return_value = list(stored or [])
+        elif isinstance(stmt, Insert):
+            params = stmt.compile(dialect=postgresql.dialect()).params
+            n = sum(1 for k in params if k.startswith("ticker"))
+            if "execution_options" in kwargs:
+                result.all.return_value = [
+                    (SimpleNamespace(ticker=f"T{i}", report_date=date(2026, 2, 16)), True) for i in range(n)
+                ]
+            else:
+                result.all.return_value = [(date(2026, 2, 16), True)] * n
+        return result
+
+    db = MagicMock()
+    db.connection = AsyncMock(return_value=conn)
+    db.execute = AsyncMock(side_effect=_execute)
+    db.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+    db.begin_nested = MagicMock(return_value=nested)
+    return db
+
+
+def _insert_calls(db):
+    return [c for c in db.execute.call_args_list if isinstance(c.args[0], Insert)]
+
+
+class TestChunking:
+    def test_chunk_stays_under_bind_param_limit(self):
+        assert _chunk_size() * len(_COLUMNS) <= _MAX_BIND_PARAMS
+
+    def test_dedupe_keeps_last_row_per_key(self):
+        rows = _dedupe([_row("AAPL", eps_estimate=1.0), _row("AAPL", eps_estimate=2.0), _row("MSFT")])
+        assert len(rows) == 2
+        assert rows[0]["eps_estimate"] == 2.0
+
+
+class TestBulkUpsertRows:
+    @pytest.mark.asyncio
+    async def test_small_batch_uses_single_insert(self):
+        db = _make_db()
+        result = await bulk_upsert_rows(db, [_row("AAPL"), _row("MSFT")])
+        assert result.method == "chunked"
+        assert len(_insert_calls(db)) == 1
+
+    @pytest.mark.asyncio
+    async def test_large_batch_is_chunked_without_copy(self):
+        db = _make_db()
+        rows = [_row(f"T{i}") for i in range(_chunk_size() * 2 + 1)]
+        result = await bulk_upsert_rows(db, rows, method="copy")
+        assert result.method == "chunked"
+        assert len(_insert_calls(db)) == 3
+
+    @pytest.mark.asyncio
+    async def test_copy_streams_records_to_staging_table(self):
+        driver = MagicMock()
+        driver.copy_records_to_table = AsyncMock()
+        db = _make_db(driver)
+
+        result = await bulk_upsert_rows(db, [_row("AAPL"), _row("MSFT")], method="copy")
+
+        assert result.method == "copy"
+        driver.copy_records_to_table.assert_called_once()
+        records = driver.copy_records_to_table.call_args.kwargs["records"]
+        assert len(records) == 2
+        assert records[0][_COLUMNS.index("report_time")] == "PRE_MARKET"
+        assert records[0][_COLUMNS.index("created_at")] is not None
+
+    @pytest.mark.asyncio
+    async def test_copy_failure_falls_back_to_chunked(self):
+        driver = MagicMock()
+        driver.copy_records_to_table = AsyncMock(side_effect=Exception("copy failed"))
+        db = _make_db(driver)
+
+        result = await bulk_upsert_rows(db, [_row("AAPL")], method="copy")
+
+        assert result.method == "chunked"
+        db.begin_nested.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_rows(self):
+        db = _make_db()
+        assert (await bulk_upsert_rows(db, [])).method == "none"
+        db.execute.assert_not_called()
+
+
+class TestReturning:
+    @pytest.mark.asyncio
+    async def test_returns_rows_from_every_chunk(self):
+        db = _make_db()
+        rows = [_row(f"T{i}") for i in range(_chunk_size() + 1)]
+
+        result = await bulk_upsert_rows(db, rows, returning=RETURN_CHANGED)
+
+        assert len(result.events) == len(rows)
+        assert all(c.kwargs["execution_options"] == {"populate_existing": True} for c in _insert_calls(db))
+
+    @pytest.mark.asyncio
+    async def test_conflict_update_only_when_values_differ(self):
+        db = _make_db()
+
+        await bulk_upsert_rows(db, [_row("AAPL")], returning=RETURN_CHANGED)
+
+        sql = str(_insert_calls(db)[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "IS DISTINCT FROM" in sql
+        assert "RETURNING" in sql
+        assert "xmax = 0" in sql
+
+    @pytest.mark.asyncio
+    async def test_all_mode_loads_rows_that_were_not_written(self):
+        row = _row("AAPL")
+        db = _make_db(stored=[("AAPL", row["report_date"], content_hash(row))])
+        existing = SimpleNamespace(ticker="AAPL", report_date=row["report_date"])
+        db.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[existing])))
+
+        result = await bulk_upsert_rows(db, [row], returning=RETURN_ALL)
+
+        assert result.events == [existing]
+        assert _insert_calls(db) == []
+        sql = str(db.scalars.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "(earnings_events.ticker, earnings_events.report_date) IN" in sql
+
+    @pytest.mark.asyncio
+    async def test_unwritten_reread_stays_under_bind_limit(self):
+        size = _unwritten_chunk_size()
+        rows = [_row(f"T{i}", day=date(2026, 2, 16) + timedelta(days=i % 5)) for i in range(size + 1)]
+        db = _make_db(stored=[(r["ticker"], r["report_date"], content_hash(r)) for r in rows])
+        db.scalars = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+
+        await bulk_upsert_rows(db, rows, returning=RETURN_ALL)
+
+        binds = [
+            len(c.args[0].compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}).params)
+            for c in db.scalars.call_args_list
+        ]
+        assert binds == [2 * size + 2, 2 + 2]
+        assert max(binds) <= _MAX_BIND_PARAMS
+
+
+class TestWriteSkipping:
+    def test_hash_ignores_key_and_timestamp_columns(self):
+        a = _row("AAPL", day=date(2026, 2, 16))
+        b = _row("MSFT", day=date(2026, 2, 17), company_name="AAPL Inc.", created_at="later")
+        assert content_hash(a) == content_hash(b)
+
+    def test_hash_changes_with_values(self):
+        assert content_hash(_row("AAPL")) != content_hash(_row("AAPL", eps_estimate=1.5))
+        assert content_hash(_row("AAPL")) != content_hash(_row("AAPL", market_cap=1e12))
+
+    @pytest.mark.asyncio
+    async def test_unchanged_rows_never_reach_the_database(self):
+        same, changed = _row("AAPL"), _row("MSFT")
+        db = _make_db(stored=[
+            ("AAPL", same["report_date"], content_hash(same)),
+            ("MSFT", changed["report_date"], "stale"),
+        ])
+
+        result = await bulk_upsert_rows(db, [same, changed])
+
+        inserts = _insert_calls(db)
+        assert len(inserts) == 1
+        params = inserts[0].args[0].compile(dialect=postgresql.dialect()).params
+        assert [v for k, v in params.items() if k.startswith("ticker")] == ["MSFT"]
+        assert (result.inserted, result.updated, result.skipped) == (1, 0, 1)
+
+    @pytest.mark.asyncio
+    async def test_rows_without_a_stored_hash_get_one(self):
+        row = _row("AAPL")
+        db = _make_db(stored=[("AAPL", row["report_date"], None)])
+
+        await bulk_upsert_rows(db, [row])
+
+        inserts = _insert_calls(db)
+        assert len(inserts) == 1
+        compiled = inserts[0].args[0].compile(dialect=postgresql.dialect())
+        assert "content_hash IS DISTINCT FROM excluded.content_hash" in str(compiled)
+        assert content_hash(row) in compiled.params.values()
+
+    @pytest.mark.asyncio
+    async def test_counts_inserts_and_updates(self):
+        db = _make_db()
+
+        async def _execute(stmt, *args, **kwargs):
+            result = MagicMock()
+            if isinstance(stmt, Select):
+                result.all.return_value = []
+            else:
+                result.all.return_value = [
+                    (date(2026, 2, 16), True), (date(2026, 2, 17), False), (date(2026, 2, 17), False),
+                ]
+            return result
+
+        db.execute = AsyncMock(side_effect=_execute)
+        result = await bulk_upsert_rows(db, [_row("A"), _row("B"), _row("C"), _row("D")])
+
+        assert (result.inserted, result.updated, result.skipped) == (1, 2, 1)
+        assert result.changed_dates == {date(2026, 2, 16), date(2026, 2, 17)}
@@ -0,0 +1,65 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.highlights import highlight_weeks, load_highlights, top_week_events
+
+
+class TestHighlightWeeks:
+    def test_weekday_uses_current_week(self):
+        assert highlight_weeks(date(2026, 2, 18)) == (date(2026, 2, 9), date(2026, 2, 16))
+
+    def test_weekend_rolls_forward(self):
+        assert highlight_weeks(date(2026, 2, 21)) == (date(2026, 2, 16), date(2026, 2, 23))
+
+
+class TestTopWeekEvents:
+    @pytest.mark.asyncio
+    async def test_ranks_and_limits_in_sql(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(
+            mappings=MagicMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+        ))
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=db)
+        session.__aexit__ = AsyncMock(return_value=False)
+
+        with patch("app.db.database.get_session_factory", return_value=lambda: session):
+            await top_week_events(date(2026, 2, 18), limit=10)
+
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "ORDER BY earnings_events.market_cap DESC NULLS LAST" in sql
+        assert "LIMIT" in sql
+
+
+class TestLoadHighlights:
+    @pytest.mark.asyncio
+    async def test_computes_only_uncached_weeks(self):
+        last_mon, this_mon = highlight_weeks()
+        cached_section = {"week_start": last_mon, "week_end": last_mon, "events": []}
+
+        with patch("app.services.highlights.get_cached_highlights", new_callable=AsyncMock,
+                   return_value={last_mon.isoformat(): cached_section, this_mon.isoformat(): None}), \
+                patch("app.services.highlights.top_week_events", new_callable=AsyncMock,
+                      return_value=[]) as mock_top, \
+                patch("app.services.highlights.set_cached_highlights", new_callable=AsyncMock) as mock_set:
+            result = await load_highlights()
+
+        assert result["last_week"] is cached_section
+        assert result["this_week"]["week_start"] == this_mon
+        mock_top.assert_called_once_with(this_mon)
+        mock_set.assert_called_once()
+        assert mock_set.call_args[0][0] == this_mon.isoformat()
+
+    @pytest.mark.asyncio
+    async def test_refresh_recomputes_both_weeks(self):
+        with patch("app.services.highlights.get_cached_highlights", new_callable=AsyncMock) as mock_get, \
+                patch("app.services.highlights.top_week_events", new_callable=AsyncMock,
+                      return_value=[]) as mock_top, \
+                patch("app.services.highlights.set_cached_highlights", new_callable=AsyncMock):
+            await load_highlights(refresh=True)
+
+        mock_get.assert_not_called()
+        assert mock_top.call_count == 2
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+from app.services.local_cache import LocalCache
+
+
+class TestLocalCache:
+    def test_lru_eviction(self):
+        cache = LocalCache(max_entries=2, max_ttl=60)
+        cache.set("calendar", "a", 1, ttl=60)
+        cache.set("calendar", "b", 2, ttl=60)
+        assert cache.get("calendar", "a") == 1
+        cache.set("calendar", "c", 3, ttl=60)
+
+        assert cache.get("calendar", "b") is None
+        assert cache.get("calendar", "a") == 1
+        assert cache.stats()["calendar"]["evictions"] == 1
+
+    def test_ttl_is_capped(self):
+        cache = LocalCache(max_entries=10, max_ttl=30)
+        with patch("app.services.local_cache.time.monotonic", return_value=100.0):
+            cache.set("sparkline", "k", [1.0], ttl=3600)
+        with patch("app.services.local_cache.time.monotonic", return_value=131.0):
+            assert cache.get("sparkline", "k") is None
+        assert cache.stats()["sparkline"]["expirations"] == 1
+
+    def test_family_ttl_override(self):
+        cache = LocalCache(max_entries=10, max_ttl=30, family_ttls={"nasdaq_day": 600})
+        with patch("app.services.local_cache.time.monotonic", return_value=100.0):
+            cache.set("nasdaq_day", "d", [], ttl=300)
+        with patch("app.services.local_cache.time.monotonic", return_value=350.0):
+            assert cache.get("nasdaq_day", "d") == []
+        with patch("app.services.local_cache.time.monotonic", return_value=401.0):
+            assert cache.get("nasdaq_day", "d") is None
+
+    def test_disabled_family_bypasses(self):
+        cache = LocalCache(max_entries=10, max_ttl=30, disabled={"analysis"})
+        cache.set("analysis", "k", {"x": 1}, ttl=60)
+        assert cache.get("analysis", "k") is None
+        assert "analysis" not in cache.stats()
+
+    def test_hit_and_miss_stats(self):
+        cache = LocalCache(max_entries=10, max_ttl=30)
+        cache.get("mcap", "k")
+        cache.set("mcap", "k", 1.0, ttl=60)
+        cache.get("mcap", "k")
+        assert cache.stats()["mcap"] == {"hits": 1, "misses": 1, "evictions": 0, "expirations": 0}
@@ -0,0 +1,64 @@
+import pytest
+
+from app.services.metrics import Registry
+
+
+class TestRegistry:
+    def test_counter_render(self):
+        registry = Registry()
+        lookups = registry.counter("cache_lookups", "Cache reads.", ("family", "result"))
+        lookups.inc("calendar", "l1")
+        lookups.inc("calendar", "l1", amount=2)
+        lookups.inc("chart", "miss")
+
+        assert registry.render() == (
+            "# HELP cache_lookups_total Cache reads.\n"
+            "# TYPE cache_lookups_total counter\n"
+            'cache_lookups_total{family="calendar",result="l1"} 3\n'
+            'cache_lookups_total{family="chart",result="miss"} 1\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("redis_seconds", "Latency.", ("command",), buckets=(0.01, 0.1))
+        latency.observe(0.005, "GET")
+        latency.observe(0.05, "GET")
+        latency.observe(3.0, "GET")
+
+        lines = registry.render().splitlines()
+        assert 'redis_seconds_bucket{command="GET",le="0.01"} 1' in lines
+        assert 'redis_seconds_bucket{command="GET",le="0.1"} 2' in lines
+        assert 'redis_seconds_bucket{command="GET",le="+Inf"} 3' in lines
+        assert 'redis_seconds_sum{command="GET"} 3.055' in lines
+        assert 'redis_seconds_count{command="GET"} 3' in lines
+
+    def test_collectors_and_label_escaping(self):
+        registry = Registry()
+
+        @registry.collector
+        def entries():
+            yield "l1_entries", "gauge", "Entries.", [("", {"family": 'a"b'}, 4)]
+
+        assert 'l1_entries{family="a\\"b"} 4' in registry.render().splitlines()
+
+    def test_special_float_values(self):
+        registry = Registry()
+
+        @registry.collector
+        def ratios():
+            yield "hit_ratio", "gauge", "Ratio.", [("", {}, float("nan")), ("_max", {}, float("-inf"))]
+
+        lines = registry.render().splitlines()
+        assert "hit_ratio NaN" in lines
+        assert "hit_ratio_max -Inf" in lines
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_serves_prometheus_text(self, async_client):
+        response = await async_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE cache_lookups_total counter" in response.text
+        assert "cache_redis_circuit_open 0" in response.text
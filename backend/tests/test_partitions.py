@@ -0,0 +1,96 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.db.partitions import (
+    ensure_partitions,
+    migrate_partitioning,
+    partition_for,
+    partitions_between,
+)
+
+
+def _make_conn(attached_rows):
+    """Fake connection: the first query lists attached partitions, the rest are DDL."""
+    conn = MagicMock()
+    statements = []
+
+    async def execute(stmt, *args):
+        statements.append(str(stmt))
+        return MagicMock(all=MagicMock(return_value=attached_rows))
+
+    conn.execute = AsyncMock(side_effect=execute)
+    conn.statements = statements
+    return conn
+
+
+class TestPartitionBounds:
+    def test_quarterly(self):
+        assert partition_for(date(2026, 2, 18), "quarterly") == (
+            "earnings_events_2026q1", date(2026, 1, 1), date(2026, 4, 1)
+        )
+        assert partition_for(date(2026, 12, 31), "quarterly") == (
+            "earnings_events_2026q4", date(2026, 10, 1), date(2027, 1, 1)
+        )
+
+    def test_yearly(self):
+        assert partition_for(date(2026, 7, 1), "yearly") == (
+            "earnings_events_y2026", date(2026, 1, 1), date(2027, 1, 1)
+        )
+
+    def test_unknown_scheme(self):
+        with pytest.raises(ValueError):
+            partition_for(date(2026, 7, 1), "monthly")
+
+    def test_between_covers_both_ends(self):
+        names = [p[0] for p in partitions_between(date(2025, 11, 3), date(2026, 4, 1), "quarterly")]
+        assert names == ["earnings_events_2025q4", "earnings_events_2026q1", "earnings_events_2026q2"]
+
+
+class TestEnsurePartitions:
+    @pytest.mark.asyncio
+    async def test_creates_missing_and_moves_rows_out_of_default(self):
+        conn = _make_conn([
+            ("earnings_events_2026q1", "FOR VALUES FROM ('2026-01-01') TO ('2026-04-01')"),
+            ("earnings_events_default", "DEFAULT"),
+        ])
+
+        created = await ensure_partitions(conn, date(2026, 2, 1), date(2026, 5, 1), "quarterly")
+
+        assert created == ["earnings_events_2026q2"]
+        ddl = conn.statements[1:]
+        assert ddl[0].startswith("CREATE TABLE earnings_events_2026q2 (LIKE earnings_events")
+        assert ddl[1].startswith("INSERT INTO earnings_events_2026q2 SELECT * FROM earnings_events_default")
+        assert ddl[2].startswith("DELETE FROM earnings_events_default")
+        assert "ATTACH PARTITION earnings_events_2026q2 FOR VALUES FROM ('2026-04-01') TO ('2026-07-01')" in ddl[3]
+
+    @pytest.mark.asyncio
+    async def test_skips_ranges_covered_by_another_scheme(self):
+        conn = _make_conn([
+            ("earnings_events_y2026", "FOR VALUES FROM ('2026-01-01') TO ('2027-01-01')"),
+        ])
+
+        created = await ensure_partitions(conn, date(2026, 2, 1), date(2026, 11, 1), "quarterly")
+
+        assert created == []
+        assert len(conn.statements) == 1
+
+
+class TestMigratePartitioning:
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        conn = _make_conn([])
+        await migrate_partitioning(conn)
+        conn.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_converts_heap_table_once(self):
+        settings = MagicMock(EARNINGS_PARTITIONING="yearly", EARNINGS_PARTITIONS_AHEAD=1)
+        with patch("app.db.partitions.get_settings", return_value=settings), \
+                patch("app.db.partitions.is_partitioned", new_callable=AsyncMock, return_value=False), \
+                patch("app.db.partitions.partition_table", new_callable=AsyncMock) as mock_convert:
+            await migrate_partitioning(MagicMock())
+
+        mock_convert.assert_called_once()
+        assert mock_convert.call_args[0][1:] == ("yearly", 1)
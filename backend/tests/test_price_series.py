@@ -0,0 +1,57 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import price_series
+from app.services.price_series import fetch_sparkline, load_chart, load_sparkline, sparkline_closes
+
+_YAHOO_CHART = {
+    "chart": {"result": [{
+        "meta": {"currency": "USD", "regularMarketPrice": 12.0},
+        "timestamp": [1, 2, 3],
+        "indicators": {"quote": [{
+            "open": [10.0, 11.0, 12.0],
+            "high": [10.5, 11.5, 12.5],
+            "low": [9.5, 10.5, 11.5],
+            "close": [10.123, None, 12.0],
+            "volume": [100, 200, 300],
+        }]},
+    }]}
+}
+
+
+def _client(*payloads):
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[MagicMock(json=MagicMock(return_value=p)) for p in payloads])
+    return client
+
+
+class TestPriceSeries:
+    def test_sparkline_closes(self):
+        chart = {"points": [{"t": 1, "c": 10.12}, {"t": 3, "c": 12.0}]}
+        assert sparkline_closes(chart) == [10.12, 12.0]
+        assert sparkline_closes({"points": []}) == []
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis", new_callable=AsyncMock, return_value=None)
+    async def test_one_upstream_call_fills_chart_and_sparkline(self, _):
+        client = _client(_YAHOO_CHART)
+        with patch.object(price_series, "http_client", return_value=client):
+            assert await load_sparkline("AAPL") == [10.12, 12.0]
+            chart = await load_chart("AAPL", "1M")
+
+        assert [p["c"] for p in chart["points"]] == [10.12, 12.0]
+        client.get.assert_awaited_once()
+        assert client.get.call_args.kwargs["params"]["range"] == "1mo"
+        assert client.get.call_args.kwargs["params"]["interval"] == "1d"
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis", new_callable=AsyncMock, return_value=None)
+    async def test_sparkline_falls_back_to_alpha_vantage(self, _):
+        client = _client(
+            {"chart": {"result": []}},
+            {"Time Series (Daily)": {"2026-02-17": {"4. close": "11.0"}, "2026-02-16": {"4. close": "10.0"}}},
+        )
+        with patch.object(price_series, "http_client", return_value=client):
+            assert await fetch_sparkline("AAPL") == [10.0, 11.0]
+        assert client.get.await_count == 2
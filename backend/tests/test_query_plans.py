@@ -0,0 +1,116 @@
+"""EXPLAIN checks that calendar reads stay index-driven.
+
+These need a real Postgres and only run when ``TEST_DATABASE_URL`` points at a
+disposable database; ``earnings_events`` there is truncated and refilled.
+"""
+import json
+import os
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.db.database import _build_async_url
+from app.db.migrations import run_migrations
+from app.db.models import Base
+from app.services.earnings_calendar import week_events_query
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set"
+)
+
+_SEED_ROWS = 200_000
+_ROWS_PER_DAY = 100
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def _explain(conn, query) -> list[dict]:
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(_plan_nodes(plan[0]["Plan"]))
+
+
+@pytest.mark.asyncio
+async def test_week_query_is_an_index_only_scan_without_sort():
+    engine = create_async_engine(
+        _build_async_url(TEST_DATABASE_URL),
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await run_migrations(conn)
+            await conn.execute(text("TRUNCATE earnings_events CASCADE"))
+            await conn.execute(text(
+                "INSERT INTO earnings_events "
+                "(ticker, company_name, report_date, report_time, market_cap, created_at) "
+                "SELECT 'T' || (g % :per_day), 'Company ' || (g % :per_day), "
+                "date '2020-01-06' + (g / :per_day), 'UNKNOWN', "
+                "CASE WHEN g % 7 = 0 THEN NULL ELSE g END, now() "
+                "FROM generate_series(0, :n - 1) AS g"
+            ), {"per_day": _ROWS_PER_DAY, "n": _SEED_ROWS})
+            await conn.execute(text("VACUUM ANALYZE earnings_events"))
+
+            nodes = await _explain(conn, week_events_query(date(2022, 3, 7), date(2022, 3, 11)))
+            await conn.execute(text("TRUNCATE earnings_events CASCADE"))
+    finally:
+        await engine.dispose()
+
+    node_types = [n["Node Type"] for n in nodes]
+    assert "Sort" not in node_types
+    assert any(
+        n["Node Type"] == "Index Only Scan" and n.get("Index Name") == "ix_earnings_events_calendar"
+        for n in nodes
+    ), node_types
+
+
+@pytest.mark.asyncio
+async def test_partitioned_week_query_prunes_to_one_partition():
+    schema = "plan_test_partitions"
+    engine = create_async_engine(
+        _build_async_url(TEST_DATABASE_URL),
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    settings = get_settings().model_copy(update={"EARNINGS_PARTITIONING": "quarterly"})
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {schema}"))
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(text(
+                "INSERT INTO earnings_events "
+                "(ticker, company_name, report_date, report_time, market_cap, created_at) "
+                "SELECT 'T' || (g % 50), 'Company', date '2024-01-01' + (g / 50), 'UNKNOWN', g, now() "
+                "FROM generate_series(0, 50 * 730 - 1) AS g"
+            ))
+            with patch("app.db.partitions.get_settings", return_value=settings):
+                await run_migrations(conn)
+            await conn.execute(text("ANALYZE earnings_events"))
+
+            nodes = await _explain(conn, week_events_query(date(2025, 3, 3), date(2025, 3, 7)))
+            count = (await conn.execute(text("SELECT count(*) FROM earnings_events"))).scalar()
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    finally:
+        await engine.dispose()
+
+    assert count == 50 * 730
+    scanned = {n["Relation Name"] for n in nodes if "Relation Name" in n}
+    assert scanned == {"earnings_events_2025q1"}
@@ -0,0 +1,153 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.config import get_settings
+from app.jobs import build_scheduler, sync_alpha_vantage
+from app.services.cache import acquire_job_lock, release_job_lock
+from app.services.scheduler import ScheduledJob, Scheduler
+
+
+class TestScheduledJob:
+    def test_delay_stays_within_jitter(self):
+        job = ScheduledJob("test", AsyncMock(), interval=100, jitter=0.1)
+        delays = [job.next_delay() for _ in range(200)]
+        assert all(90 <= d <= 110 for d in delays)
+
+
+    def test_lease_expires_before_shortest_delay(self):
+        job = ScheduledJob("test", AsyncMock(), interval=100, jitter=0.1)
+        with patch("app.services.scheduler.random.uniform", return_value=-0.1):
+            assert job.lease_seconds() < job.next_delay()
+
+
+class TestRunOnce:
+    @pytest.mark.asyncio
+    @patch("app.services.scheduler.release_job_lock", new_callable=AsyncMock)
+    @patch("app.services.scheduler.acquire_job_lock", new_callable=AsyncMock, return_value="token")
+    async def test_runs_when_lease_acquired(self, mock_acquire, mock_release):
+        func = AsyncMock()
+        job = ScheduledJob("sync", func, interval=60)
+
+        assert await Scheduler().run_once(job) is True
+        func.assert_called_once()
+        mock_acquire.assert_called_once_with("sync", 53_000)
+        mock_release.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.scheduler.acquire_job_lock", new_callable=AsyncMock, return_value=None)
+    async def test_skips_when_another_replica_holds_lease(self, mock_acquire):
+        func = AsyncMock()
+
+        assert await Scheduler().run_once(ScheduledJob("sync", func, interval=60)) is False
+        func.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.scheduler.release_job_lock", new_callable=AsyncMock)
+    @patch("app.services.scheduler.acquire_job_lock", new_callable=AsyncMock, return_value="token")
+    async def test_failure_releases_lease(self, mock_acquire, mock_release):
+        func = AsyncMock(side_effect=RuntimeError("boom"))
+
+        await Scheduler().run_once(ScheduledJob("sync", func, interval=60))
+        mock_release.assert_called_once_with("sync", "token")
+
+
+class TestLeaseAcrossRuns:
+    @pytest.mark.asyncio
+    async def test_reruns_after_short_jittered_delay(self):
+        leases: dict[str, float] = {}
+        now = 0.0
+
+        async def acquire(name, lease_ms):
+            if leases.get(name, -1) > now:
+                return None
+            leases[name] = now + lease_ms / 1000
+            return "token"
+
+        func = AsyncMock()
+        job = ScheduledJob("sync", func, interval=60, jitter=0.1)
+        with patch("app.services.scheduler.acquire_job_lock", side_effect=acquire), \
+                patch("app.services.scheduler.random.uniform", return_value=-0.1):
+            assert await Scheduler().run_once(job) is True
+            now += job.next_delay()
+            assert await Scheduler().run_once(job) is True
+        assert func.await_count == 2
+
+
+class TestAlphaVantageJob:
+    @pytest.mark.asyncio
+    async def test_early_jittered_run_still_syncs(self):
+        from app.services.cache import AV_SYNC_TTL
+
+        settings = get_settings()
+        now = settings.AV_SYNC_INTERVAL * (1 - settings.SCHEDULER_JITTER)
+        marker_expires = 0 + AV_SYNC_TTL  # written when the previous run finished at t=0
+
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=MagicMock())
+        session.__aexit__ = AsyncMock(return_value=False)
+        with patch("app.jobs.get_session_factory", return_value=lambda: session), \
+                patch("app.services.cache.should_sync_alpha_vantage", new_callable=AsyncMock,
+                      return_value=now >= marker_expires), \
+                patch("app.services.cache.mark_alpha_vantage_synced", new_callable=AsyncMock), \
+                patch("app.services.earnings_calendar.fetch_all_earnings_from_alpha_vantage",
+                      new_callable=AsyncMock, return_value=[]) as mock_fetch:
+            await sync_alpha_vantage()
+
+        mock_fetch.assert_awaited_once()
+
+
+class TestBuildScheduler:
+    def test_registers_ingestion_jobs(self):
+        names = [j.name for j in build_scheduler().jobs]
+        assert names == ["alpha_vantage_sync", "nasdaq_enrichment", "highlights", "cache_warm"]
+
+    def test_without_ingestion_keeps_cache_and_partition_jobs(self):
+        settings = get_settings().model_copy(update={"EARNINGS_PARTITIONING": "quarterly"})
+        with patch("app.jobs.get_settings", return_value=settings):
+            names = [j.name for j in build_scheduler(ingestion=False).jobs]
+        assert names == ["highlights", "cache_warm", "partition_maintenance"]
+
+    def test_partition_job_when_partitioned(self):
+        settings = get_settings().model_copy(update={"EARNINGS_PARTITIONING": "quarterly"})
+        with patch("app.jobs.get_settings", return_value=settings):
+            names = [j.name for j in build_scheduler().jobs]
+        assert names[-1] == "partition_maintenance"
+
+
+class TestJobLock:
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_acquire_uses_set_nx_px(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.set = AsyncMock(return_value=True)
+        mock_get_redis.return_value = mock_redis
+
+        token = await acquire_job_lock("sync", 5000)
+        assert token
+        mock_redis.set.assert_called_once_with("scheduler:lock:sync", token, nx=True, px=5000)
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_acquire_returns_none_when_held(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_redis.set = AsyncMock(return_value=None)
+        mock_get_redis.return_value = mock_redis
+
+        assert await acquire_job_lock("sync", 5000) is None
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_acquire_without_redis_runs_locally(self, mock_get_redis):
+        mock_get_redis.return_value = None
+        assert await acquire_job_lock("sync", 5000) is not None
+
+    @pytest.mark.asyncio
+    @patch("app.services.cache.get_redis")
+    async def test_release_checks_token(self, mock_get_redis):
+        mock_redis = AsyncMock()
+        mock_get_redis.return_value = mock_redis
+
+        await release_job_lock("sync", "token")
+        args = mock_redis.eval.call_args[0]
+        assert args[1:] == (1, "scheduler:lock:sync", "token")
@@ -0,0 +1,103 @@
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.ticker_index import TickerIndex, _suggest_pg_trgm, suggest_tickers, ticker_index
+
+
+def _index():
+    index = TickerIndex()
+    index.replace([
+        ("AAPL", "Apple Inc."),
+        ("AAP", "Advance Auto Parts Inc."),
+        ("APP", "AppLovin Corporation"),
+        ("MSFT", "Microsoft Corporation"),
+        ("NVDA", "NVIDIA Corporation"),
+    ])
+    return index
+
+
+class TestTickerIndex:
+    def test_exact_ticker_ranks_first(self):
+        results = _index().suggest("aap")
+        assert [r["ticker"] for r in results[:2]] == ["AAP", "AAPL"]
+
+    def test_company_word_prefix(self):
+        tickers = [r["ticker"] for r in _index().suggest("micro")]
+        assert tickers[0] == "MSFT"
+
+    def test_fuzzy_match_on_typo(self):
+        tickers = [r["ticker"] for r in _index().suggest("nvidai")]
+        assert "NVDA" in tickers
+
+    def test_limit(self):
+        assert len(_index().suggest("a", limit=2)) == 2
+
+    def test_incremental_add_and_rename(self):
+        index = _index()
+        index.add([("TSLA", "Tesla Inc."), ("AAPL", "Apple Computer")])
+
+        assert index.suggest("tesla")[0]["ticker"] == "TSLA"
+        assert index.suggest("aapl")[0]["company_name"] == "Apple Computer"
+        assert index.suggest("apple")[0]["ticker"] == "AAPL"
+        assert "Apple Inc." not in [r["company_name"] for r in index.suggest("apple")]
+        assert len(index) == 6
+
+    def test_shortest_ticker_prefix_ranks_before_company_names(self):
+        index = TickerIndex()
+        index.replace([("ABCD", "Alpha"), ("ABD", "Beta"), ("XYZ", "Abacus Corp"), ("AB", "Gamma")])
+
+        assert [r["ticker"] for r in index.suggest("ab", limit=3)] == ["AB", "ABD", "ABCD"]
+        assert [r["ticker"] for r in index.suggest("ab", limit=4)] == ["AB", "ABD", "ABCD", "XYZ"]
+
+    def test_bulk_add_matches_replace(self):
+        entries = [(f"T{i:04d}", f"Company {i} Holdings") for i in range(2_000)]
+        added, replaced = TickerIndex(), TickerIndex()
+        added.add(entries[:1_000])
+        added.add(entries[1_000:])
+        replaced.replace(entries)
+
+        assert added._keys == replaced._keys
+        assert added._tickers == replaced._tickers
+        assert added.suggest("company 12") == replaced.suggest("company 12")
+
+    def test_empty_query(self):
+        assert _index().suggest("  ") == []
+
+    def test_lookup_is_fast(self):
+        index = TickerIndex()
+        index.replace((f"T{i:04d}", f"Company {i} Holdings") for i in range(10_000))
+
+        started = time.perf_counter()
+        for _ in range(100):
+            index.suggest("t12")
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+
+class TestSuggestTickers:
+    @pytest.mark.asyncio
+    async def test_builds_index_on_first_use(self):
+        db = MagicMock()
+        result = MagicMock()
+        result.all.return_value = [("AAPL", "Apple Inc.")]
+        db.execute = AsyncMock(return_value=result)
+
+        with patch.object(ticker_index, "built_at", None):
+            assert (await suggest_tickers(db, "app"))[0]["ticker"] == "AAPL"
+            db.execute.assert_called_once()
+            await suggest_tickers(db, "app")
+            db.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_pg_trgm_escapes_like_wildcards(self):
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock(all=MagicMock(return_value=[])))
+
+        await _suggest_pg_trgm(db, "50%_off", 10)
+
+        compiled = db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+        assert "ESCAPE '\\'" in str(compiled)
+        assert "50\\%\\_off%" in compiled.params.values()